@@ -3,111 +3,53 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from fpdf import FPDF
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from io import BytesIO
-
-# --- FIXED REPORT GENERATION ENGINES ---
-
-def generate_pdf(df, mode_name, liquidity):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Helvetica", 'B', 16)
-    pdf.cell(190, 10, "SmartCash AI: Executive Treasury Report", ln=True, align='C')
-    
-    pdf.set_font("Helvetica", size=10)
-    pdf.cell(190, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=True, align='C')
-    pdf.ln(10)
-    
-    pdf.set_font("Helvetica", 'B', 12)
-    pdf.cell(95, 10, f"Scenario: {mode_name}")
-    pdf.cell(95, 10, f"Net Liquidity: ${liquidity/1e6:.2f}M", ln=True)
-    pdf.ln(5)
-    
-    # Table Header
-    pdf.set_fill_color(22, 27, 34)
-    pdf.set_text_color(255, 255, 255)
-    pdf.cell(40, 10, "Invoice", 1, 0, 'C', True)
-    pdf.cell(60, 10, "Customer", 1, 0, 'C', True)
-    pdf.cell(45, 10, "Amount", 1, 0, 'C', True)
-    pdf.cell(45, 10, "Due Date", 1, 1, 'C', True)
-    
-    # Table Body
-    pdf.set_text_color(0, 0, 0)
-    pdf.set_font("Helvetica", size=10)
-    for _, row in df.head(20).iterrows():
-        pdf.cell(40, 10, str(row['Invoice_ID']), 1)
-        pdf.cell(60, 10, str(row['Customer'])[:25], 1)
-        pdf.cell(45, 10, f"{row['Amount_Remaining']:,.2f}", 1)
-        pdf.cell(45, 10, str(row['Due_Date']), 1, 1)
-        
-    # --- INDENTATION FIXED BELOW ---
-    pdf_output = pdf.output(dest='S')
-    if isinstance(pdf_output, (bytearray, str)):
-        if isinstance(pdf_output, str):
-            return pdf_output.encode('latin-1')
-        return bytes(pdf_output)
-    return pdf_output
-
-def generate_pptx(df, mode_name, liquidity):
-    prs = Presentation()
-    slide = prs.slides.add_slide(prs.slide_layouts[5])
-    
-    title = slide.shapes.title
-    title.text = f"SmartCash AI Executive Summary"
-    
-    # KPI Stats
-    content = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
-    tf = content.text_frame
-    p = tf.add_paragraph()
-    p.text = f"Scenario Mode: {mode_name}"
-    p.font.size = Pt(24)
-    
-    p2 = tf.add_paragraph()
-    p2.text = f"Risk-Adjusted Liquidity: ${liquidity/1e6:.2f}M"
-    p2.font.bold = True
-    p2.font.size = Pt(32)
-    
-    # CRITICAL FIX: Use BytesIO correctly
-    binary_output = BytesIO()
-    prs.save(binary_output)
-    binary_output.seek(0) # Move to start of buffer
-    return binary_output.getvalue()
+from datetime import datetime
+from backend.match_cache import frame_fingerprint
+from backend.search_index import LedgerSearchIndex
+from backend.ageing import AgeingEngine
+from backend.synthetic import SyntheticLedgerGenerator
+from backend.reports import ReportService
+from backend.stress import StressScenarioEngine
+from backend.exposure_cube import ExposureCube
+from app.components.visuals import render_stress_heatmap, render_risk_radar
 
 # --- 1. STABILITY INITIALIZATION ---
+# Single reporting as-of date for ageing, lateness and the simulated ledger
+AS_OF_DATE = datetime(2026, 1, 30)
+DEMO_SEED = 42
+
 if 'audit' not in st.session_state:
     st.session_state.audit = []
 if 'ledger' not in st.session_state:
-    customers = ['Tesla', 'EcoEnergy', 'GlobalBlue', 'TechRetail', 'Quantum Dyn', 'Alpha Log', 'Nordic Oil', 'Sino Tech', 'Indo Power', 'Euro Mart']
-    entities = ['1000 (US)', '2000 (EU)', '3000 (UK)']
-    currencies = {'1000 (US)': 'USD', '2000 (EU)': 'EUR', '3000 (UK)': 'GBP'}
-    ratings = ['AAA', 'AA', 'A', 'B', 'C', 'D']
-    
-    inv_data = []
-    for i in range(416):
-        ent = np.random.choice(entities)
-        
-        # --- STRATEGIC DATA SCALING ---
-        if np.random.random() > 0.90:
-            amt = np.random.uniform(20_000_000, 35_000_000)
-        else:
-            amt = np.random.uniform(1_000_000, 15_000_000)
-            
-        due = datetime(2026, 1, 30) - timedelta(days=np.random.randint(-15, 60))
-        inv_data.append({
-            'Invoice_ID': f"INV-{1000+i}",
-            'Company_Code': ent,
-            'Customer': np.random.choice(customers),
-            'Amount_Remaining': round(amt, 2),
-            'Currency': currencies[ent],
-            'ESG_Score': np.random.choice(ratings),
-            'Due_Date': due.strftime('%Y-%m-%d'),
-            'Status': 'Overdue' if due < datetime(2026, 1, 30) else 'Open',
-            'Is_Disputed': False
-        })
-    st.session_state.ledger = pd.DataFrame(inv_data)
+    # --- STRATEGIC DATA SCALING: ~10% jumbo exposures (20-35M), the rest 1-15M ---
+    generator = SyntheticLedgerGenerator(
+        seed=DEMO_SEED, as_of=AS_OF_DATE,
+        customers=['Tesla', 'EcoEnergy', 'GlobalBlue', 'TechRetail', 'Quantum Dyn', 'Alpha Log', 'Nordic Oil', 'Sino Tech', 'Indo Power', 'Euro Mart'],
+        entities={'1000 (US)': 'USD', '2000 (EU)': 'EUR', '3000 (UK)': 'GBP'},
+        amount_range=(1_000_000, 15_000_000), large_share=0.10, large_range=(20_000_000, 35_000_000),
+        due_offsets=(-15, 60), dispute_rate=0.0, rating_weights=[1 / 6] * 6
+    )
+    ledger = generator.invoices(416, start=1000).rename(columns={'Amount': 'Amount_Remaining'})
+    ledger['Due_Date'] = ledger['Due_Date'].dt.strftime('%Y-%m-%d')
+    st.session_state.ledger = ledger.astype({c: str for c in ['Company_Code', 'Customer', 'Currency', 'ESG_Score', 'Status']})
+if 'ledger_version' not in st.session_state:
+    # Every column: the version keys the search index and the exposure cube cache
+    st.session_state.ledger_version = frame_fingerprint(st.session_state.ledger, list(st.session_state.ledger.columns))
+
+@st.cache_resource(max_entries=16)
+def get_search_index(ledger_version, _ledger):
+    """Customer/invoice search index, built once per ledger version."""
+    return LedgerSearchIndex(_ledger, version=ledger_version)
+
+@st.cache_resource(max_entries=16)
+def get_exposure_cube(ledger_version, mode, search_selection, _view_df):
+    """Company x Currency x Rating x Customer cube for one ledger version and view."""
+    return ExposureCube.from_frame(_view_df, as_of=AS_OF_DATE, version=ledger_version)
+
+@st.cache_resource
+def get_report_service():
+    """Background PDF/PPTX renderer shared by all sessions (results cached by view)."""
+    return ReportService()
 
 # --- 2. EXECUTIVE THEME ---
 st.set_page_config(page_title="SmartCash AI | C-Suite", page_icon="🏛️", layout="wide")
@@ -129,7 +71,8 @@ with st.sidebar:
 
 # --- 4. TOP NAVIGATION ---
 st.title("🏛️ Executive Treasury Intelligence")
-suggestion_list = ["Consolidated"] + sorted(st.session_state.ledger['Customer'].unique().tolist())
+search_index = get_search_index(st.session_state.ledger_version, st.session_state.ledger)
+suggestion_list = ["Consolidated"] + search_index.customers_by_name
 
 h_col1, h_col2, h_col3 = st.columns([3, 2, 1])
 with h_col1:
@@ -163,8 +106,10 @@ else:
 total_val = view_df['Amount_Remaining'].sum()
 
 if mode == "Stress Test" or risk_weighting:
-    net_collectible = (view_df['Amount_Remaining'] * view_df['ESG_Score'].map(weights)).sum()
+    collectible = view_df['Amount_Remaining'] * view_df['ESG_Score'].map(weights)
+    net_collectible = collectible.sum()
 else:
+    collectible = view_df['Amount_Remaining'] * (1 - (bad_debt_provision/100))
     net_collectible = total_val * (1 - (bad_debt_provision/100))
 
 m1, m2, m3, m4 = st.columns(4)
@@ -177,24 +122,20 @@ m4.metric("Capital at Risk", f"${((total_val - net_collectible)/1e6):.2f}M",
           delta="Increased" if mode == "Stress Test" else "Stable", delta_color="inverse")
 
 # --- 7. GRAPHICAL INTELLIGENCE ---
+# Every risk chart reads roll-ups of one exposure cube per ledger version and view
+cube = get_exposure_cube(st.session_state.ledger_version, mode, search_selection, view_df)
+
 tab_charts, tab_velocity, tab_entity, tab_stress = st.tabs(["📊 Exposure Analytics", "⏳ Liquidity Timeline", "🏢 Entity Exposure", "🔥 Stress Matrix"])
 
 with tab_charts:
     c1, c2 = st.columns([2, 1])
     with c1:
-        st.subheader("🛡️ Strategic Risk Radar")
-        fig_s = px.sunburst(view_df.fillna("Unknown"), path=['Company_Code', 'ESG_Score', 'Customer'], values='Amount_Remaining', color='ESG_Score', color_discrete_map={'AAA':'#238636', 'AA':'#2ea043', 'A':'#d29922', 'B':'#db6d28', 'C':'#f85149', 'D':'#b62323'})
-        fig_s.update_layout(template="plotly_dark", height=500, margin=dict(t=10, b=10, l=10, r=10))
-        st.plotly_chart(fig_s, use_container_width=True)
+        render_risk_radar(cube, path=['Company_Code', 'ESG_Score', 'Customer'], title="🛡️ Strategic Risk Radar", height=500)
     with c2:
         st.subheader("⏳ Institutional Ageing")
-        def get_bucket(d):
-            days = (datetime(2026, 1, 30) - datetime.strptime(d, '%Y-%m-%d')).days
-            return "0-30" if days <= 30 else "31-60" if days <= 60 else "61-90" if days <= 90 else "90+"
-        ov = view_df[view_df['Status'] == 'Overdue'].copy()
+        ov = view_df[view_df['Status'] == 'Overdue']
         if not ov.empty:
-            ov['Bucket'] = ov['Due_Date'].apply(get_bucket)
-            age_data = ov.groupby('Bucket')['Amount_Remaining'].sum().reset_index()
+            age_data = AgeingEngine.executive(as_of=AS_OF_DATE).bucket_totals(ov, 'Amount_Remaining')
             fig_age = px.bar(age_data, x='Bucket', y='Amount_Remaining', color='Bucket', color_discrete_sequence=px.colors.sequential.Reds_r)
             fig_age.update_layout(template="plotly_dark", height=500, showlegend=False)
             st.plotly_chart(fig_age, use_container_width=True)
@@ -217,30 +158,21 @@ with tab_entity:
 
     risk_colors = {'AAA':'#238636', 'AA':'#2ea043', 'A':'#d29922', 'B':'#db6d28', 'C':'#f85149', 'D':'#b62323'}
     
-    e_stats = view_df.copy()
-    e_stats['Due_DT'] = pd.to_datetime(e_stats['Due_Date'])
-    e_stats['Days_Late'] = (pd.to_datetime('2026-01-31') - e_stats['Due_DT']).dt.days.clip(lower=0)
-    
-    entity_analysis = e_stats.groupby(['Customer', 'ESG_Score', 'Company_Code']).agg({
-        'Amount_Remaining': 'sum',
-        'Days_Late': 'mean',
-        'Invoice_ID': 'count' 
-    }).reset_index()
-
-    if view_limit:
-        entity_analysis = entity_analysis.sort_values(['ESG_Score', 'Amount_Remaining'], ascending=[True, False])
-        entity_analysis = entity_analysis.groupby('ESG_Score').head(top_n).reset_index(drop=True)
+    # Focus keeps the top customer/entity cells per rating; every chart below rolls up the same sub-cube
+    entity_level = ['Customer', 'ESG_Score', 'Company_Code']
+    focus = cube.top(top_n, entity_level, within='ESG_Score') if view_limit else cube
+    entity_analysis = focus.rollup(entity_level)
 
     col_matrix, col_cards = st.columns([3, 1])
 
     with col_matrix:
         st.write(f"#### 🎯 Strategic Risk Matrix {'(Filtered: Top ' + str(top_n) + ' per Rating)' if view_limit else ''}")
         fig_bubble = px.scatter(
-            entity_analysis, x="Days_Late", y="Amount_Remaining",
-            size="Amount_Remaining", color="ESG_Score", hover_name="Customer",
+            entity_analysis, x="Avg_Days_Late", y="Amount",
+            size="Amount", color="ESG_Score", hover_name="Customer",
             color_discrete_map=risk_colors, template="plotly_dark", size_max=60
         )
-        max_bubble_value = entity_analysis['Amount_Remaining'].max() if not entity_analysis.empty else 1
+        max_bubble_value = entity_analysis['Amount'].max() if not entity_analysis.empty else 1
         fig_bubble.update_layout(
             height=650,
             yaxis=dict(range=[0, max_bubble_value * 1.2], title="Exposure ($)", gridcolor="#30363d"),
@@ -250,16 +182,15 @@ with tab_entity:
 
     with col_cards:
         st.write("#### 🛡️ Priority Watchlist")
-        watchlist_data = entity_analysis.groupby('Customer')['Amount_Remaining'].sum().reset_index()
-        top_risks = watchlist_data.sort_values(by='Amount_Remaining', ascending=False).head(5)
+        top_risks = focus.rollup(['Customer']).nlargest(5, 'Amount')
+        main_rating = entity_analysis.sort_values('Amount', ascending=False).drop_duplicates('Customer').set_index('Customer')['ESG_Score']
         
         for _, row in top_risks.iterrows():
-            orig_rating = entity_analysis[entity_analysis['Customer'] == row['Customer']]['ESG_Score'].iloc[0]
-            border_color = risk_colors.get(orig_rating, '#58a6ff')
+            border_color = risk_colors.get(main_rating.get(row['Customer']), '#58a6ff')
             st.markdown(f"""
             <div style="background:#161b22; padding:12px; border-radius:10px; border-left: 5px solid {border_color}; margin-bottom:10px;">
                 <p style="margin:0; font-weight:bold;">{row['Customer']}</p>
-                <p style="margin:0; font-size:18px; color:#58a6ff;">${row['Amount_Remaining']/1e6:.2f}M</p>
+                <p style="margin:0; font-size:18px; color:#58a6ff;">${row['Amount']/1e6:.2f}M</p>
             </div>
             """, unsafe_allow_html=True)
 
@@ -267,21 +198,20 @@ with tab_stress:
     st.subheader("Strategic Liquidity Stress Matrix (FX Volatility vs. Hedging)")
     fx_range = np.array([-10, -5, 0, 5, 10])
     hedge_range = np.array([0, 25, 50, 75, 100])
-    base_liq = net_collectible / 1e6
-    z_data = [[round(base_liq * (1 + (fx/100) * (1 - (h/100))), 2) for h in hedge_range] for fx in fx_range]
-    fig_h = go.Figure(data=go.Heatmap(z=z_data, x=[f"{h}% Hedge" for h in hedge_range], y=[f"{fx}% FX Vol" for fx in fx_range], colorscale='RdYlGn', text=z_data, texttemplate="$%{text}M"))
-    fig_h.update_layout(template="plotly_dark", height=450)
-    st.plotly_chart(fig_h, use_container_width=True, key="stress_heatmap")
+    # Shocks applied per currency / hedges per entity to the risk-adjusted exposure
+    stress_engine = StressScenarioEngine.from_frame(view_df, amount=collectible)
+    z_data = np.round(stress_engine.grid(fx_range, hedge_range) / 1e6, 2)
+    render_stress_heatmap(z_data, fx_range, hedge_range, key="stress_heatmap", height=450, fx_suffix="% FX Vol")
     
     col_b1, col_b2 = st.columns([1, 1])
     with col_b1:
         st.write("#### 🌍 Regional/Company Code Diversification")
-        fig_bar = px.bar(entity_analysis, x="Company_Code", y="Amount_Remaining", color="ESG_Score", barmode="stack", template="plotly_dark", color_discrete_map=risk_colors)
+        fig_bar = px.bar(focus.rollup(['Company_Code', 'ESG_Score']), x="Company_Code", y="Amount", color="ESG_Score", barmode="stack", template="plotly_dark", color_discrete_map=risk_colors)
         st.plotly_chart(fig_bar, use_container_width=True, key="stress_bar")
         
     with col_b2:
         st.write("#### 📊 Risk Distribution by Volume")
-        fig_pie = px.pie(entity_analysis, names="ESG_Score", values="Invoice_ID", hole=0.4, color_discrete_map=risk_colors, template="plotly_dark")
+        fig_pie = px.pie(focus.rollup(['ESG_Score']), names="ESG_Score", values="Count", hole=0.4, color_discrete_map=risk_colors, template="plotly_dark")
         st.plotly_chart(fig_pie, use_container_width=True, key="stress_pie")
 
 # --- 8. EXECUTIVE ACTION PANEL ---
@@ -302,16 +232,27 @@ st.divider()
 st.subheader("📤 Export Intelligence")
 d_col1, d_col2 = st.columns(2)
 
-with d_col1:
-    try:
-        pdf_bytes = generate_pdf(view_df, mode, net_collectible)
-        st.download_button(label="📥 Download Executive PDF", data=pdf_bytes, file_name=f"SmartCash_Report_{mode}.pdf", mime="application/pdf", use_container_width=True, key="pdf_download_btn")
-    except Exception as e:
-        st.error("PDF Engine encountered a buffer error. Please refresh.")
-
-with d_col2:
-    try:
-        pptx_bytes = generate_pptx(view_df, mode, net_collectible)
-        st.download_button(label="📊 Download Board PPTX", data=pptx_bytes, file_name=f"SmartCash_Deck_{mode}.pptx", mime="application/vnd.openxmlformats-officedocument.presentationml.presentation", use_container_width=True, key="pptx_download_btn")
-    except Exception as e:
-        st.error("PPTX Engine encountered a buffer error.")
+reports = get_report_service()
+report_filters = {"search": search_selection, "provision": bad_debt_provision, "risk_weighting": risk_weighting}
+exports = [
+    (d_col1, "pdf", "📥 Download Executive PDF", f"SmartCash_Report_{mode}.pdf", "application/pdf", "pdf_download_btn"),
+    (d_col2, "pptx", "📊 Download Board PPTX", f"SmartCash_Deck_{mode}.pptx",
+     "application/vnd.openxmlformats-officedocument.presentationml.presentation", "pptx_download_btn"),
+]
+for column, kind, label, file_name, mime, btn_key in exports:
+    with column:
+        # Rendered lazily on a worker thread; finished files are reused for identical views
+        report_key = reports.make_key(kind, view_df, mode, net_collectible, report_filters)
+        job = reports.get(report_key)
+        if job is None:
+            if st.button(f"Prepare {kind.upper()} ({len(view_df):,} invoices)", use_container_width=True, key=f"{btn_key}_prepare"):
+                reports.submit(kind, report_key, view_df, mode, net_collectible)
+                st.rerun()
+        elif not job.done():
+            st.info(f"{kind.upper()} report is being generated in the background...")
+            st.button("🔄 Check status", use_container_width=True, key=f"{btn_key}_refresh")
+        elif job.exception() is not None:
+            st.error(f"{kind.upper()} engine failed: {job.exception()}")
+        else:
+            with open(job.result(), "rb") as report_file:
+                st.download_button(label=label, data=report_file, file_name=file_name, mime=mime, use_container_width=True, key=btn_key)
@@ -0,0 +1,65 @@
+import hashlib
+import pandas as pd
+import streamlit as st
+from backend.table_pager import TablePager
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+def _frame_fingerprint(df):
+    """Content fingerprint of a frame (values, index and column names)."""
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=True)
+    except TypeError:
+        # Unhashable cells (dicts, lists) are hashed through their text form
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=True)
+    digest = hashlib.sha256(hashes.to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    return digest.hexdigest()
+
+def _get_pager(df, key, filter_columns):
+    """One pager per table key and frame content, kept across reruns (sort orders and filter text stay cached)."""
+    fingerprint = (_frame_fingerprint(df), tuple(filter_columns or ()))
+    cached = st.session_state.get(f"{key}_pager")
+    if cached is None or cached[0] != fingerprint:
+        cached = st.session_state[f"{key}_pager"] = (fingerprint, TablePager(df, filter_columns=filter_columns))
+    return cached[1]
+
+def render_paged_table(df, key, page_size=50, filter_columns=None):
+    """
+    Renders a large DataFrame one page at a time.
+    Filtering, sorting and paging run server-side; only the visible page
+    and selected columns are sent to the browser.
+    """
+    pager = _get_pager(df, key, filter_columns)
+
+    c_filter, c_sort, c_dir, c_size = st.columns([3, 2, 1, 1])
+    filter_text = c_filter.text_input("Filter", key=f"{key}_filter", placeholder="Contains…")
+    sort_by = c_sort.selectbox("Sort by", ["(none)"] + list(df.columns), key=f"{key}_sort")
+    descending = c_dir.toggle("Desc", key=f"{key}_desc")
+    default_size = PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1
+    size = c_size.selectbox("Rows", PAGE_SIZES, index=default_size, key=f"{key}_size")
+
+    columns = st.multiselect("Columns", list(df.columns), default=list(df.columns), key=f"{key}_cols")
+
+    # Page number is clamped by the pager when filters shrink the result
+    page_no = st.session_state.get(f"{key}_page", 1)
+    result = pager.query(
+        page=page_no, page_size=size,
+        sort_by=None if sort_by == "(none)" else sort_by, ascending=not descending,
+        filter_text=filter_text, columns=columns
+    )
+
+    st.dataframe(result["rows"], use_container_width=True, hide_index=True)
+
+    c_prev, c_info, c_next = st.columns([1, 4, 1])
+    if c_prev.button("◀ Prev", key=f"{key}_prev", disabled=result["page"] <= 1):
+        st.session_state[f"{key}_page"] = result["page"] - 1
+        st.rerun()
+    if c_next.button("Next ▶", key=f"{key}_next", disabled=result["page"] >= result["pages"]):
+        st.session_state[f"{key}_page"] = result["page"] + 1
+        st.rerun()
+
+    first = (result["page"] - 1) * size + 1 if result["total"] else 0
+    last = min(result["page"] * size, result["total"])
+    c_info.caption(f"Rows {first:,}–{last:,} of {result['total']:,} · page {result['page']} / {result['pages']}")
+    return result
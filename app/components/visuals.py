@@ -1,47 +1,63 @@
+import numpy as np
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 
-def render_risk_radar(df):
-    """
-    Renders the Institutional Risk Radar (Sunburst).
-    Preserves the Currency -> Customer -> ESG hierarchy.
-    """
-    st.subheader("Institutional Risk Radar")
-    
-    # Ensuring data exists for the sunburst path
-    fig = px.sunburst(
-        df, 
-        path=['Currency', 'Customer_Name', 'ESG_Score'], 
-        values='Amount',
-        color='ESG_Score',
-        color_discrete_map={
-            'AA': '#1a9641', # Deep Green
-            'A': '#a6d96a',  # Light Green
-            'B': '#fdae61',  # Orange
-            'C': '#d7191c'   # Red
-        },
-        template="plotly_dark",
-        maxdepth=2
-    )
-    
+# Plotly is imported inside each renderer so pages that never draw a chart
+# (and headless imports of this module) skip its import cost.
+
+RISK_COLORS = {'AAA': '#238636', 'AA': '#2ea043', 'A': '#d29922', 'B': '#db6d28', 'C': '#f85149', 'D': '#b62323'}
+
+# Built figures are cached by their (aggregated) inputs and shared across
+# reruns and sessions; st.plotly_chart serializes a copy, so they are never
+# mutated after construction.
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _sunburst_figure(nodes, value, color_dim, color_map, height):
+    import plotly.graph_objects as go
+
+    colors = None
+    if color_dim in nodes.columns:
+        colors = nodes[color_dim].map(color_map).fillna('#30363d').tolist()
+
+    fig = go.Figure(go.Sunburst(
+        ids=nodes['id'], labels=nodes['label'], parents=nodes['parent'], values=nodes[value],
+        branchvalues='total', marker=dict(colors=colors),
+        customdata=np.column_stack([nodes['Amount'] / 1e6, nodes['Count']]),
+        hovertemplate="<b>%{label}</b><br>Total Value: $%{customdata[0]:,.4f}M<br>"
+                      "Invoices: %{customdata[1]:,.0f}<br>" + f"{value}: " + "$%{value:,.2f}<extra></extra>"
+    ))
+
     fig.update_layout(
+        template="plotly_dark", height=height,
         margin=dict(t=10, l=10, r=10, b=10),
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)'
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
-
+    return fig
 
 
-def render_liquidity_waterfall(opening_cash, expected_ar, stressed_ar):
+def render_risk_radar(source, path=('Currency', 'Customer', 'ESG_Score'), value='Amount', color_dim='ESG_Score',
+                      color_map=None, top_n=20, title="Institutional Risk Radar", height=None, key=None):
     """
-    Renders the Liquidity Bridge (Waterfall).
-    Visualizes the gap between expected and stressed cash flow.
+    Renders the Institutional Risk Radar (Sunburst).
+    `source` is an ExposureCube or a pre-aggregated hierarchy table (id,
+    parent, label, Amount, Count, `value`). Cubes are cut to the `top_n`
+    children per node plus an 'Other' roll-up, so the figure stays small
+    whatever the customer count; nodes below `color_dim` take its colour.
     """
-    st.subheader("Liquidity Bridge (Stressed)")
-    
+    if title:
+        st.subheader(title)
+
+    nodes = source if hasattr(source, 'columns') else source.hierarchy(path, top_n=top_n, measure=value)
+    fig = _sunburst_figure(nodes, value, color_dim, color_map or RISK_COLORS, height)
+
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _waterfall_figure(opening_cash, expected_ar, stressed_ar):
+    import plotly.graph_objects as go
+
     fig = go.Figure(go.Waterfall(
         name="Liquidity", orientation="v",
         measure=["relative", "relative", "relative", "total"],
@@ -61,5 +77,38 @@ def render_liquidity_waterfall(opening_cash, expected_ar, stressed_ar):
         plot_bgcolor='rgba(0,0,0,0)',
         margin=dict(t=20, l=20, r=20, b=20)
     )
+    return fig
+
+
+def render_liquidity_waterfall(opening_cash, expected_ar, stressed_ar):
+    """
+    Renders the Liquidity Bridge (Waterfall).
+    Visualizes the gap between expected and stressed cash flow.
+    """
+    st.subheader("Liquidity Bridge (Stressed)")
+    
+    fig = _waterfall_figure(opening_cash, expected_ar, stressed_ar)
 
     st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _stress_heatmap_figure(z_data, fx_range, hedge_range, height, fx_suffix):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=go.Heatmap(
+        z=z_data, x=[f"{h:g}% Hedge" for h in hedge_range], y=[f"{fx:g}{fx_suffix}" for fx in fx_range],
+        colorscale='RdYlGn', text=z_data, texttemplate="$%{text}M", hoverinfo="z"
+    ))
+    fig.update_layout(template="plotly_dark", height=height, xaxis_title="Hedge Coverage", yaxis_title="FX Volatility (%)")
+    return fig
+
+
+def render_stress_heatmap(z_data, fx_range, hedge_range, key=None, height=400, fx_suffix="% Vol"):
+    """
+    Renders the FX vs. Hedge stress matrix.
+    Expects a (fx x hedge) grid in $M, e.g. from StressScenarioEngine.grid.
+    """
+    fig = _stress_heatmap_figure(np.asarray(z_data), np.asarray(fx_range), np.asarray(hedge_range), height, fx_suffix)
+
+    st.plotly_chart(fig, use_container_width=True, key=key)
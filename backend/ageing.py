@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+
+class AgeingEngine:
+    """
+    Vectorized AR Ageing for SmartCash AI.
+    Assigns days-past-due buckets with np.searchsorted over configurable
+    bucket edges and a single as-of date, and returns pre-aggregated
+    bucket x entity x currency totals for the dashboards.
+    """
+
+    # Operational view (main.py): 8 DPD buckets
+    OPERATIONAL_EDGES = [15, 30, 60, 90, 120, 180, 360]
+    OPERATIONAL_LABELS = ["0-15", "16-30", "31-60", "61-90", "91-120", "121-180", "181-360", "361+"]
+    # Executive view (C-suite-main.py): 4 DPD buckets
+    EXECUTIVE_EDGES = [30, 60, 90]
+    EXECUTIVE_LABELS = ["0-30", "31-60", "61-90", "90+"]
+
+    UNKNOWN = "Unknown"
+
+    def __init__(self, edges=None, as_of=None, labels=None):
+        self.edges = np.asarray(edges if edges is not None else self.OPERATIONAL_EDGES, dtype=np.int64)
+        self.as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+        self.labels = labels or self._default_labels(self.edges)
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError("Ageing needs exactly one more label than bucket edges.")
+
+    @classmethod
+    def operational(cls, as_of=None):
+        return cls(cls.OPERATIONAL_EDGES, as_of, cls.OPERATIONAL_LABELS)
+
+    @classmethod
+    def executive(cls, as_of=None):
+        return cls(cls.EXECUTIVE_EDGES, as_of, cls.EXECUTIVE_LABELS)
+
+    @staticmethod
+    def _default_labels(edges):
+        """[15, 30] -> ['0-15', '16-30', '31+'] (last bucket is open-ended)."""
+        labels, lower = [], 0
+        for edge in edges:
+            labels.append(f"{lower}-{edge}")
+            lower = edge + 1
+        labels.append(f"{lower}+")
+        return labels
+
+    def days_past_due(self, due_dates):
+        """Whole days between the as-of date and each due date (NaN where the date is missing)."""
+        due = pd.to_datetime(pd.Series(due_dates), errors='coerce').to_numpy(dtype='datetime64[D]')
+        days = (np.datetime64(self.as_of.date(), 'D') - due).astype('float64')
+        days[np.isnat(due)] = np.nan
+        return days
+
+    def assign(self, due_dates):
+        """Bucket code per invoice; `len(labels)` marks a missing/invalid due date."""
+        days = self.days_past_due(due_dates)
+        codes = np.searchsorted(self.edges, np.nan_to_num(days, nan=0.0), side='left')
+        codes[np.isnan(days)] = len(self.labels)
+        return codes
+
+    def bucket_labels(self, due_dates):
+        """Ordered categorical of bucket labels (for display / legacy 'Bucket' columns)."""
+        categories = list(self.labels) + [self.UNKNOWN]
+        return pd.Categorical.from_codes(self.assign(due_dates), categories=categories, ordered=True)
+
+    def aggregate(self, df, amount_col='Amount_Remaining', by=('Company_Code', 'Currency')):
+        """
+        Bucket x entity x currency totals (long format, non-empty cells only):
+        columns Bucket, <by...>, Amount, Count.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=['Bucket', *by, 'Amount', 'Count'])
+
+        codes = self.assign(df['Due_Date']) if 'Due_Date' in df.columns else np.full(len(df), len(self.labels))
+        amounts = pd.to_numeric(df[amount_col], errors='coerce').fillna(0.0).to_numpy()
+
+        key = codes.astype(np.int64)
+        dims = [len(self.labels) + 1]
+        level_values = []
+        for col in by:
+            values = df[col].astype(str) if col in df.columns else pd.Series("Unknown", index=df.index)
+            col_codes, uniques = pd.factorize(values, sort=True)
+            key = key * len(uniques) + col_codes
+            dims.append(len(uniques))
+            level_values.append(np.asarray(uniques))
+
+        size = int(np.prod(dims))
+        totals = np.bincount(key, weights=amounts, minlength=size)
+        counts = np.bincount(key, minlength=size)
+        cells = np.flatnonzero(counts)
+
+        unravel = np.unravel_index(cells, dims)
+        out = {'Bucket': np.asarray(list(self.labels) + [self.UNKNOWN])[unravel[0]]}
+        for col, values, idx in zip(by, level_values, unravel[1:]):
+            out[col] = values[idx]
+        out['Amount'] = totals[cells]
+        out['Count'] = counts[cells]
+        return pd.DataFrame(out)
+
+    def bucket_totals(self, df, amount_col='Amount_Remaining', include_unknown=False):
+        """Total per bucket in bucket order, zero-filled (the dashboard bar chart input)."""
+        codes = self.assign(df['Due_Date'])
+        amounts = pd.to_numeric(df[amount_col], errors='coerce').fillna(0.0).to_numpy()
+        totals = np.bincount(codes, weights=amounts, minlength=len(self.labels) + 1)
+        labels = list(self.labels) + [self.UNKNOWN]
+        result = pd.DataFrame({'Bucket': labels, amount_col: totals})
+        return result if include_unknown else result.iloc[:-1]
@@ -1,39 +1,115 @@
 import os
 import json
-from dotenv import load_dotenv
+import time
+from backend.response_cache import ResponseCache
+from backend.metrics import METRICS
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled; shared with llm_batch) ---
+LLM_CALL_SECONDS = METRICS.histogram("llm_call_seconds", "Model call latency (cache misses only)", ["outcome"])
+LLM_CACHE_LOOKUPS = METRICS.counter("llm_cache_lookups_total", "Response cache lookups", ["result"])
+
+# Heavy provider SDKs are imported on first use, not at module import,
+# so batch jobs and cold starts that never call the model don't pay for them.
+_OPENAI_CLASS = None
+_DOTENV_LOADED = False
+
+
+def _load_env():
+    """Loads .env once per process (deferred from import time)."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        _DOTENV_LOADED = True
+
 
 # Supporting multi-model strategy (Sprint 6/12)
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+def _openai_class():
+    """Returns the OpenAI client class, or None if the SDK isn't installed."""
+    global _OPENAI_CLASS
+    if _OPENAI_CLASS is None:
+        try:
+            from openai import OpenAI
+            _OPENAI_CLASS = OpenAI
+        except ImportError:
+            _OPENAI_CLASS = False
+    return _OPENAI_CLASS or None
 
-load_dotenv()
 
 class GenAIAssistant:
     """
     Cognitive Layer for SmartCash AI.
     Handles exception reasoning, adaptive dunning, and liquidity advice.
     """
-    
-    def __init__(self):
+
+    MOCK_REASONING = "⚠️ [MOCK MODE] Discrepancy likely due to bank transfer fees ($15-$30) or name abbreviation."
+
+    def __init__(self, model="gpt-4o-mini", cache=None, cache_path=None):
+        _load_env()
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.provider = "OPENAI" if self.api_key else "MOCK"
-        
-        if self.api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
-            self.client = None
+        self.model = model
+
+        # Persistent response cache: identical prompts are answered from disk.
+        # Built on first use, so MOCK mode never opens a cache file.
+        self._cache = cache
+        self.cache_path = cache_path
+        self._client = None
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = ResponseCache(db_path=self.cache_path)
+        return self._cache
+
+    @property
+    def client(self):
+        """Provider client is only built on the first cache miss."""
+        if self._client is None and self.api_key:
+            openai_cls = _openai_class()
+            if openai_cls is not None:
+                self._client = openai_cls(api_key=self.api_key)
+        return self._client
+
+    def _complete(self, prompt, temperature):
+        """Cached chat completion; provider errors propagate and are never cached."""
+        cached = self.cache.get(prompt, self.model, temperature)
+        LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature
+            )
+        except Exception:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started, outcome="error")
+            raise
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+        content = response.choices[0].message.content
+        self.cache.put(prompt, self.model, temperature, content)
+        return content
 
     def reason_exception(self, payment_data, top_matches):
         """
         Sprint 3: Analyzes why the matching engine failed to hit 95% confidence.
         """
         if self.provider == "MOCK":
-            return "⚠️ [MOCK MODE] Discrepancy likely due to bank transfer fees ($15-$30) or name abbreviation."
+            return self.MOCK_REASONING
 
-        prompt = f"""
+        try:
+            return self._complete(self._exception_prompt(payment_data, top_matches), temperature=0.2)
+        except Exception as e:
+            return f"AI Reasoning Error: {str(e)}"
+
+    def _exception_prompt(self, payment_data, top_matches):
+        return f"""
         System: You are an Institutional Treasury Auditor.
         Task: Analyze the mismatch between this bank payment and the ledger.
         
@@ -44,15 +120,78 @@ class GenAIAssistant:
         and suggest a 'Resolution Path' (e.g., Post with write-off, or Request Remittance).
         """
 
+    async def reason_exceptions_async(self, batch, provider=None, max_concurrency=8,
+                                      requests_per_second=10.0, tokens_per_second=None, max_retries=3,
+                                      limiter=None):
+        """
+        Batch variant of reason_exception for bulk exception queues.
+        `batch` is a list of (payment_data, top_matches) pairs; answers come
+        back in the same order. Pass a FakeLLMProvider to run offline, and a
+        shared llm_batch.RateLimiter to hold concurrent batches to one quota.
+        """
+        from backend.llm_batch import ClientProvider, run_batch
+
+        if provider is None:
+            if self.provider == "MOCK":
+                return [self.MOCK_REASONING] * len(batch)
+            provider = ClientProvider(self.client)
+
+        prompts = [self._exception_prompt(payment, matches) for payment, matches in batch]
+        answers = await run_batch(
+            prompts, provider, self.model, 0.2,
+            max_concurrency=max_concurrency, requests_per_second=requests_per_second,
+            tokens_per_second=tokens_per_second, max_retries=max_retries, cache=self.cache, limiter=limiter
+        )
+        return [f"AI Reasoning Error: {str(a)}" if isinstance(a, Exception) else a for a in answers]
+
+    def reason_exceptions(self, batch, **kwargs):
+        """
+        Blocking wrapper around reason_exceptions_async for scripts and the UI.
+        Inside a running event loop (notebooks, async services) the batch runs
+        on a private loop in a worker thread; async callers should await
+        reason_exceptions_async instead.
+        """
+        import asyncio
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"AI Reasoning Error: {str(e)}"
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.reason_exceptions_async(batch, **kwargs))
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(lambda: asyncio.run(self.reason_exceptions_async(batch, **kwargs))).result()
+
+    def reason_exception_clusters(self, exceptions_df, candidates, clusterer=None, **batch_kwargs):
+        """
+        Clusters exceptions by root cause, reasons once per cluster
+        representative and fans the answer back out to every member.
+        Returns (answers aligned to exceptions_df rows, cluster stats).
+        """
+        from backend.exception_clustering import ExceptionClusterer
+
+        clusterer = clusterer or ExceptionClusterer()
+        cluster_ids, reps = clusterer.cluster(exceptions_df, candidates)
+        if not reps:
+            return [], {"exceptions": 0, "clusters": 0, "compression_ratio": 1.0}
+
+        sizes = cluster_ids.value_counts()
+        positions = {label: pos for pos, label in enumerate(exceptions_df.index)}
+        cluster_order = list(reps)
+        batch = []
+        for cid in cluster_order:
+            label = reps[cid]
+            payment = exceptions_df.loc[label].to_dict()
+            payment["Similar_Exceptions"] = int(sizes[cid])
+            batch.append((payment, candidates[positions[label]]))
+
+        rep_answers = dict(zip(cluster_order, self.reason_exceptions(batch, **batch_kwargs)))
+        answers = [rep_answers[cid] for cid in cluster_ids]
+        stats = {
+            "exceptions": len(answers),
+            "clusters": len(cluster_order),
+            "compression_ratio": round(clusterer.compression_ratio(cluster_ids), 2)
+        }
+        return answers, stats
 
     def generate_adaptive_email(self, customer, amount, invoice_id, esg_score):
         """
@@ -78,12 +217,7 @@ class GenAIAssistant:
         """
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            return response.choices[0].message.content
+            return self._complete(prompt, temperature=0.7)
         except Exception as e:
             return f"Email Generator Error: {str(e)}"
 
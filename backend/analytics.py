@@ -30,8 +30,16 @@ class TreasuryAnalytics:
         Calculates the 'Haircut' or the amount of cash delayed due to risk factors.
         """
         # Total expected collections
-        total_ar = df_inv['Amount'].sum()
-        
+        return self._simulate_liquidity(df_inv['Amount'].sum(), stress_days)
+
+    def run_liquidity_simulation_from_store(self, store, stress_days):
+        """
+        Stress simulation fed by the running open AR of an
+        ExposureAggregateStore (no ledger scan).
+        """
+        return self._simulate_liquidity(store.get_open_ar(), stress_days)
+
+    def _simulate_liquidity(self, total_ar, stress_days):
         # Calculate daily velocity (simplified)
         daily_velocity = total_ar / 30 
         
@@ -0,0 +1,207 @@
+import sys
+import weakref
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+
+def _intern(values):
+    """Integer codes plus the distinct original values (NaN kept as its own value)."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _code_type(n_values):
+    """Narrowest signed integer type that can index n_values interned values."""
+    for code_type in (np.int8, np.int16, np.int32):
+        if n_values <= np.iinfo(code_type).max:
+            return code_type
+    return np.int64
+
+
+def _pack_ids(values):
+    """Fixed-width byte strings for ASCII ids (1 byte/char), unicode otherwise."""
+    ids = np.asarray(values, dtype=object).astype(str)
+    try:
+        return ids.astype(np.bytes_)
+    except UnicodeEncodeError:
+        return ids
+
+
+# id(frame) -> (weak reference, (rows, columns), CompactLedger); entries go when the frame is collected
+_FRAME_LEDGERS = {}
+_FRAME_LOCK = threading.Lock()
+
+
+class CompactLedger:
+    """
+    Array-Backed Invoice Ledger for SmartCash AI.
+    One fixed-width record per invoice in a structured NumPy array; customer,
+    currency, rating, status and due-date values are interned once and
+    referenced by the narrowest integer code that fits. The matcher and treasury hot loops work on
+    these columns (scoring each distinct customer once) and only build
+    dicts or DataFrames for the rows they return.
+    """
+
+    CODE_FIELDS = ['customer', 'currency', 'esg', 'status', 'due_label']
+    NO_DATE = np.iinfo(np.int32).min
+    MEMO_LIMIT = 4096
+
+    def __init__(self, records, invoice_ids, customers, currencies, esg_scores, statuses, due_labels,
+                 optional=('ESG_Score', 'Status', 'Due_Date'), clean_customers=None, models=None):
+        self.records = records
+        self.invoice_ids = invoice_ids
+        self.customers = customers
+        self.currencies = currencies
+        self.esg_scores = esg_scores
+        self.statuses = statuses
+        self.due_labels = due_labels
+        # Optional source columns that were present (missing ones read as 'N/A')
+        self.optional = tuple(optional)
+        # Lower-cased customer names, aligned to `customers` codes
+        self.clean_customers = clean_customers or [str(c).lower().strip() for c in customers]
+        # Per-payer name scores etc., reused while this ledger is alive
+        self.memo = {}
+        # Fitted models over the interned customers (shared with sub-ledgers, never evicted)
+        self.models = {} if models is None else models
+        self._fingerprint = None
+
+    @classmethod
+    def of(cls, df):
+        """
+        Compact form of `df`, converted once per DataFrame object and reused
+        (with its name memo) while the frame is alive. The frame is treated
+        as a read-only snapshot: after editing one in place, pass a copy or
+        call from_frame.
+        """
+        if isinstance(df, CompactLedger):
+            return df
+        key, signature = id(df), (len(df), tuple(df.columns))
+        with _FRAME_LOCK:
+            entry = _FRAME_LEDGERS.get(key)
+            if entry is not None and entry[0]() is df and entry[1] == signature:
+                return entry[2]
+        ledger = cls.from_frame(df)
+        with _FRAME_LOCK:
+            ref = weakref.ref(df, lambda _, key=key: _FRAME_LEDGERS.pop(key, None))
+            _FRAME_LEDGERS[key] = (ref, signature, ledger)
+        return ledger
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Builds the compact form of an engine-schema ledger (Invoice_ID,
+        Customer or Customer_Name, Amount, Currency; ESG_Score, Status and
+        Due_Date optional). Non-numeric amounts raise, as in the row matcher.
+        """
+        n = len(df)
+        cust_col = 'Customer_Name' if 'Customer_Name' in df.columns else 'Customer'
+        amounts = pd.to_numeric(df['Amount']).to_numpy(dtype=float)
+
+        missing = np.zeros(n, dtype=np.int8), np.array(["N/A"], dtype=object)
+        codes = {}
+        codes['customer'], customers = _intern(df[cust_col])
+        codes['currency'], currencies = _intern(df['Currency'])
+        codes['esg'], esg_scores = _intern(df['ESG_Score']) if 'ESG_Score' in df.columns else missing
+        codes['status'], statuses = _intern(df['Status']) if 'Status' in df.columns else missing
+        if 'Due_Date' in df.columns:
+            codes['due_label'], due_labels = _intern(df['Due_Date'])
+            due = pd.to_datetime(df['Due_Date'], errors='coerce').to_numpy().astype('datetime64[D]')
+            due_days = np.where(np.isnat(due), cls.NO_DATE, due.astype(np.int64))
+        else:
+            codes['due_label'], due_labels = missing
+            due_days = cls.NO_DATE
+        values = dict(zip(cls.CODE_FIELDS, (customers, currencies, esg_scores, statuses, due_labels)))
+
+        dtype = np.dtype([('amount', 'f8')] + [(f, _code_type(len(values[f]))) for f in cls.CODE_FIELDS]
+                         + [('due_days', 'i4')])
+        records = np.empty(n, dtype=dtype)
+        records['amount'] = amounts
+        for field in cls.CODE_FIELDS:
+            records[field] = codes[field]
+        records['due_days'] = due_days
+
+        return cls(
+            records, _pack_ids(df['Invoice_ID']), customers, currencies, esg_scores, statuses, due_labels,
+            optional=[c for c in ('ESG_Score', 'Status', 'Due_Date') if c in df.columns]
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def empty(self):
+        return len(self.records) == 0
+
+    @property
+    def amounts(self):
+        return self.records['amount']
+
+    @property
+    def nbytes(self):
+        """Resident size: records + ids + interned values (shallow)."""
+        interned = sum(
+            sys.getsizeof(v) for values in (self.customers, self.currencies, self.esg_scores,
+                                             self.statuses, self.due_labels) for v in values
+        )
+        return self.records.nbytes + self.invoice_ids.nbytes + interned
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint (used as the match-cache ledger key)."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256(self.records.tobytes())
+            digest.update(self.invoice_ids.tobytes())
+            for values in (self.customers, self.currencies, self.esg_scores, self.due_labels):
+                digest.update(repr(values.tolist()).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def remember(self, key, compute):
+        """Bounded memo for per-ledger derived arrays (e.g. name scores per payer)."""
+        value = self.memo.get(key)
+        if value is None:
+            if len(self.memo) >= self.MEMO_LIMIT:
+                self.memo.clear()
+            value = self.memo[key] = compute()
+        return value
+
+    def model(self, key, fit):
+        """Fitted model for `key`, built once; unlike the memo this slot is never cleared."""
+        value = self.models.get(key)
+        if value is None:
+            value = self.models[key] = fit()
+        return value
+
+    def mask(self, field, value):
+        """Boolean mask over records whose interned `field` equals value."""
+        uniques = {'customer': self.customers, 'currency': self.currencies, 'esg': self.esg_scores,
+                   'status': self.statuses}[field]
+        hits = np.fromiter((u == value for u in uniques), dtype=bool, count=len(uniques))
+        return hits[self.records[field]]
+
+    def invoice_id(self, i):
+        value = self.invoice_ids[i]
+        return value.decode() if isinstance(value, bytes) else str(value)
+
+    def take(self, positions):
+        """Sub-ledger sharing the interned values."""
+        return CompactLedger(self.records[positions], self.invoice_ids[positions], self.customers, self.currencies,
+                             self.esg_scores, self.statuses, self.due_labels, self.optional, self.clean_customers,
+                             self.models)
+
+    def to_frame(self):
+        """Engine-schema DataFrame (for the edges: exports, UI tables)."""
+        r = self.records
+        out = pd.DataFrame({
+            'Invoice_ID': self.invoice_ids.astype(str),
+            'Customer': self.customers[r['customer']],
+            'Amount': r['amount'],
+            'Currency': self.currencies[r['currency']]
+        })
+        for col, field, values in (('ESG_Score', 'esg', self.esg_scores), ('Status', 'status', self.statuses),
+                                   ('Due_Date', 'due_label', self.due_labels)):
+            if col in self.optional:
+                out[col] = values[r[field]]
+        return out
@@ -2,8 +2,14 @@ import pandas as pd
 import hashlib
 import json
 import os
+import time
 import random
 from datetime import datetime, timedelta
+from backend.metrics import METRICS
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled) ---
+VAULT_RECORDS = METRICS.counter("vault_records_total", "Audit records signed and appended")
+VAULT_COMMIT_SECONDS = METRICS.histogram("vault_commit_seconds", "Audit log commit latency (sign + append)", ["mode"])
 
 class ComplianceVault:
     """
@@ -11,6 +17,11 @@ class ComplianceVault:
     Ensures every treasury action is cryptographically signed and 
     permanently archived to CSV.
     """
+    COLUMNS = [
+        "Timestamp", "Event_ID", "Invoice_Ref", "Action",
+        "Amount", "Operator", "Status", "Hash_ID"
+    ]
+
     def __init__(self, ledger_path="data/compliance_log.csv"):
         self.ledger_path = ledger_path
         self.vault = []
@@ -20,10 +31,7 @@ class ComplianceVault:
         
         # Initialize the physical log file with headers if it doesn't exist
         if not os.path.exists(self.ledger_path):
-            headers = pd.DataFrame(columns=[
-                "Timestamp", "Event_ID", "Invoice_Ref", "Action", 
-                "Amount", "Operator", "Status", "Hash_ID"
-            ])
+            headers = pd.DataFrame(columns=self.COLUMNS)
             headers.to_csv(self.ledger_path, index=False)
 
     def generate_sha256(self, data_dict):
@@ -38,6 +46,7 @@ class ComplianceVault:
         """
         Signs the transaction and appends it to the permanent CSV log.
         """
+        started = time.perf_counter()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         payload = {
             "Timestamp": timestamp,
@@ -57,11 +66,42 @@ class ComplianceVault:
         self.vault.insert(0, new_entry)
 
         # 2. Append to Physical CSV (Non-Repudiation Layer)
-        df_entry = pd.DataFrame([new_entry])
+        df_entry = pd.DataFrame([new_entry], columns=self.COLUMNS)
         df_entry.to_csv(self.ledger_path, mode='a', header=False, index=False)
+        VAULT_RECORDS.inc()
+        VAULT_COMMIT_SECONDS.observe(time.perf_counter() - started, mode="single")
         
         return hash_id
 
+    def log_actions(self, records):
+        """
+        Bulk variant of log_action for batch jobs (e.g. portfolio dunning).
+        Each record is signed individually; the CSV is appended in one write.
+        Records are dicts with invoice_ref, action_type and optional amount/operator.
+        """
+        started = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entries = []
+        for rec in records:
+            payload = {
+                "Timestamp": timestamp,
+                "Invoice_Ref": rec["invoice_ref"],
+                "Action": rec["action_type"],
+                "Amount": float(rec.get("amount", 0)),
+                "Operator": rec.get("operator", "AI_AGENT_STP")
+            }
+            hash_id = self.generate_sha256(payload)
+            entries.append({**payload, "Event_ID": f"TXN-{random.randint(100000, 999999)}", "Status": "SECURE", "Hash_ID": hash_id})
+
+        if not entries:
+            return []
+
+        self.vault[:0] = entries[::-1]
+        pd.DataFrame(entries, columns=self.COLUMNS).to_csv(self.ledger_path, mode='a', header=False, index=False)
+        VAULT_RECORDS.inc(len(entries))
+        VAULT_COMMIT_SECONDS.observe(time.perf_counter() - started, mode="batch")
+        return [e["Hash_ID"] for e in entries]
+
     def get_logs(self):
         """
         Reads directly from the physical log to ensure the UI shows 
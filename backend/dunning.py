@@ -0,0 +1,177 @@
+import os
+import re
+import pandas as pd
+from datetime import datetime
+
+
+class BulkDunningRun:
+    """
+    Portfolio Dunning Pipeline for SmartCash AI.
+    Consolidates every overdue invoice of a debtor into one notice, renders
+    ESG-tiered templates with vectorized string assembly, and only escalates
+    high-risk accounts to the GenAI layer. Notices stream to an outbox
+    directory with one compliance entry per notice.
+    """
+
+    # ESG-Driven Tone Logic (as in GenAIAssistant.generate_adaptive_email):
+    # only AA/A get the collaborative tone; every other rating, including AAA
+    # and unknown values, is formal (FIRM), escalating for C/D.
+    TIER_MAP = {
+        'AA': 'COLLABORATIVE', 'A': 'COLLABORATIVE',
+        'AAA': 'FIRM', 'B': 'FIRM',
+        'C': 'ESCALATION', 'D': 'ESCALATION'
+    }
+    DEFAULT_TIER = 'FIRM'
+    TIER_RANK = {'COLLABORATIVE': 0, 'FIRM': 1, 'ESCALATION': 2}
+    ESG_RANK = {'AAA': 0, 'AA': 1, 'A': 2, 'B': 3, 'C': 4, 'D': 5}
+
+    NOTICE_COLUMNS = ['Customer', 'ESG_Score', 'Tier', 'Invoice_Count', 'Invoice_IDs', 'Total_Amount',
+                      'Totals', 'Max_Days', 'Notice', 'Escalate']
+
+    # Tier -> (subject prefix, opening paragraph)
+    TEMPLATES = {
+        'COLLABORATIVE': (
+            "Friendly reminder",
+            "Thank you for your continued partnership. Our records show the following items are past due:"
+        ),
+        'FIRM': (
+            "Payment Overdue",
+            "This is a formal notice that the following invoices remain unpaid beyond their due dates:"
+        ),
+        'ESCALATION': (
+            "URGENT: Final Notice",
+            "Despite previous reminders, the following balances remain outstanding and are now subject to escalation:"
+        )
+    }
+    SIGN_OFF = (
+        "Please confirm the payment status or provide a remittance advice by EOD.\n\n"
+        "Best Regards,\nTreasury Operations Team"
+    )
+
+    def __init__(self, assistant=None, vault=None, escalation_amount=1_000_000, escalation_days=90,
+                 amount_col='Amount_Remaining'):
+        self.assistant = assistant
+        self.vault = vault
+        self.escalation_amount = escalation_amount
+        self.escalation_days = escalation_days
+        self.amount_col = amount_col
+
+    def select_overdue(self, ledger_df, as_of=None):
+        """Overdue = Status 'Overdue', or open and past due as of the run date (disputes excluded)."""
+        as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+        due = pd.to_datetime(ledger_df['Due_Date'], errors='coerce')
+        status = ledger_df['Status'].astype(str) if 'Status' in ledger_df.columns else pd.Series('Open', index=ledger_df.index)
+
+        mask = (status == 'Overdue') | ((status == 'Open') & (due < as_of))
+        if 'Is_Disputed' in ledger_df.columns:
+            mask &= ~ledger_df['Is_Disputed'].astype(bool)
+
+        ov = ledger_df.loc[mask].copy()
+        ov['Due_Date'] = due[mask]
+        ov['Days_Overdue'] = (as_of - ov['Due_Date']).dt.days.fillna(0).astype(int)
+        return ov
+
+    def build_notices(self, ledger_df, as_of=None):
+        """Returns one row per debtor with tier, totals and the rendered notice text."""
+        ov = self.select_overdue(ledger_df, as_of)
+        if ov.empty:
+            return pd.DataFrame(columns=self.NOTICE_COLUMNS)
+
+        cust = ov['Customer'].astype(str)
+        ccy = ov['Currency'].astype(str) if 'Currency' in ov.columns else pd.Series('USD', index=ov.index)
+        amount = pd.to_numeric(ov[self.amount_col], errors='coerce').fillna(0.0)
+        esg = ov['ESG_Score'].astype(str) if 'ESG_Score' in ov.columns else pd.Series('N/A', index=ov.index)
+        tier_rank = esg.map(self.TIER_MAP).fillna(self.DEFAULT_TIER).map(self.TIER_RANK)
+
+        # 1. Invoice lines (vectorized concatenation)
+        lines = (
+            "  - " + ov['Invoice_ID'].astype(str)
+            + " | due " + ov['Due_Date'].dt.strftime('%Y-%m-%d').fillna('N/A')
+            + " | " + ccy + " " + amount.map('{:,.2f}'.format)
+            + " | " + ov['Days_Overdue'].astype(str) + " days"
+        )
+
+        # 2. Per-debtor aggregates
+        by_cust = pd.DataFrame({
+            'Lines': lines.groupby(cust, sort=False).agg("\n".join),
+            'Invoice_Count': cust.groupby(cust, sort=False).size(),
+            'Total_Amount': amount.groupby(cust, sort=False).sum(),
+            'Max_Days': ov['Days_Overdue'].groupby(cust, sort=False).max(),
+            'Worst_Rank': esg.map(self.ESG_RANK).groupby(cust, sort=False).max(),
+            'Tier_Rank': tier_rank.groupby(cust, sort=False).max(),
+            'Invoice_IDs': ov['Invoice_ID'].astype(str).groupby(cust, sort=False).agg(",".join)
+        })
+        ccy_totals = amount.groupby([cust, ccy], sort=False).sum()
+        totals_text = (
+            ccy_totals.index.get_level_values(1) + " " + ccy_totals.map('{:,.2f}'.format).to_numpy()
+        )
+        by_cust['Totals'] = pd.Series(totals_text, index=ccy_totals.index.get_level_values(0)).groupby(level=0, sort=False).agg(" + ".join)
+
+        # Worst known rating for display; the tone is the harshest tier across the debtor's invoices
+        rank_to_esg = {v: k for k, v in self.ESG_RANK.items()}
+        by_cust['ESG_Score'] = by_cust['Worst_Rank'].map(rank_to_esg).fillna('N/A')
+        by_cust['Tier'] = by_cust['Tier_Rank'].map({v: k for k, v in self.TIER_RANK.items()})
+        by_cust = by_cust.rename_axis('Customer').reset_index()
+
+        # 3. Tier templates (vectorized: one concatenation per column)
+        prefix = by_cust['Tier'].map({t: v[0] for t, v in self.TEMPLATES.items()})
+        opener = by_cust['Tier'].map({t: v[1] for t, v in self.TEMPLATES.items()})
+        by_cust['Notice'] = (
+            "Subject: " + prefix + " - " + by_cust['Invoice_Count'].astype(str)
+            + " open invoice(s) for " + by_cust['Customer'] + "\n\n"
+            + "Dear Accounts Payable Team,\n\n" + opener + "\n" + by_cust['Lines'] + "\n\n"
+            + "Total outstanding: " + by_cust['Totals']
+            + " (oldest item " + by_cust['Max_Days'].astype(str) + " days past due).\n\n"
+            + self.SIGN_OFF
+        )
+
+        by_cust['Escalate'] = (by_cust['Tier'] == 'ESCALATION') & (
+            (by_cust['Total_Amount'] >= self.escalation_amount) | (by_cust['Max_Days'] >= self.escalation_days)
+        )
+        return by_cust[self.NOTICE_COLUMNS]
+
+    @staticmethod
+    def _slug(name):
+        return re.sub(r'[^A-Za-z0-9]+', '_', str(name)).strip('_') or "debtor"
+
+    def run(self, ledger_df, outbox_dir="data/outbox", as_of=None, operator="DUNNING_BATCH"):
+        """
+        Builds all notices, escalates flagged accounts to the model, streams
+        each notice to the outbox and logs one audit entry per notice.
+        Returns a summary dict.
+        """
+        notices = self.build_notices(ledger_df, as_of)
+        os.makedirs(outbox_dir, exist_ok=True)
+        run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        use_model = self.assistant is not None and getattr(self.assistant, 'provider', 'MOCK') != "MOCK"
+        audit_records = []
+        escalated = 0
+
+        for seq, row in enumerate(notices.itertuples(index=False)):
+            body = row.Notice
+            if row.Escalate and use_model:
+                body = self.assistant.generate_adaptive_email(row.Customer, row.Totals, row.Invoice_IDs, row.ESG_Score)
+                escalated += 1
+
+            path = os.path.join(outbox_dir, f"{run_stamp}_{seq:06d}_{self._slug(row.Customer)}.txt")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(body)
+
+            audit_records.append({
+                "invoice_ref": row.Invoice_IDs,
+                "action_type": f"DUNNING_{row.Tier}",
+                "amount": row.Total_Amount,
+                "operator": operator
+            })
+
+        if self.vault is not None and audit_records:
+            self.vault.log_actions(audit_records)
+
+        return {
+            "notices": len(notices),
+            "invoices": int(notices['Invoice_Count'].sum()) if not notices.empty else 0,
+            "escalated_to_model": escalated,
+            "outbox": outbox_dir,
+            "by_tier": notices['Tier'].value_counts().to_dict() if not notices.empty else {}
+        }
@@ -1,16 +1,34 @@
+import time
+import heapq
+import logging
 import pandas as pd
-from fuzzywuzzy import fuzz
 import numpy as np
 from datetime import datetime
+from backend.metrics import METRICS
+from backend.compact_ledger import CompactLedger
+from backend.name_matcher import make_name_scorer
+
+logger = logging.getLogger(__name__)
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled) ---
+MATCH_PAYMENTS = METRICS.counter("matcher_payments_total", "Payments scored by run_match")
+MATCH_CANDIDATES = METRICS.counter("matcher_candidates_total", "Ledger rows scored (passed the amount screen)")
+MATCH_FUZZY_CALLS = METRICS.counter("matcher_fuzzy_calls_total", "Name-similarity comparisons (one per distinct customer and payer)")
+MATCH_STP_EARLY_EXITS = METRICS.counter("matcher_stp_early_exits_total", "Streaming matches ended early on a unique STP hit")
+MATCH_ERRORS = METRICS.counter("matcher_errors_total", "run_match calls that failed")
+MATCH_STAGE_SECONDS = METRICS.histogram("matcher_stage_seconds", "run_match latency per stage", ["stage"])
 
 class SmartMatchingEngine:
-    def __init__(self):
+    def __init__(self, name_scorer=None):
         """
         Institutional Grade Matching Engine Configuration.
         STP (Straight-Through Processing) requires high confidence (>95%).
+        `name_scorer` selects the name-similarity backend: 'token_set'
+        (default, fuzz.token_set_ratio) or 'tfidf' (sparse character n-grams).
         """
         self.stp_threshold = 0.95
         self.manual_review_threshold = 0.70
+        self.name_scorer = make_name_scorer(name_scorer)
         
         # --- Entity Alias Registry (Institutional Master Data) ---
         # Maps varied bank strings to canonical ERP Master Data names
@@ -46,84 +64,157 @@ class SmartMatchingEngine:
         except Exception:
             return 0.0
 
-    def run_match(self, payment_amt, payer_name, currency, invoice_df):
+    # Best score a fee-tolerance (non-exact) candidate can reach: 0.8 * 0.5 + 1.0 * 0.4
+    TOLERANCE_CEILING = 0.8
+
+    def run_match(self, payment_amt, payer_name, currency, invoice_df, top_k=None):
         """
         Waterfall Matching Logic:
         1. Exact Match: Amount + Currency + Resolved Identity.
         2. Fuzzy Match: Uses 'thefuzz' for name similarity.
         3. Exception Logic: Handles Bank Fees & Short-pays.
+        With `top_k`, only the k best candidates are kept (bounded heap, no full sort).
         """
         try:
-            results = []
-            if invoice_df.empty:
-                return []
-
-            # Standardize Payer Name from Bank Feed
-            clean_payer = str(payer_name).lower().strip()
-            resolved_payer = self.alias_map.get(clean_payer, clean_payer)
-
-            for _, inv in invoice_df.iterrows():
-                # --- SPRINT 1: Exact Amount & Currency Logic (Weight: 0.50) ---
-                inv_amt = float(inv['Amount'])
-                pay_amt = float(payment_amt)
-                
-                amt_score = 0.0
-                is_exact_amt = (pay_amt == inv_amt and currency == inv['Currency'])
-                
-                if is_exact_amt:
-                    amt_score = 1.0
-                # Sprint 3: Bank fee tolerance (Fixed $5 or 0.1% variance)
-                elif abs(pay_amt - inv_amt) <= max(5.0, 0.001 * inv_amt):
-                    amt_score = 0.8 
-                
-                # --- SPRINT 2: Name Similarity (Weight: 0.40) ---
-                # Handle dynamic column names (Customer vs Customer_Name)
-                cust_col = 'Customer_Name' if 'Customer_Name' in inv else 'Customer'
-                clean_customer = str(inv[cust_col]).lower().strip()
-                
-                # token_set_ratio handles noise like "Inc", "Ltd", or reordered words
-                name_score = fuzz.token_set_ratio(resolved_payer, clean_customer) / 100
-
-                # --- SPRINT 3: Partial Match/Short-Pay Logic (Weight: 0.10) ---
-                partial_match_bonus = 0.0
-                status_note = ""
-                
-                # If amount is perfect but name is ambiguous, apply a safety bonus
-                if is_exact_amt and name_score < 0.5:
-                    partial_match_bonus = 0.7 
-                    status_note = " (Amount Matched, Name Check Required)"
-
-                # --- Weighted Confidence Calculation ---
-                total_confidence = (amt_score * 0.5) + (name_score * 0.4)
-                
-                # Override if partial match logic suggests a likely connection
-                if partial_match_bonus > total_confidence:
-                    total_confidence = partial_match_bonus
-
-                # --- Categorization & Status Assignment ---
-                if total_confidence >= self.stp_threshold:
-                    status = "STP: Automated"
-                elif total_confidence >= self.manual_review_threshold:
-                    status = f"EXCEPTION: High Confidence{status_note}"
-                else:
-                    status = "EXCEPTION: Investigation Required"
-
-                # Filter out noise; only return candidates with >40% relevance
-                if total_confidence > 0.40: 
-                    results.append({
-                        "Invoice_ID": inv['Invoice_ID'],
-                        "Customer": inv[cust_col],
-                        "Currency": inv['Currency'],
-                        "Amount": inv_amt,
-                        "confidence": round(total_confidence, 2),
-                        "status": status,
-                        "esg_score": inv.get('ESG_Score', 'N/A'),
-                        "due_date": str(inv.get('Due_Date', 'N/A'))
-                    })
-
-            # Return results sorted by highest confidence first
-            return sorted(results, key=lambda x: x['confidence'], reverse=True)
-
+            return list(self._matches(payment_amt, payer_name, currency, invoice_df, top_k, early_exit=False))
         except Exception as e:
-            print(f"Engine Failure: {str(e)}")
+            MATCH_ERRORS.inc()
+            logger.warning("Engine Failure: %s", e, exc_info=True)
             return []
+
+    def iter_matches(self, payment_amt, payer_name, currency, invoice_df, top_k=None):
+        """
+        Streaming variant of run_match: yields candidates best-first and only
+        builds each result when it is consumed. Exact amount + currency hits
+        are scored first; if one clears stp_threshold with a unique best score
+        (that no fee-tolerance candidate can reach), it is yielded alone and
+        the remaining candidates are never scored.
+        """
+        try:
+            yield from self._matches(payment_amt, payer_name, currency, invoice_df, top_k, early_exit=True)
+        except Exception as e:
+            MATCH_ERRORS.inc()
+            logger.warning("Engine Failure: %s", e, exc_info=True)
+
+    def prime_names(self, payer_names, ledger):
+        """
+        Batch-scores a feed's payer names ahead of matching when the name
+        backend supports it (one sparse product for the TF-IDF scorer).
+        """
+        resolved = []
+        for name in payer_names:
+            clean = str(name).lower().strip()
+            resolved.append(self.alias_map.get(clean, clean))
+        return self.name_scorer.prime(ledger, resolved)
+
+    def _matches(self, payment_amt, payer_name, currency, invoice_df, top_k, early_exit):
+        if invoice_df.empty:
+            return
+        timed = METRICS.enabled
+        started = time.perf_counter() if timed else 0.0
+
+        # The hot loop runs on the compact array form; a DataFrame is converted once per frame object
+        ledger = CompactLedger.of(invoice_df)
+
+        # Standardize Payer Name from Bank Feed
+        clean_payer = str(payer_name).lower().strip()
+        resolved_payer = self.alias_map.get(clean_payer, clean_payer)
+
+        # --- SPRINT 1: Exact Amount & Currency Logic (Weight: 0.50) ---
+        inv_amt = ledger.amounts
+        pay_amt = float(payment_amt)
+        is_exact_amt = (inv_amt == pay_amt) & ledger.mask('currency', currency)
+        # Sprint 3: Bank fee tolerance (Fixed $5 or 0.1% variance)
+        within_fee = np.abs(pay_amt - inv_amt) <= np.maximum(5.0, 0.001 * inv_amt)
+
+        # Names alone score at most 0.40, so only amount hits can clear the noise
+        # floor below: exact hits are scored first, fee-tolerance hits after.
+        exact = np.flatnonzero(is_exact_amt)
+        confidence, name_check, fuzzy_calls = self._score(ledger, exact, True, resolved_payer)
+        positions = exact
+
+        stp_hit = None
+        if early_exit and len(exact):
+            rounded = np.array([round(c, 2) for c in confidence.tolist()])
+            best = rounded.max()
+            if best >= self.stp_threshold and best > self.TOLERANCE_CEILING and (rounded == best).sum() == 1:
+                stp_hit = int(np.argmax(rounded))
+
+        if stp_hit is None:
+            tolerance = np.flatnonzero(within_fee & ~is_exact_amt)
+            more = self._score(ledger, tolerance, False, resolved_payer)
+            fuzzy_calls += more[2]
+            # Back to ledger order so equal scores keep the row-order tie-break
+            positions = np.concatenate([exact, tolerance])
+            order = np.argsort(positions, kind='stable')
+            positions = positions[order]
+            confidence = np.concatenate([confidence, more[0]])[order]
+            name_check = np.concatenate([name_check, more[1]])[order]
+
+        # Filter out noise; only return candidates with >40% relevance
+        scored = time.perf_counter() if timed else 0.0
+        if stp_hit is not None:
+            keep, ranked = np.array([stp_hit]), [0]
+            MATCH_STP_EARLY_EXITS.inc()
+        else:
+            keep = np.flatnonzero(confidence > 0.40)
+            rounded = [round(c, 2) for c in confidence[keep].tolist()]
+            # Highest confidence first (stable, like sorted(..., reverse=True))
+            if top_k:
+                ranked = heapq.nlargest(top_k, range(len(keep)), key=rounded.__getitem__)
+            else:
+                ranked = sorted(range(len(keep)), key=rounded.__getitem__, reverse=True)
+
+        if timed:
+            MATCH_STAGE_SECONDS.observe(scored - started, stage="score")
+            MATCH_STAGE_SECONDS.observe(time.perf_counter() - scored, stage="rank")
+            MATCH_PAYMENTS.inc()
+            MATCH_CANDIDATES.inc(len(positions))
+            MATCH_FUZZY_CALLS.inc(fuzzy_calls)
+
+        for j in ranked:
+            i = keep[j]
+            yield self._result(ledger, positions[i], float(confidence[i]), bool(name_check[i]))
+
+    def _score(self, ledger, positions, exact, resolved_payer):
+        """Confidence and name-check flags for ledger rows that passed the amount screen."""
+        # --- SPRINT 2: Name Similarity (Weight: 0.40) ---
+        # token_set_ratio handles noise like "Inc", "Ltd", or reordered words.
+        # Scored once per distinct customer and kept on the ledger for repeat payers.
+        codes = ledger.records['customer'][positions]
+        name_score, name_calls = self.name_scorer.scores(ledger, resolved_payer, codes)
+
+        amt_score = 1.0 if exact else 0.8
+
+        # --- SPRINT 3: Partial Match/Short-Pay Logic (Weight: 0.10) ---
+        # If amount is perfect but name is ambiguous, apply a safety bonus
+        name_check = (name_score < 0.5) if exact else np.zeros(len(positions), dtype=bool)
+
+        # --- Weighted Confidence Calculation ---
+        total_confidence = (amt_score * 0.5) + (name_score * 0.4)
+
+        # Override if partial match logic suggests a likely connection
+        total_confidence = np.where(name_check & (0.7 > total_confidence), 0.7, total_confidence)
+        return total_confidence, name_check, name_calls
+
+    def _result(self, ledger, i, confidence, name_check):
+        # --- Categorization & Status Assignment ---
+        if confidence >= self.stp_threshold:
+            status = "STP: Automated"
+        elif confidence >= self.manual_review_threshold:
+            status_note = " (Amount Matched, Name Check Required)" if name_check else ""
+            status = f"EXCEPTION: High Confidence{status_note}"
+        else:
+            status = "EXCEPTION: Investigation Required"
+
+        records = ledger.records
+        return {
+            "Invoice_ID": ledger.invoice_id(i),
+            "Customer": ledger.customers[records['customer'][i]],
+            "Currency": ledger.currencies[records['currency'][i]],
+            "Amount": float(records['amount'][i]),
+            "confidence": round(confidence, 2),
+            "status": status,
+            "esg_score": ledger.esg_scores[records['esg'][i]],
+            "due_date": str(ledger.due_labels[records['due_label'][i]])
+        }
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+
+class ExceptionClusterer:
+    """
+    Root-Cause Pre-Stage for exception reasoning.
+    Groups matching exceptions that share a payer, currency, amount-delta
+    pattern and top-candidate set so one reasoning call can be fanned out
+    to every member of the cluster.
+    """
+
+    # Deliberately wider than the engine's bank-fee tolerance (max($5, 0.1%)):
+    # correspondent-bank wire fees of $15-$30 fall outside the matcher's window,
+    # which is why those payments became exceptions, yet they share one root
+    # cause and should still cluster as FEE_SHORT rather than as short-pays.
+    FEE_ABS_LIMIT = 30.0
+    FEE_PCT_LIMIT = 0.001
+    SHORT_PAY_BAND = 0.05  # Short/over-pays are grouped in 5% bands
+
+    def __init__(self, alias_map=None, top_k=3, candidate_key='Customer'):
+        self.alias_map = alias_map or {}
+        self.top_k = top_k
+        # 'Customer' clusters repeat short-pays across different invoices of one debtor;
+        # use 'Invoice_ID' for strict per-invoice clusters.
+        self.candidate_key = candidate_key
+
+    def _normalize_payers(self, payers):
+        clean = payers.astype(str).str.lower().str.strip()
+        if self.alias_map:
+            clean = clean.map(lambda p: self.alias_map.get(p, p)).str.lower()
+        return clean.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+    def build_features(self, exceptions_df, candidates, payer_col='Customer', amount_col='Amount', currency_col='Currency'):
+        """
+        Vectorized feature table (one row per exception):
+        payer key, currency, amount-delta pattern and top-candidate signature.
+        """
+        top_amounts = np.array(
+            [float(c[0]['Amount']) if c else np.nan for c in candidates], dtype=float
+        )
+        signatures = [
+            "|".join(sorted({str(m.get(self.candidate_key)) for m in c[:self.top_k]})) if c else ""
+            for c in candidates
+        ]
+
+        amounts = pd.to_numeric(exceptions_df[amount_col], errors='coerce').to_numpy(dtype=float)
+        delta = amounts - top_amounts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(top_amounts > 0, delta / top_amounts, np.nan)
+
+        fee_window = np.maximum(self.FEE_ABS_LIMIT, self.FEE_PCT_LIMIT * np.nan_to_num(top_amounts))
+        pattern = np.select(
+            [np.isnan(top_amounts), delta == 0, (delta < 0) & (-delta <= fee_window), delta < 0],
+            ["NO_CANDIDATE", "EXACT", "FEE_SHORT", "SHORT_PAY"],
+            default="OVER_PAY"
+        )
+        band = np.floor(np.nan_to_num(pct) / self.SHORT_PAY_BAND).astype(int)
+        banded = np.isin(pattern, ["SHORT_PAY", "OVER_PAY"])
+        pattern = np.where(banded, np.char.add(pattern.astype(str), np.char.add(":", band.astype(str))), pattern)
+
+        return pd.DataFrame({
+            'Payer_Key': self._normalize_payers(exceptions_df[payer_col]).to_numpy(),
+            'Currency': exceptions_df[currency_col].astype(str).to_numpy() if currency_col in exceptions_df else 'N/A',
+            'Delta_Pattern': pattern,
+            'Candidate_Set': signatures,
+            'Amount_Delta': delta
+        }, index=exceptions_df.index)
+
+    def cluster(self, exceptions_df, candidates, **cols):
+        """
+        Returns (cluster_ids, representatives):
+        cluster_ids is aligned to exceptions_df.index, representatives maps
+        cluster id -> index label of the member sent for reasoning.
+        """
+        if exceptions_df.empty:
+            return pd.Series([], dtype=int), {}
+
+        features = self.build_features(exceptions_df, candidates, **cols)
+        cluster_ids = features.groupby(
+            ['Payer_Key', 'Currency', 'Delta_Pattern', 'Candidate_Set'], sort=False
+        ).ngroup()
+
+        # Representative: the member whose delta sits closest to the cluster median
+        dev = (features['Amount_Delta'] - features['Amount_Delta'].groupby(cluster_ids).transform('median')).abs()
+        reps = dev.fillna(0).groupby(cluster_ids).idxmin().to_dict()
+        return cluster_ids, reps
+
+    @staticmethod
+    def compression_ratio(cluster_ids):
+        return len(cluster_ids) / max(1, cluster_ids.nunique())
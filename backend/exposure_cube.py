@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from backend.ageing import AgeingEngine
+
+
+class ExposureCube:
+    """
+    Pre-Aggregated Exposure Cube for SmartCash AI.
+    One row per non-empty Company_Code x Currency x ESG_Score x Customer cell
+    carrying open amount, invoice count and days-late totals. Risk visuals
+    roll up and slice these cells instead of re-grouping invoice rows, and
+    hierarchical charts receive ready-made aggregated nodes.
+    """
+
+    DIMENSIONS = ['Company_Code', 'Currency', 'ESG_Score', 'Customer']
+    SOURCE_COLUMNS = DIMENSIONS + ['Amount_Remaining', 'Due_Date']
+    UNKNOWN = "Unknown"
+    NODE_SEP = "\x1f"
+
+    def __init__(self, cells, version=None):
+        self.cells = cells
+        self.version = version
+        # Derived cubes / node tables, reused while this cube is cached by the app
+        self._memo = {}
+
+    @classmethod
+    def from_frame(cls, df, amount_col='Amount_Remaining', due_col='Due_Date', as_of=None, version=None):
+        """Aggregates invoice rows into cube cells (missing dimensions become 'Unknown')."""
+        n = len(df)
+        data, labels = {}, {}
+        for dim in cls.DIMENSIONS:
+            if dim in df.columns and n:
+                codes, uniques = pd.factorize(df[dim], use_na_sentinel=False)
+                uniques = pd.Series(np.asarray(uniques, dtype=object))
+                labels[dim] = uniques.where(uniques.notna(), cls.UNKNOWN).astype(str).to_numpy(dtype=object)
+            else:
+                codes, labels[dim] = np.zeros(n, dtype=np.intp), np.array([cls.UNKNOWN], dtype=object)
+            data[dim] = codes
+
+        if amount_col in df.columns:
+            data['Amount'] = pd.to_numeric(df[amount_col], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        else:
+            data['Amount'] = np.zeros(n)
+        data['Count'] = np.ones(n, dtype=np.int64)
+
+        # Days late (0 if not yet due); undated invoices are left out of the average
+        if due_col in df.columns:
+            days = AgeingEngine(as_of=as_of).days_past_due(df[due_col].to_numpy())
+        else:
+            days = np.full(n, np.nan)
+        data['Days_Late_Sum'] = np.nan_to_num(np.clip(days, 0, None), nan=0.0)
+        data['Dated_Count'] = (~np.isnan(days)).astype(np.int64)
+
+        cells = pd.DataFrame(data).groupby(cls.DIMENSIONS, sort=False).sum().reset_index()
+        for dim in cls.DIMENSIONS:
+            cells[dim] = labels[dim].take(cells[dim].to_numpy())
+        return cls(cells, version)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def measures(self):
+        return [c for c in self.cells.columns if c not in self.DIMENSIONS]
+
+    @property
+    def total(self):
+        return float(self.cells['Amount'].sum())
+
+    # --- SLICING ---
+
+    @staticmethod
+    def _filter_key(filters):
+        return tuple(sorted(
+            (dim, tuple(sorted(map(str, value))) if isinstance(value, (list, tuple, set)) else value)
+            for dim, value in filters.items()
+        ))
+
+    def slice(self, **filters):
+        """Sub-cube where each given dimension equals a value (or is in a list of values)."""
+        memo_key = ("slice", self._filter_key(filters))
+        if memo_key not in self._memo:
+            mask = np.ones(len(self.cells), dtype=bool)
+            for dim, value in filters.items():
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                mask &= self.cells[dim].isin(values).to_numpy()
+            self._memo[memo_key] = ExposureCube(self.cells[mask].reset_index(drop=True), self.version)
+        return self._memo[memo_key]
+
+    def top(self, n, level, within=None, measure='Amount'):
+        """Sub-cube restricted to the n largest `level` groups (per `within` value if given)."""
+        ranked = self.rollup(level).sort_values(measure, ascending=False, kind='stable')
+        ranked = ranked.groupby(within, sort=False).head(n) if within else ranked.head(n)
+        keep = pd.MultiIndex.from_frame(self.cells[level]).isin(pd.MultiIndex.from_frame(ranked[level]))
+        return ExposureCube(self.cells[keep].reset_index(drop=True), self.version)
+
+    def with_weights(self, weights, name='Exposure', by='ESG_Score', default=0.0):
+        """Adds a measure `name` = Amount x weights[by] (e.g. risk-weighted exposure)."""
+        memo_key = ("weights", tuple(sorted(weights.items())), name, by, default)
+        if memo_key not in self._memo:
+            cells = self.cells.copy()
+            cells[name] = cells['Amount'] * cells[by].map(weights).astype(float).fillna(default)
+            self._memo[memo_key] = ExposureCube(cells, self.version)
+        return self._memo[memo_key]
+
+    # --- ROLL-UPS ---
+
+    def rollup(self, dims, **filters):
+        """
+        Measures summed over every dimension not in `dims`, plus Avg_Days_Late.
+        An empty `dims` returns the grand total as a single row.
+        """
+        cube = self.slice(**filters) if filters else self
+        dims = list(dims)
+        if dims:
+            out = cube.cells.groupby(dims, sort=True)[cube.measures].sum().reset_index()
+        else:
+            out = cube.cells[cube.measures].sum().to_frame().T
+        return self._with_average(out)
+
+    @staticmethod
+    def _with_average(out):
+        dated = out['Dated_Count'].to_numpy(dtype=float)
+        out['Avg_Days_Late'] = np.divide(out['Days_Late_Sum'].to_numpy(dtype=float), dated,
+                                         out=np.zeros(len(out)), where=dated > 0)
+        return out
+
+    def hierarchy(self, path, top_n=None, measure='Amount', other_label="Other", **filters):
+        """
+        Sunburst/treemap nodes for a dimension path: one roll-up per depth with
+        'id', 'parent', 'label' and 'depth' columns, so parent values equal
+        the sum of their children (plotly branchvalues='total'). With `top_n`,
+        only the largest children (by `measure`) of each parent are kept and
+        the rest are folded into one 'Other' leaf, bounding the node count.
+        """
+        path = list(path)
+        memo_key = ("hierarchy", tuple(path), top_n, measure, other_label, self._filter_key(filters))
+        if memo_key not in self._memo:
+            self._memo[memo_key] = self._build_hierarchy(path, top_n, measure, other_label, filters)
+        return self._memo[memo_key]
+
+    def _build_hierarchy(self, path, top_n, measure, other_label, filters):
+        levels, kept = [], None
+        for depth in range(1, len(path) + 1):
+            dims, parents, dim = path[:depth], path[:depth - 1], path[depth - 1]
+            level = self.rollup(dims, **filters)
+            if kept is not None:
+                # Children of folded 'Other' nodes are not drawn
+                level = level[pd.MultiIndex.from_frame(level[parents]).isin(pd.MultiIndex.from_frame(kept))]
+
+            other = None
+            if top_n and len(level):
+                values = level.groupby(parents, sort=False)[measure] if parents else level[measure]
+                ranks = values.rank(method='first', ascending=False)
+                rest, level = level[ranks > top_n], level[ranks <= top_n]
+                if len(rest):
+                    if parents:
+                        other = rest.groupby(parents, sort=False)[self.measures].sum().reset_index()
+                    else:
+                        other = rest[self.measures].sum().to_frame().T
+                    other = self._with_average(other)
+                    other[dim] = other_label
+            kept = level[dims]
+            if other is not None:
+                level = pd.concat([level, other[level.columns]], ignore_index=True)
+            levels.append(self._label_nodes(level.reset_index(drop=True), dims))
+        return pd.concat(levels, ignore_index=True)
+
+    def _label_nodes(self, level, dims):
+        """Adds id / parent / label / depth; ids are the NODE_SEP-joined key path."""
+        keys = level[dims].astype(str)
+        ids = keys[dims[0]]
+        for d in dims[1:]:
+            ids = ids + self.NODE_SEP + keys[d]
+        level['id'] = ids
+        level['parent'] = ids.str.rsplit(self.NODE_SEP, n=1).str[0] if len(dims) > 1 else ""
+        level['label'] = keys[dims[-1]]
+        level['depth'] = len(dims)
+        return level
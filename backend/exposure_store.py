@@ -0,0 +1,252 @@
+import pandas as pd
+from collections import defaultdict
+from datetime import datetime
+
+
+class ExposureAggregateStore:
+    """
+    Event-Sourced Exposure Ledger for SmartCash AI.
+    Keeps running open-AR aggregates keyed by
+    (Company_Code, Currency, Customer, ESG_Score) so treasury metrics can be
+    served from a continuous posting stream without rescanning the ledger.
+    """
+
+    KEY_COLUMNS = ['Company_Code', 'Currency', 'Customer', 'ESG_Score']
+    # Fill-ins for key columns missing from an event or ledger
+    KEY_DEFAULTS = {'Company_Code': 'Main', 'Currency': 'USD', 'Customer': 'Unknown', 'ESG_Score': 'N/A'}
+
+    # Supported event types (one O(1) state transition each)
+    INVOICE_CREATED = "INVOICE_CREATED"
+    INVOICE_PAID = "INVOICE_PAID"
+    INVOICE_PARTIALLY_PAID = "INVOICE_PARTIALLY_PAID"
+    INVOICE_DISPUTED = "INVOICE_DISPUTED"
+
+    # open_statuses defaults to the open-AR filter of TreasuryManager.calculate_liquidity_health
+    def __init__(self, amount_col='Amount', open_statuses=('Open',), check_interval=10000):
+        self.amount_col = amount_col
+        self.open_statuses = tuple(open_statuses)
+        self.check_interval = check_interval
+        self._reset()
+
+    def _reset(self):
+        # Invoice_ID -> {"key", "remaining", "disputed", "due_ordinal"}
+        self.invoices = {}
+        # Aggregate key -> [open_amount, open_count, disputed_amount, due_ordinal_sum]
+        self.aggregates = defaultdict(lambda: [0.0, 0, 0.0, 0])
+        self.by_customer = defaultdict(float)
+        self.by_currency = defaultdict(float)
+        self.by_esg = defaultdict(float)
+        self.total_open = 0.0
+        self.open_count = 0
+        self.due_ordinal_sum = 0
+        self.dated_count = 0
+        self.events_applied = 0
+        self.events_since_check = 0
+
+    # --- EVENT APPLICATION (O(1) per event) ---
+
+    def _post(self, key, amount, count, disputed_amount, due_ordinal):
+        """Applies a signed delta to every running aggregate touched by one key."""
+        agg = self.aggregates[key]
+        agg[0] += amount
+        agg[1] += count
+        agg[2] += disputed_amount
+        agg[3] += due_ordinal * count
+        if agg[1] == 0:
+            del self.aggregates[key]
+
+        company_code, currency, customer, esg_score = key
+        self.by_customer[customer] += amount
+        self.by_currency[currency] += amount
+        self.by_esg[esg_score] += amount
+        self.total_open += amount
+        self.open_count += count
+        self.due_ordinal_sum += due_ordinal * count
+        if due_ordinal:
+            self.dated_count += count
+
+    def _close(self, invoice_id):
+        inv = self.invoices.pop(invoice_id)
+        disputed_amt = inv["remaining"] if inv["disputed"] else 0.0
+        self._post(inv["key"], -inv["remaining"], -1, -disputed_amt, inv["due_ordinal"])
+
+    def _tick(self):
+        self.events_applied += 1
+        self.events_since_check += 1
+
+    def invoice_created(self, invoice_id, company_code, currency, customer, esg_score, amount, due_date=None, disputed=False):
+        """Registers a newly posted open invoice."""
+        if invoice_id in self.invoices:
+            self._close(invoice_id)
+
+        key = (str(company_code), str(currency), str(customer), str(esg_score))
+        amount = float(amount)
+        due_ordinal = pd.Timestamp(due_date).toordinal() if due_date is not None and not pd.isna(due_date) else 0
+
+        self.invoices[invoice_id] = {
+            "key": key, "remaining": amount, "disputed": bool(disputed), "due_ordinal": due_ordinal
+        }
+        self._post(key, amount, 1, amount if disputed else 0.0, due_ordinal)
+        self._tick()
+
+    def invoice_paid(self, invoice_id):
+        """Closes an invoice in full. Unknown IDs are ignored (already settled)."""
+        if invoice_id in self.invoices:
+            self._close(invoice_id)
+        self._tick()
+
+    def invoice_partially_paid(self, invoice_id, amount_paid):
+        """Reduces the remaining balance; a short-pay that clears the balance closes the invoice."""
+        inv = self.invoices.get(invoice_id)
+        if inv is not None:
+            applied = min(float(amount_paid), inv["remaining"])
+            if inv["remaining"] - applied <= 0.005:
+                self._close(invoice_id)
+            else:
+                inv["remaining"] -= applied
+                self._post(inv["key"], -applied, 0, -applied if inv["disputed"] else 0.0, inv["due_ordinal"])
+        self._tick()
+
+    def invoice_disputed(self, invoice_id, disputed=True):
+        """Freezes (or releases) the remaining balance of an invoice."""
+        inv = self.invoices.get(invoice_id)
+        if inv is not None and inv["disputed"] != bool(disputed):
+            inv["disputed"] = bool(disputed)
+            delta = inv["remaining"] if disputed else -inv["remaining"]
+            self._post(inv["key"], 0.0, 0, delta, inv["due_ordinal"])
+        self._tick()
+
+    def apply_event(self, event):
+        """
+        Dispatches a single posting event dict, e.g.
+        {"type": "INVOICE_PARTIALLY_PAID", "Invoice_ID": "INV-1", "Amount": 250.0}.
+        """
+        event_type = event["type"]
+        invoice_id = event["Invoice_ID"]
+
+        if event_type == self.INVOICE_CREATED:
+            self.invoice_created(
+                invoice_id,
+                *(event.get(col, self.KEY_DEFAULTS[col]) for col in self.KEY_COLUMNS),
+                event.get(self.amount_col, event.get('Amount', 0.0)),
+                due_date=event.get('Due_Date'),
+                disputed=event.get('Is_Disputed', False)
+            )
+        elif event_type == self.INVOICE_PAID:
+            self.invoice_paid(invoice_id)
+        elif event_type == self.INVOICE_PARTIALLY_PAID:
+            self.invoice_partially_paid(invoice_id, event.get('Amount', 0.0))
+        elif event_type == self.INVOICE_DISPUTED:
+            self.invoice_disputed(invoice_id, event.get('Is_Disputed', True))
+        else:
+            raise ValueError(f"Unsupported ledger event: {event_type}")
+
+    def apply_events(self, events):
+        for event in events:
+            self.apply_event(event)
+
+    # --- FULL REBUILD & CONSISTENCY ---
+
+    def _open_rows(self, invoices_df):
+        df = invoices_df
+        if 'Status' in df.columns:
+            df = df[df['Status'].isin(self.open_statuses)]
+        return df
+
+    def _key_frame(self, df):
+        """KEY_COLUMNS of `df`, with missing columns filled from KEY_DEFAULTS (as apply_event does)."""
+        return [df[c] if c in df.columns else pd.Series(self.KEY_DEFAULTS[c], index=df.index)
+                for c in self.KEY_COLUMNS]
+
+    def rebuild(self, invoices_df):
+        """Discards running state and reloads every open invoice from the ledger."""
+        self._reset()
+        df = self._open_rows(invoices_df)
+        if df.empty:
+            return self
+
+        disputed = df['Is_Disputed'].astype(bool) if 'Is_Disputed' in df.columns else pd.Series(False, index=df.index)
+        due = pd.to_datetime(df['Due_Date'], errors='coerce') if 'Due_Date' in df.columns else pd.Series(pd.NaT, index=df.index)
+
+        for inv_id, cc, ccy, cust, esg, amt, due_dt, flag in zip(
+            df['Invoice_ID'], *self._key_frame(df),
+            pd.to_numeric(df[self.amount_col], errors='coerce').fillna(0.0), due, disputed
+        ):
+            self.invoice_created(inv_id, cc, ccy, cust, esg, amt, due_date=due_dt, disputed=flag)
+
+        self.events_applied = 0
+        self.events_since_check = 0
+        return self
+
+    @classmethod
+    def from_ledger(cls, invoices_df, **kwargs):
+        return cls(**kwargs).rebuild(invoices_df)
+
+    def needs_consistency_check(self):
+        return self.events_since_check >= self.check_interval
+
+    def check_consistency(self, invoices_df, repair=True, tolerance=0.01):
+        """
+        Periodic control: recomputes the aggregates from the full ledger and
+        compares them to the running state. Drifted keys are reported and, if
+        `repair` is set, the store is rebuilt from the ledger.
+        """
+        df = self._open_rows(invoices_df)
+        if df.empty:
+            expected = {}
+        else:
+            amounts = pd.to_numeric(df[self.amount_col], errors='coerce').fillna(0.0)
+            grouped = amounts.groupby([col.astype(str) for col in self._key_frame(df)]).agg(['sum', 'count'])
+            expected = {key: (row['sum'], int(row['count'])) for key, row in grouped.iterrows()}
+
+        drift = {}
+        for key in set(expected) | set(self.aggregates):
+            exp_amt, exp_cnt = expected.get(key, (0.0, 0))
+            agg = self.aggregates.get(key, [0.0, 0, 0.0, 0])
+            if abs(exp_amt - agg[0]) > tolerance or exp_cnt != agg[1]:
+                drift[key] = {"expected": exp_amt, "running": agg[0]}
+
+        self.events_since_check = 0
+        if drift and repair:
+            self.rebuild(invoices_df)
+
+        return {"consistent": not drift, "drifted_keys": drift, "keys_checked": len(expected)}
+
+    # --- READ MODELS (served without scanning the ledger) ---
+
+    def get_open_ar(self, exclude_disputed=False):
+        if exclude_disputed:
+            return self.total_open - sum(agg[2] for agg in self.aggregates.values())
+        return self.total_open
+
+    def get_fx_exposure(self):
+        """Same shape as TreasuryManager.get_fx_exposure (currency -> open amount)."""
+        return {ccy: amt for ccy, amt in self.by_currency.items() if abs(amt) > 1e-9}
+
+    def get_esg_exposure(self):
+        return {esg: amt for esg, amt in self.by_esg.items() if abs(amt) > 1e-9}
+
+    def get_concentration_risk(self, threshold=0.20):
+        """Customers holding more than `threshold` of total open AR."""
+        if self.total_open <= 0:
+            return {}
+        return {
+            cust: amt / self.total_open
+            for cust, amt in self.by_customer.items()
+            if amt / self.total_open > threshold
+        }
+
+    def get_avg_days_overdue(self, today=None):
+        """Mean (today - Due_Date) in days across open invoices."""
+        if self.dated_count == 0:
+            return 0.0
+        today = today or datetime.now()
+        return pd.Timestamp(today).toordinal() - (self.due_ordinal_sum / self.dated_count)
+
+    def to_frame(self):
+        """Materializes the aggregate table (one row per key) for reporting."""
+        rows = [
+            (*key, agg[0], agg[1], agg[2])
+            for key, agg in self.aggregates.items()
+        ]
+        return pd.DataFrame(rows, columns=self.KEY_COLUMNS + ['Open_Amount', 'Open_Count', 'Disputed_Amount'])
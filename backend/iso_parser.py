@@ -1,6 +1,13 @@
+import time
 import pandas as pd
 from lxml import etree
 from datetime import datetime
+from backend.metrics import METRICS
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled) ---
+PARSE_ENTRIES = METRICS.counter("parser_entries_total", "camt.053 entries parsed")
+PARSE_ERRORS = METRICS.counter("parser_errors_total", "Statements that failed to parse")
+PARSE_SECONDS = METRICS.histogram("parser_statement_seconds", "camt.053 parse latency per statement")
 
 class ISO20022Parser:
     """
@@ -16,6 +23,7 @@ class ISO20022Parser:
         """
         Parses raw XML and returns a flattened Pandas DataFrame.
         """
+        started = time.perf_counter()
         try:
             tree = etree.fromstring(xml_content)
             transactions = []
@@ -44,9 +52,13 @@ class ISO20022Parser:
                     "Status": "Unmatched"
                 })
 
+            # entries/sec = rate(parser_entries_total) or entries / parser_statement_seconds_sum
+            PARSE_ENTRIES.inc(len(transactions))
+            PARSE_SECONDS.observe(time.perf_counter() - started)
             return pd.DataFrame(transactions)
         
         except Exception as e:
+            PARSE_ERRORS.inc()
             print(f"ISO Parsing Error: {e}")
             return pd.DataFrame()
 
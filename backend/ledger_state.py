@@ -0,0 +1,111 @@
+import numpy as np
+from datetime import datetime
+
+
+class InvoiceStateStore:
+    """
+    Keyed Invoice State Store for SmartCash AI.
+    Resolves Invoice_IDs through the shared ledger's hash index (O(1) per
+    key), applies single or bulk dispute freezes to a session overlay and
+    records every change in an append-only journal that feeds the
+    compliance vault.
+    """
+
+    DISPUTE_COL = 'Is_Disputed'
+    ACTIONS = {True: 'DISPUTE_FLAG', False: 'RESOLVED'}
+
+    def __init__(self, overlay, operator="TREASURY_ANALYST"):
+        self.overlay = overlay
+        self.operator = operator
+        self.journal = []
+        self._flushed = 0
+
+    @property
+    def shared(self):
+        return self.overlay.shared
+
+    # --- LOOKUPS ---
+
+    def position(self, invoice_id):
+        return self.shared.position_of(invoice_id)
+
+    def get(self, invoice_id, column):
+        return self.overlay.get(self.position(invoice_id), column)
+
+    def is_disputed(self, invoice_id):
+        return bool(self.get(invoice_id, self.DISPUTE_COL))
+
+    # --- UPDATES ---
+
+    def set_state(self, invoice_id, column, value, action_type=None, operator=None, detail=""):
+        """Single-invoice update: one hash lookup, one overlay write, one journal entry."""
+        pos = self.position(invoice_id)
+        old = self.overlay.get(pos, column)
+        if old == value:
+            return False
+        self.overlay.set(pos, column, value)
+        self._journal([invoice_id], [pos], column, [old], value,
+                      action_type or f"SET_{column.upper()}", operator, detail)
+        return True
+
+    def freeze(self, invoice_ids, operator=None, detail="Manual Dispute"):
+        return self._set_disputed(invoice_ids, True, operator, detail)
+
+    def unfreeze(self, invoice_ids, operator=None, detail="Issue Settled"):
+        return self._set_disputed(invoice_ids, False, operator, detail)
+
+    def _set_disputed(self, invoice_ids, flag, operator, detail):
+        """
+        Vectorized bulk freeze/unfreeze. Unknown ids and invoices already in
+        the target state are skipped. Returns the list of changed Invoice_IDs.
+        """
+        ids = np.atleast_1d(np.asarray(invoice_ids, dtype=object))
+        positions = self.shared.positions_of(ids)
+        known = positions >= 0
+        ids, positions = ids[known], positions[known]
+
+        current = self.overlay.column(self.DISPUTE_COL, positions).astype(bool)
+        change = current != flag
+        ids, positions = ids[change], positions[change]
+        if len(positions) == 0:
+            return []
+
+        self.overlay.set(positions, self.DISPUTE_COL, flag)
+        self._journal(ids, positions, self.DISPUTE_COL, current[change], flag,
+                      self.ACTIONS[flag], operator, detail)
+        return ids.tolist()
+
+    # --- JOURNAL ---
+
+    def _journal(self, ids, positions, column, old_values, new_value, action_type, operator, detail):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        amounts = self.shared.column('Amount_Remaining', positions) \
+            if 'Amount_Remaining' in self.shared.columns else np.zeros(len(positions))
+        operator = operator or self.operator
+        self.journal.extend(
+            {
+                "timestamp": timestamp,
+                "invoice_ref": str(inv),
+                "action_type": action_type,
+                "column": column,
+                "old": old.item() if hasattr(old, 'item') else old,
+                "new": new_value,
+                "amount": float(amt) if amt == amt else 0.0,
+                "operator": operator,
+                "detail": detail
+            }
+            for inv, old, amt in zip(ids, old_values, amounts)
+        )
+
+    def pending(self):
+        """Journal entries not yet written to the compliance vault."""
+        return self.journal[self._flushed:]
+
+    def flush_to_vault(self, vault):
+        """Signs and appends all pending entries to the vault in one bulk write."""
+        pending = self.pending()
+        if not pending:
+            return []
+        hashes = vault.log_actions(pending)
+        self._flushed = len(self.journal)
+        return hashes
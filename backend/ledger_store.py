@@ -0,0 +1,213 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Columnar storage is optional: without pyarrow the store falls back to CSV
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class LedgerStore:
+    """
+    Columnar Ledger Storage Layer for SmartCash AI.
+    Converts the raw invoice / bank feed CSVs once into typed, memory-mapped
+    Parquet and serves filtered slices (entity, customer, status) with the
+    predicates pushed down to the file reader.
+    """
+
+    # Low-cardinality fields stored as dictionary-encoded categoricals
+    CATEGORICAL_COLS = ['Currency', 'ESG_Score', 'Company_Code', 'Status']
+    # Global sort order of the Parquet file: row groups never span entities, and statuses cluster within one
+    SORT_COLS = ['Company_Code', 'Status', 'Customer']
+
+    INVOICE_RENAMES = {
+        'Invoice_No': 'Invoice_ID',
+        'Customer_Name': 'Customer',
+        'Amount': 'Amount_Remaining'
+    }
+    BANK_RENAMES = {
+        'Payer_Name': 'Customer',
+        'Amount_Received': 'Amount'
+    }
+    INVOICE_DEFAULTS = {
+        'Is_Disputed': False,
+        'Status': 'Open',
+        'ESG_Score': 'A',
+        'Currency': 'USD',
+        'Company_Code': 'Main'
+    }
+
+    def __init__(self, data_dir="data", cache_dir=None, chunksize=250_000, row_group_size=50_000):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, ".columnar")
+        self.chunksize = chunksize
+        self.row_group_size = row_group_size
+        self.sources = {
+            "invoices": os.path.join(data_dir, "invoices.csv"),
+            "bank_feed": os.path.join(data_dir, "bank_feed.csv")
+        }
+
+    # --- SCHEMA NORMALIZATION (formerly inline in main.py) ---
+
+    def normalize_invoices(self, inv_df):
+        """Header cleanup, ERP -> matcher renames, safety defaults and typing."""
+        inv_df.columns = inv_df.columns.str.strip()
+        inv_df = inv_df.rename(columns=self.INVOICE_RENAMES)
+
+        for col, default in self.INVOICE_DEFAULTS.items():
+            if col not in inv_df.columns:
+                inv_df[col] = default
+
+        inv_df['Amount_Remaining'] = pd.to_numeric(inv_df.get('Amount_Remaining'), errors='coerce')
+        inv_df['Due_Date'] = pd.to_datetime(inv_df.get('Due_Date'), errors='coerce')
+        inv_df['Is_Disputed'] = inv_df['Is_Disputed'].map(
+            lambda v: str(v).strip().lower() in ('true', '1', 'yes')
+        ).astype(bool)
+        return self._cast_categoricals(inv_df)
+
+    def normalize_bank_feed(self, bank_df):
+        bank_df.columns = bank_df.columns.str.strip()
+        bank_df = bank_df.rename(columns=self.BANK_RENAMES)
+        if 'Amount' in bank_df.columns:
+            bank_df['Amount'] = pd.to_numeric(bank_df['Amount'], errors='coerce')
+        return self._cast_categoricals(bank_df)
+
+    def _cast_categoricals(self, df):
+        for col in self.CATEGORICAL_COLS:
+            if col in df.columns:
+                df[col] = df[col].astype(str).astype('category')
+        return df
+
+    # --- ONE-TIME CONVERSION ---
+
+    def _parquet_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.parquet")
+
+    def _is_stale(self, name):
+        pq_path = self._parquet_path(name)
+        src = self.sources[name]
+        if not os.path.exists(pq_path):
+            return True
+        return os.path.exists(src) and os.path.getmtime(src) > os.path.getmtime(pq_path)
+
+    def _arrow_type(self, col, dtype):
+        """
+        Arrow type from the declared (normalized) column dtype rather than the
+        values, so a column that happens to be empty in the first chunk is not
+        frozen as the null type and int-looking amounts do not become int64.
+        """
+        if pd.api.types.is_bool_dtype(dtype):
+            return pa.bool_()
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return pa.from_numpy_dtype(dtype)
+        if pd.api.types.is_numeric_dtype(dtype):
+            return pa.float64()
+        # Everything else was read as text (read_csv(dtype=str)). Categoricals are
+        # stored as plain strings too: Parquet still dictionary-encodes the pages, but
+        # Arrow cannot prune row groups on dictionary-typed columns (re-encoded in _read)
+        return pa.string()
+
+    def _arrow_schema(self, sample_df):
+        return pa.schema([pa.field(col, self._arrow_type(col, dtype)) for col, dtype in sample_df.dtypes.items()])
+
+    def convert(self, name, force=False):
+        """
+        Streams the source CSV in chunks into a typed Parquet file.
+        The typed Arrow chunks are sorted globally by entity/status/customer
+        and written as row groups of at most `row_group_size` rows that never
+        span two entities, so row-group statistics let the reader skip every
+        slice a session never shows.
+        """
+        if not PYARROW_AVAILABLE:
+            return None
+        if not force and not self._is_stale(name):
+            return self._parquet_path(name)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        normalize = self.normalize_invoices if name == "invoices" else self.normalize_bank_feed
+        tmp_path = self._parquet_path(name) + ".tmp"
+
+        # pandas only ever holds one chunk; the dictionary-encoded Arrow tables are far smaller
+        tables = []
+        schema = None
+        for chunk in pd.read_csv(self.sources[name], dtype=str, chunksize=self.chunksize):
+            chunk = normalize(chunk)
+            if schema is None:
+                schema = self._arrow_schema(chunk)
+            tables.append(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if not tables:
+            return None
+        table = pa.concat_tables(tables)
+
+        sort_cols = [c for c in self.SORT_COLS if c in table.column_names]
+        if sort_cols:
+            table = table.sort_by([(c, 'ascending') for c in sort_cols])
+
+        bounds = [0, table.num_rows]
+        if 'Company_Code' in table.column_names and table.num_rows:
+            entity = table['Company_Code'].to_numpy(zero_copy_only=False)
+            bounds[1:1] = (np.flatnonzero(entity[1:] != entity[:-1]) + 1).tolist()
+
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                writer.write_table(table.slice(start, end - start), row_group_size=self.row_group_size)
+        os.replace(tmp_path, self._parquet_path(name))
+        return self._parquet_path(name)
+
+    # --- FILTERED READS (predicate pushdown) ---
+
+    @staticmethod
+    def _build_filters(**predicates):
+        filters = []
+        for col, value in predicates.items():
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) or not hasattr(value, '__iter__') else list(value)
+            filters.append((col, 'in', [str(v) for v in values]))
+        return filters or None
+
+    def _read(self, name, columns=None, **predicates):
+        path = self.convert(name)
+        if path is None:
+            return self._read_csv_fallback(name, columns, **predicates)
+
+        table = pq.read_table(
+            path, columns=columns, filters=self._build_filters(**predicates), memory_map=True
+        )
+        for col in self.CATEGORICAL_COLS:
+            if col in table.column_names:
+                i = table.column_names.index(col)
+                table = table.set_column(i, col, pc.dictionary_encode(table[col]))
+        return table.to_pandas()
+
+    def _read_csv_fallback(self, name, columns=None, **predicates):
+        if not os.path.exists(self.sources[name]):
+            return pd.DataFrame()
+        raw = pd.read_csv(self.sources[name], dtype=str)
+        df = self.normalize_invoices(raw) if name == "invoices" else self.normalize_bank_feed(raw)
+        for col, value in predicates.items():
+            if value is None or col not in df.columns:
+                continue
+            values = [value] if isinstance(value, str) or not hasattr(value, '__iter__') else list(value)
+            df = df[df[col].astype(str).isin([str(v) for v in values])]
+        return df[columns] if columns else df
+
+    def load_invoices(self, company_code=None, customer=None, status=None, columns=None):
+        """Loads only the ledger slice matching the given entity/customer/status filters."""
+        return self._read(
+            "invoices", columns=columns,
+            Company_Code=company_code, Customer=customer, Status=status
+        )
+
+    def load_bank_feed(self, company_code=None, currency=None, columns=None):
+        return self._read("bank_feed", columns=columns, Company_Code=company_code, Currency=currency)
+
+    def list_company_codes(self):
+        """Distinct entities, read from the Company_Code column only."""
+        df = self._read("invoices", columns=['Company_Code'])
+        return sorted(df['Company_Code'].astype(str).unique().tolist()) if not df.empty else []
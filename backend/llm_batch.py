@@ -0,0 +1,147 @@
+import time
+import random
+import asyncio
+import hashlib
+from backend.metrics import METRICS
+
+# Same series as GenAIAssistant's synchronous calls (the registry returns the existing metrics)
+LLM_CALL_SECONDS = METRICS.histogram("llm_call_seconds", "Model call latency (cache misses only)", ["outcome"])
+LLM_CACHE_LOOKUPS = METRICS.counter("llm_cache_lookups_total", "Response cache lookups", ["result"])
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+    `rate` tokens are refilled per second up to `capacity`; callers await
+    until enough tokens are available for their request cost.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, cost=1.0):
+        cost = min(float(cost), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                await asyncio.sleep((cost - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Shared LLM call limits: a semaphore on in-flight calls plus request and
+    (optionally) prompt-token buckets. Pass one instance to every run_batch
+    call that should draw from the same provider quota.
+    """
+
+    def __init__(self, max_concurrency=8, requests_per_second=10.0, tokens_per_second=None):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_second)
+        self.tokens = TokenBucket(tokens_per_second) if tokens_per_second else None
+
+    async def acquire(self, prompt):
+        """Waits for a request slot (and the prompt's estimated tokens) in the buckets."""
+        await self.requests.acquire()
+        if self.tokens is not None:
+            # Rough prompt-token estimate (~4 characters per token)
+            await self.tokens.acquire(max(1, len(prompt) // 4))
+
+
+class FakeLLMProvider:
+    """
+    Offline provider for tests and benchmarks.
+    Simulates network latency and transient failures, and records call
+    counts and peak concurrency so limits can be asserted.
+    """
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=42):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_concurrency = 0
+
+    async def complete(self, prompt, model, temperature):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_concurrency = max(self.peak_concurrency, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self._rng.random() < self.failure_rate:
+                raise ConnectionError("Simulated provider timeout (429/503)")
+            digest = hashlib.sha256(" ".join(prompt.split()).encode()).hexdigest()[:8]
+            return f"[FAKE:{model}:{digest}] Discrepancy likely due to bank fees. Resolution Path: Post with write-off."
+        finally:
+            self.in_flight -= 1
+
+
+class ClientProvider:
+    """Adapts the blocking OpenAI client to the async provider interface via a worker thread."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def complete(self, prompt, model, temperature):
+        response = await asyncio.to_thread(
+            self.client.chat.completions.create,
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+
+async def run_batch(prompts, provider, model, temperature, max_concurrency=8,
+                    requests_per_second=10.0, tokens_per_second=None,
+                    max_retries=3, backoff_base=0.5, cache=None, limiter=None):
+    """
+    Completes a list of prompts concurrently and returns answers in input order.
+    - Semaphore bounds in-flight calls.
+    - Token buckets enforce request (and optionally prompt-token) rates.
+    - A shared `limiter` (RateLimiter) replaces the per-call limits above, so
+      concurrent batches draw from one quota.
+    - Failures are retried with exponential backoff and full jitter; a prompt
+      that exhausts its retries yields the exception instead of an answer.
+    - Cache lookups and stores (SQLite) run in worker threads, off the event loop.
+    """
+    limiter = limiter or RateLimiter(max_concurrency, requests_per_second, tokens_per_second)
+
+    async def _one(prompt):
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, prompt, model, temperature)
+            LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+
+        last_error = None
+        for attempt in range(max_retries + 1):
+            await limiter.acquire(prompt)
+            async with limiter.semaphore:
+                started = time.perf_counter()
+                try:
+                    answer = await provider.complete(prompt, model, temperature)
+                    LLM_CALL_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+                    if cache is not None:
+                        await asyncio.to_thread(cache.put, prompt, model, temperature, answer)
+                    return answer
+                except Exception as e:
+                    LLM_CALL_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                    last_error = e
+            if attempt < max_retries:
+                await asyncio.sleep(random.uniform(0, backoff_base * (2 ** attempt)))
+        return last_error
+
+    return await asyncio.gather(*(_one(p) for p in prompts))
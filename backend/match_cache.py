@@ -0,0 +1,122 @@
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from backend.metrics import METRICS
+from backend.compact_ledger import CompactLedger
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled) ---
+MATCH_CACHE_LOOKUPS = METRICS.counter("match_cache_lookups_total", "Match-result cache lookups", ["result"])
+
+
+def frame_row_hashes(df, columns):
+    """Stable 64-bit content hash per row over the given columns."""
+    cols = [c for c in columns if c in df.columns]
+    if df.empty or not cols:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[cols].astype(str), index=False).to_numpy()
+
+
+def frame_fingerprint(df, columns):
+    """Content fingerprint of a whole frame (order-sensitive)."""
+    hashes = frame_row_hashes(df, columns)
+    return hashlib.sha256(hashes.tobytes() + json.dumps(sorted(columns)).encode()).hexdigest()
+
+
+def engine_fingerprint(engine):
+    """Fingerprint of the matching configuration (thresholds + alias registry + name backend)."""
+    config = {
+        "stp": engine.stp_threshold,
+        "review": engine.manual_review_threshold,
+        "aliases": sorted(engine.alias_map.items()),
+        "names": engine.name_scorer.name
+    }
+    return hashlib.sha256(json.dumps(config, default=str).encode()).hexdigest()
+
+
+class MatchResultCache:
+    """
+    Process-wide, bounded cache of Workbench match results.
+    Entries are keyed by (ledger fingerprint, engine fingerprint, bank-row
+    hash), so only new or changed bank rows are sent to the engine and a
+    ledger or config change naturally invalidates prior results.
+    """
+
+    LEDGER_COLS = ['Invoice_ID', 'Customer', 'Customer_Name', 'Amount', 'Currency', 'ESG_Score', 'Due_Date']
+    BANK_COLS = ['Customer', 'Amount', 'Currency']
+
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                MATCH_CACHE_LOOKUPS.inc(result="hit")
+                return True, self._entries[key]
+            self.misses += 1
+            MATCH_CACHE_LOOKUPS.inc(result="miss")
+            return False, None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def match_bank_feed(self, engine, bank_df, ledger_df):
+        """
+        Returns a list (aligned to bank_df rows) of the best candidate dict
+        per payment, or None / "Invalid Data" when nothing matched.
+        """
+        if bank_df.empty:
+            return []
+
+        # A CompactLedger carries its own content fingerprint
+        ledger_key = getattr(ledger_df, 'fingerprint', None) or frame_fingerprint(ledger_df, self.LEDGER_COLS)
+        prefix = (ledger_key, engine_fingerprint(engine))
+        row_hashes = frame_row_hashes(bank_df, self.BANK_COLS)
+
+        amounts = pd.to_numeric(bank_df['Amount'], errors='coerce').to_numpy()
+        payers = bank_df['Customer'].to_numpy()
+        currencies = bank_df['Currency'].astype(str).to_numpy() if 'Currency' in bank_df.columns else ['USD'] * len(bank_df)
+
+        results = []
+        ledger = None
+        for row_hash, amt, payer, ccy in zip(row_hashes, amounts, payers, currencies):
+            key = prefix + (int(row_hash),)
+            found, value = self._get(key)
+            if not found:
+                if pd.isna(amt) or pd.isna(payer) or not str(payer):
+                    value = "Invalid Data"
+                else:
+                    if ledger is None:
+                        # First miss: convert once and batch-score the feed's payer names
+                        ledger = ledger_df if isinstance(ledger_df, CompactLedger) else CompactLedger.from_frame(ledger_df)
+                        engine.prime_names([p for p in payers if not pd.isna(p)], ledger)
+                    matches = engine.run_match(float(amt), str(payer), ccy, ledger, top_k=1)
+                    value = matches[0] if matches else None
+                self._put(key, value)
+            results.append(value)
+        return results
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,294 @@
+"""
+Hot-path instrumentation for SmartCash AI.
+
+A small process-wide registry of counters, gauges and histograms that the
+parser, matcher, compliance vault, AI agent and pipeline record into. It is
+disabled by default: every recording call is then a single flag check, so
+instrumented code costs next to nothing unless metrics are switched on
+(SMARTCASH_METRICS=1, a metrics file/port, or METRICS.enable()).
+
+Metrics are exported in the Prometheus text format, either to a file that
+is rewritten periodically (for node_exporter's textfile collector) or over
+a local HTTP port.
+"""
+import os
+import time
+import bisect
+import threading
+from contextlib import nullcontext
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_DISABLED_TIMER = nullcontext()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry, name, help_text, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic total, e.g. payments matched or cache hits."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Point-in-time value, e.g. queue depth."""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Bucketed observations (latencies in seconds by default) with sum and count."""
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Context manager observing the elapsed wall time of its block."""
+        if not self.registry.enabled:
+            return _DISABLED_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def total(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [le])} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Named metrics for one process. Metrics are declared once at import time
+    by the modules that record them; `get-or-create` keeps declarations
+    idempotent across reloads (e.g. Streamlit reruns).
+    """
+
+    def __init__(self, namespace="smartcash", enabled=False):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._writer = None
+        self._stop = threading.Event()
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(self, full_name, help_text, labelnames, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {full_name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(f"{self.namespace}_{name}" if self.namespace else name)
+
+    def reset(self):
+        """Clears recorded values (declarations are kept)."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    # --- EXPORT ---
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines += metric.header() + metric.samples()
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically rewrites `path` (textfile-collector friendly)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(self.render())
+        os.replace(tmp_path, path)
+        return path
+
+    def export_to_file(self, path, interval=15.0):
+        """Enables recording and rewrites `path` every `interval` seconds on a daemon thread."""
+        self.enable()
+        if self._writer is None:
+            stop = self._stop
+
+            def _loop():
+                while not stop.wait(interval):
+                    self.write(path)
+            self.write(path)
+            self._writer = threading.Thread(target=_loop, name="metrics-file-export", daemon=True)
+            self._writer.start()
+        return self._writer
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Enables recording and serves /metrics on a local port from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.enable()
+        if self._server is None:
+            registry = self
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = registry.render().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((host, port), _Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+    def configure_from_env(self):
+        """
+        SMARTCASH_METRICS=1 enables recording; SMARTCASH_METRICS_FILE and
+        SMARTCASH_METRICS_PORT additionally start the file / HTTP exporters.
+        """
+        if os.getenv("SMARTCASH_METRICS", "").lower() in ("1", "true", "yes"):
+            self.enable()
+        if os.getenv("SMARTCASH_METRICS_FILE"):
+            self.export_to_file(os.environ["SMARTCASH_METRICS_FILE"],
+                                float(os.getenv("SMARTCASH_METRICS_INTERVAL", "15")))
+        if os.getenv("SMARTCASH_METRICS_PORT"):
+            self.serve(int(os.environ["SMARTCASH_METRICS_PORT"]))
+        return self
+
+    def shutdown(self):
+        """Stops the exporters (recording stays as configured)."""
+        self._stop.set()
+        self._stop, self._writer = threading.Event(), None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,146 @@
+import re
+import numpy as np
+from fuzzywuzzy import fuzz
+
+# scikit-learn (and scipy behind it) is only imported once a TF-IDF scorer is built
+
+
+class TokenSetScorer:
+    """
+    Default name-similarity backend for SmartCash AI.
+    fuzz.token_set_ratio per (payer, customer) pair, computed lazily for the
+    customers a payment actually touches and memoized on the ledger.
+    """
+
+    name = "token_set"
+
+    def prime(self, ledger, payers):
+        """Pairwise scoring has no batch form; customers are scored on demand."""
+        return 0
+
+    def scores(self, ledger, payer, codes):
+        """Similarity in [0, 1] of `payer` to the customers behind `codes`, plus the comparisons run."""
+        scores = ledger.remember(("token_set_ratio", payer), lambda: np.full(len(ledger.customers), np.nan))
+        missing = np.unique(codes[np.isnan(scores[codes])])
+        for code in missing:
+            scores[code] = fuzz.token_set_ratio(payer, ledger.clean_customers[code]) / 100
+        return scores[codes], len(missing)
+
+
+class TfidfNameScorer:
+    """
+    Sparse Character N-Gram Name Matcher for SmartCash AI.
+    Customer names are vectorized into character n-gram TF-IDF once per
+    ledger; a batch of payer names is then scored against every customer
+    with one sparse matrix product. Cosine similarities are mapped onto the
+    token_set_ratio scale by an isotonic fit on the ledger's own names (and
+    abbreviated / misspelt variants of them), so engine thresholds keep
+    their meaning whichever backend is selected.
+    """
+
+    name = "tfidf"
+
+    def __init__(self, ngram_range=(2, 4), calibration_names=32, batch_size=1024):
+        try:
+            import sklearn  # noqa: F401
+        except ImportError as e:
+            raise ImportError("TfidfNameScorer requires scikit-learn (pip install scikit-learn)") from e
+        self.ngram_range = tuple(ngram_range)
+        self.calibration_names = calibration_names
+        self.batch_size = batch_size
+
+    # --- MODEL (once per ledger) ---
+
+    def _model(self, ledger):
+        return ledger.model(("tfidf", self.ngram_range, self.calibration_names),
+                            lambda: self._fit(ledger.clean_customers))
+
+    def _fit(self, names):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=self.ngram_range, sublinear_tf=True,
+                                     lowercase=True, dtype=np.float32)
+        matrix = vectorizer.fit_transform([str(n) for n in names])
+        return {"vectorizer": vectorizer, "matrix": matrix.T.tocsr(), "calibration": self._calibrate(vectorizer, names)}
+
+    def _calibrate(self, vectorizer, names):
+        """Isotonic cosine -> token_set_ratio map (as interpolation knots)."""
+        from sklearn.isotonic import IsotonicRegression
+        # Evenly spaced over the distinct names, so the sample spans the whole ledger
+        distinct = list(dict.fromkeys(str(n) for n in names if str(n).strip()))
+        picks = np.linspace(0, len(distinct) - 1, num=min(self.calibration_names, len(distinct))).round().astype(int)
+        sample = [distinct[i] for i in np.unique(picks)]
+        queries = set()
+        for n in sample:
+            # Typical bank-feed noise: typos, reordering, separators, suffixes, abbreviations
+            third = max(1, len(n) // 3)
+            tokens = n.split()
+            queries.update({
+                n, n[:third] + n[third + 1:], n[:-third] + n[-third + 1:],
+                n[:third] + n[third + 1] + n[third] + n[third + 2:] if len(n) > third + 2 else n,
+                " ".join(reversed(tokens)), "_".join(tokens), "-".join(tokens), f"{n} ltd", f"{n} (remit)",
+                " ".join([re.sub(r"(?<=.)[aeiou]", "", tokens[0])] + tokens[1:]) if tokens else n
+            })
+        queries = sorted(q for q in queries if q.strip())
+        cosine = (vectorizer.transform(queries) @ vectorizer.transform(sample).T).toarray().ravel()
+        ratio = np.array([fuzz.token_set_ratio(q, n) / 100 for q in queries for n in sample])
+
+        # Anchors: no shared n-grams reads as unrelated, identical strings as a full match
+        x = np.concatenate([cosine, [0.0, 1.0]])
+        y = np.concatenate([ratio, [0.0, 1.0]])
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, increasing=True, out_of_bounds="clip").fit(x, y)
+        return iso.X_thresholds_, iso.y_thresholds_
+
+    # --- SCORING ---
+
+    def similarity(self, ledger, payers):
+        """Raw cosine similarity (payers x customers) from one sparse product."""
+        model = self._model(ledger)
+        return (model["vectorizer"].transform([str(p) for p in payers]) @ model["matrix"]).toarray()
+
+    def score_batch(self, ledger, payers):
+        """Calibrated similarity (payers x customers) on the token_set_ratio scale."""
+        knots_x, knots_y = self._model(ledger)["calibration"]
+        return np.interp(self.similarity(ledger, payers), knots_x, knots_y)
+
+    def prime(self, ledger, payers):
+        """Scores every not-yet-seen payer in batches and memoizes the rows on the ledger."""
+        pending = [p for p in dict.fromkeys(payers) if ("tfidf", p) not in ledger.memo]
+        # Rows beyond what the memo holds would only evict the ones primed before them
+        pending = pending[:ledger.MEMO_LIMIT // 2]
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            for payer, row in zip(batch, self.score_batch(ledger, batch)):
+                ledger.remember(("tfidf", payer), lambda row=row: row)
+        return len(pending) * len(ledger.customers)
+
+    def scores(self, ledger, payer, codes):
+        computed = 0 if ("tfidf", payer) in ledger.memo else len(ledger.customers)
+        row = ledger.remember(("tfidf", payer), lambda: self.score_batch(ledger, [payer])[0])
+        return row[codes], computed
+
+    def top_k(self, ledger, payers, k=5):
+        """Best k customers per payer as [(customer, score), ...], best first."""
+        scores = self.score_batch(ledger, payers)
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in payers]
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, idx in zip(scores, best):
+            idx = idx[np.argsort(-row[idx], kind="stable")]
+            results.append([(ledger.customers[i], round(float(row[i]), 4)) for i in idx])
+        return results
+
+
+NAME_SCORERS = {"token_set": TokenSetScorer, "tfidf": TfidfNameScorer}
+
+
+def make_name_scorer(scorer=None):
+    """Resolves a scorer instance from a backend name ('token_set', 'tfidf') or passes an instance through."""
+    if scorer is None:
+        return TokenSetScorer()
+    if isinstance(scorer, str):
+        if scorer not in NAME_SCORERS:
+            raise ValueError(f"Unknown name scorer '{scorer}' (expected one of {sorted(NAME_SCORERS)})")
+        return NAME_SCORERS[scorer]()
+    return scorer
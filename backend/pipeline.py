@@ -0,0 +1,506 @@
+"""
+Event-driven reconciliation pipeline for SmartCash AI.
+
+Watches an inbox directory for camt.053 statements and streams every
+payment through bounded asyncio stages, each with its own worker pool:
+
+    watch -> parse -> match -> reason (exceptions only) -> log
+
+    python -m backend.pipeline --inbox data/inbox --ledger data/invoices.csv
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+from collections import deque
+import numpy as np
+from backend.engine import SmartMatchingEngine
+from backend.iso_parser import ISO20022Parser
+from backend.compact_ledger import CompactLedger
+from backend.llm_batch import RateLimiter
+from backend.metrics import METRICS
+
+# --- INSTRUMENTATION (no-ops unless METRICS is enabled) ---
+# The "log" stage is the compliance vault's write queue.
+STAGE_SECONDS = METRICS.histogram("pipeline_stage_seconds", "Per-batch handler latency by stage", ["stage"])
+STAGE_DEPTH = METRICS.gauge("pipeline_queue_depth", "Items waiting in a stage queue (incl. overflow)", ["stage"])
+
+
+class PipelineStage:
+    """
+    Bounded queue plus a fixed worker pool for one pipeline stage.
+    Tracks backlog, in-flight work and a rolling window of per-batch latency.
+    """
+
+    def __init__(self, name, concurrency, queue_size, batch_size=1, window=1000):
+        self.name = name
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        # Items handed off while the queue was full (non-blocking producers only)
+        self.overflow = deque()
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.spilled = 0
+        self._latencies = deque(maxlen=window)
+
+    @property
+    def backlog(self):
+        return self.queue.qsize() + len(self.overflow)
+
+    @property
+    def idle(self):
+        return self.backlog == 0 and self.in_flight == 0
+
+    async def put(self, item):
+        """Blocking hand-off: the producer waits while this stage is full (backpressure)."""
+        await self.queue.put(item)
+        STAGE_DEPTH.set(self.backlog, stage=self.name)
+
+    def offer(self, item):
+        """Non-blocking hand-off: never stalls the producer; spills to overflow when full."""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflow.append(item)
+            self.spilled += 1
+        STAGE_DEPTH.set(self.backlog, stage=self.name)
+
+    def refill(self):
+        while self.overflow and not self.queue.full():
+            self.queue.put_nowait(self.overflow.popleft())
+
+    async def take(self):
+        """Waits for one item, then drains up to batch_size without waiting."""
+        items = [await self.queue.get()]
+        while len(items) < self.batch_size and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def record(self, seconds):
+        self._latencies.append(seconds)
+        STAGE_SECONDS.observe(seconds, stage=self.name)
+        STAGE_DEPTH.set(self.backlog, stage=self.name)
+
+    def stats(self):
+        latencies = np.asarray(self._latencies) * 1000 if self._latencies else np.zeros(1)
+        return {
+            "stage": self.name,
+            "workers": self.concurrency,
+            "backlog": self.backlog,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "spilled": self.spilled,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "max_ms": round(float(latencies.max()), 2)
+        }
+
+
+class ReconciliationPipeline:
+    """
+    Async Statement-to-Audit Pipeline for SmartCash AI.
+    Parsing and matching form the critical path and apply backpressure to
+    each other through bounded queues; blocking parser/engine/vault calls
+    run on worker threads. Results are published the moment a payment is
+    matched. The match stage hands work to the LLM and disk stages without
+    waiting: reasoning is shed once its backlog passes `max_reason_backlog`,
+    and audit records spill into an overflow buffer, so a slow model or disk
+    cannot stall intraday posting.
+    Every payment reaches the audit log: a failed reasoning call is logged
+    with an error note, and a vault write that still fails after
+    `log_retries` attempts is appended to a dead-letter file (JSON lines).
+    A statement is archived only once its last record has been logged.
+    """
+
+    STATEMENT_SUFFIXES = (".xml", ".camt", ".053")
+
+    def __init__(self, ledger, engine=None, assistant=None, vault=None, inbox_dir=None, archive_dir=None,
+                 parse_workers=2, match_workers=4, reason_workers=4, log_workers=1,
+                 queue_size=1000, reason_batch=8, log_batch=500, max_reason_backlog=5000,
+                 poll_interval=0.25, operator="RECON_PIPELINE", llm_provider=None, on_result=None,
+                 log_retries=3, log_retry_delay=0.5, dead_letter_path=None,
+                 llm_concurrency=8, llm_requests_per_second=10.0, llm_tokens_per_second=None):
+        # The matcher scores on the compact array form, converted once here
+        self.ledger = ledger if isinstance(ledger, CompactLedger) else CompactLedger.from_frame(ledger)
+        self.engine = engine or SmartMatchingEngine()
+        self.parser = ISO20022Parser()
+        self.assistant = assistant
+        self.vault = vault
+        self.llm_provider = llm_provider
+        self.inbox_dir = inbox_dir
+        self.archive_dir = archive_dir or (os.path.join(inbox_dir, "processed") if inbox_dir else None)
+        self.poll_interval = poll_interval
+        self.operator = operator
+        self.max_reason_backlog = max_reason_backlog
+        # One LLM quota for all reason workers (a limiter per batch would restart each burst)
+        self.llm_limiter = RateLimiter(llm_concurrency, llm_requests_per_second, llm_tokens_per_second)
+        self.on_result = on_result
+        self.log_retries = log_retries
+        self.log_retry_delay = log_retry_delay
+        self.dead_letter_path = dead_letter_path or (
+            os.path.join(os.path.dirname(self.archive_dir), "failed", "audit_dead_letter.jsonl")
+            if self.archive_dir else None
+        )
+
+        self.parse = PipelineStage("parse", parse_workers, queue_size)
+        self.match = PipelineStage("match", match_workers, queue_size)
+        self.reason = PipelineStage("reason", reason_workers, queue_size, batch_size=reason_batch)
+        self.log = PipelineStage("log", log_workers, queue_size, batch_size=log_batch)
+        self.stages = [self.parse, self.match, self.reason, self.log]
+
+        self.results = deque(maxlen=10_000)
+        self.errors = deque(maxlen=100)
+        self.statements = 0
+        self.payments = 0
+        self.shed = 0
+        self.dead_lettered = 0
+        # Audit records that could be written neither to the vault nor to the dead-letter file
+        self.unlogged = []
+        # Statement path -> payments not yet logged (archived when it reaches zero)
+        self._open_statements = {}
+        self._post_latency = deque(maxlen=10_000)
+        self._queued = set()
+        self._tasks = []
+
+    # --- LIFECYCLE ---
+
+    async def start(self):
+        handlers = {self.parse: self._parse, self.match: self._match, self.reason: self._reason, self.log: self._log}
+        for stage, handler in handlers.items():
+            self._tasks += [asyncio.create_task(self._worker(stage, handler)) for _ in range(stage.concurrency)]
+        if self.inbox_dir:
+            os.makedirs(self.inbox_dir, exist_ok=True)
+            self._tasks.append(asyncio.create_task(self._watch()))
+
+    async def submit(self, path):
+        """Queues one statement file directly (bypassing the inbox watcher)."""
+        self._queued.add(path)
+        await self.parse.put({"path": path, "arrived": time.monotonic()})
+
+    async def wait_idle(self, timeout=None, settle=0.01):
+        """Waits until every stage is drained and no queued statement is still unparsed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queued or not all(stage.idle for stage in self.stages):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("Pipeline did not drain in time.")
+            await asyncio.sleep(settle)
+
+    async def stop(self, drain=True, timeout=None):
+        if drain:
+            await self.wait_idle(timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self, duration=None, report_every=None, report=None):
+        """Runs the watcher and all stages; `duration=None` runs until cancelled."""
+        report = report or self._print_stats
+        await self.start()
+        started = time.monotonic()
+        try:
+            while duration is None or time.monotonic() - started < duration:
+                await asyncio.sleep(report_every or self.poll_interval)
+                if report_every:
+                    report(self.stats())
+        finally:
+            await self.stop(drain=True)
+        return self.stats()
+
+    async def _worker(self, stage, handler):
+        while True:
+            items = await stage.take()
+            stage.in_flight += len(items)
+            start = time.perf_counter()
+            try:
+                await handler(items)
+                stage.processed += len(items)
+            except Exception as e:
+                stage.failed += len(items)
+                self.errors.append((stage.name, repr(e)))
+            finally:
+                stage.record(time.perf_counter() - start)
+                stage.in_flight -= len(items)
+                for _ in items:
+                    stage.queue.task_done()
+                stage.refill()
+
+    # --- STAGES ---
+
+    async def _watch(self):
+        """Polls the inbox; a file is queued once its size is stable across two polls."""
+        sizes = {}
+        while True:
+            for path, size in await asyncio.to_thread(self._scan_inbox):
+                if path in self._queued:
+                    continue
+                if sizes.get(path) == size:
+                    del sizes[path]
+                    self._queued.add(path)
+                    await self.parse.put({"path": path, "arrived": time.monotonic()})
+                else:
+                    sizes[path] = size
+            await asyncio.sleep(self.poll_interval)
+
+    def _scan_inbox(self):
+        found = []
+        with os.scandir(self.inbox_dir) as entries:
+            for e in entries:
+                if not (e.is_file() and e.name.lower().endswith(self.STATEMENT_SUFFIXES)):
+                    continue
+                try:
+                    found.append((e.path, e.stat().st_size))
+                except FileNotFoundError:
+                    # Archived (or removed) between listing and stat
+                    continue
+        return found
+
+    def _read_statement(self, path):
+        """Parses one statement (archiving happens once its payments are logged)."""
+        with open(path, "rb") as fh:
+            frame = self.parser.parse_camt053(fh.read())
+        # Batch name backends score the whole statement's payers in one go
+        if not frame.empty:
+            self.engine.prime_names(frame["Payer_Name"].dropna(), self.ledger)
+        return frame
+
+    def _archive(self, path, failed=False):
+        """Moves a finished statement to processed/ (or failed/ when it had no readable entries)."""
+        if self.archive_dir:
+            target = os.path.join(os.path.dirname(self.archive_dir), "failed") if failed else self.archive_dir
+            os.makedirs(target, exist_ok=True)
+            shutil.move(path, os.path.join(target, os.path.basename(path)))
+
+    async def _parse(self, jobs):
+        for job in jobs:
+            path = job["path"]
+            try:
+                frame = await asyncio.to_thread(self._read_statement, path)
+            except Exception:
+                self._queued.discard(path)
+                raise
+            statement = os.path.splitext(os.path.basename(path))[0]
+            self.statements += 1
+            if frame.empty:
+                try:
+                    await asyncio.to_thread(self._archive, path, True)
+                finally:
+                    self._queued.discard(path)
+                continue
+
+            # The file stays queued (so the watcher skips it) until its last record is logged
+            self._open_statements[path] = len(frame)
+            rows = zip(frame.get("Amount", []), frame.get("Payer_Name", []), frame.get("Currency", []),
+                       frame.get("Reference_Text", []), frame.get("Date", []))
+            for i, (amount, payer, currency, reference, booked) in enumerate(rows):
+                self.payments += 1
+                await self.match.put({
+                    "payment_id": f"{statement}-{i}", "statement": statement, "amount": float(amount),
+                    "payer": payer, "currency": currency, "reference": reference, "booking_date": booked,
+                    "arrived": job["arrived"], "source": path
+                })
+
+    async def _match(self, payments):
+        for payment in payments:
+            try:
+                matches = await asyncio.to_thread(self._top_matches, payment)
+                failure = None
+            except Exception as e:
+                # Still posted and logged as an exception, so the audit trail stays complete
+                self.errors.append((self.match.name, repr(e)))
+                matches, failure = [], f"EXCEPTION: Match Error ({type(e).__name__})"
+            best = matches[0] if matches else {}
+            result = {
+                **payment,
+                "invoice": best.get("Invoice_ID"),
+                "customer": best.get("Customer"),
+                "confidence": best.get("confidence", 0.0),
+                "status": failure or best.get("status", "EXCEPTION: No Candidate"),
+                "reasoning": None
+            }
+            if result["confidence"] >= self.engine.manual_review_threshold:
+                result["action"] = "RECON_STP" if result["status"].startswith("STP") else "RECON_REVIEW"
+                self._publish(result)
+                self.log.offer(result)
+                continue
+
+            result["action"] = "RECON_EXCEPTION"
+            self._publish(result)
+            if self.assistant is not None and self.reason.backlog < self.max_reason_backlog:
+                self.reason.offer((result, matches[:3]))
+            else:
+                if self.assistant is not None:
+                    self.shed += 1
+                    result["reasoning"] = "Reasoning skipped: LLM backlog"
+                self.log.offer(result)
+
+    def _top_matches(self, payment):
+        """Top 3 candidates (context for exception reasoning); unique STP hits end scoring early."""
+        return list(self.engine.iter_matches(
+            payment["amount"], payment["payer"], payment["currency"], self.ledger, top_k=3
+        ))
+
+    def _publish(self, result):
+        result["posted_latency_ms"] = round((time.monotonic() - result["arrived"]) * 1000, 2)
+        self._post_latency.append(result["posted_latency_ms"])
+        self.results.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+
+    async def _reason(self, batch):
+        prompts = [
+            ({k: r[k] for k in ("amount", "payer", "currency", "reference")},
+             [{k: m[k] for k in ("Invoice_ID", "Customer", "Amount", "confidence")} for m in matches])
+            for r, matches in batch
+        ]
+        try:
+            answers = await self.assistant.reason_exceptions_async(
+                prompts, provider=self.llm_provider, limiter=self.llm_limiter
+            )
+        except Exception as e:
+            # The batch still goes to the audit log; the worker counts it as failed
+            for result, _ in batch:
+                result["reasoning"] = f"Reasoning failed: {e!r}"
+                self.log.offer(result)
+            raise
+        for (result, _), answer in zip(batch, answers):
+            result["reasoning"] = answer
+            self.log.offer(result)
+
+    async def _log(self, results):
+        if self.vault is not None:
+            records = [
+                {"invoice_ref": r["invoice"] or r["payment_id"], "action_type": r["action"],
+                 "amount": r["amount"], "operator": self.operator}
+                for r in results
+            ]
+            await self._write_audit(records)
+        for path in [r["source"] for r in results if "source" in r]:
+            self._open_statements[path] -= 1
+            if self._open_statements[path] == 0:
+                del self._open_statements[path]
+                try:
+                    await asyncio.to_thread(self._archive, path)
+                finally:
+                    self._queued.discard(path)
+
+    async def _write_audit(self, records):
+        """Vault write with exponential backoff; what still fails goes to the dead-letter file."""
+        for attempt in range(self.log_retries + 1):
+            try:
+                await asyncio.to_thread(self.vault.log_actions, records)
+                return
+            except Exception as e:
+                self.errors.append((self.log.name, repr(e)))
+                if attempt < self.log_retries:
+                    await asyncio.sleep(self.log_retry_delay * 2 ** attempt)
+        self.dead_lettered += len(records)
+        if self.dead_letter_path:
+            try:
+                await asyncio.to_thread(self._dead_letter, records)
+                return
+            except OSError as e:
+                self.errors.append((self.log.name, repr(e)))
+        self.unlogged.extend(records)
+
+    def _dead_letter(self, records):
+        os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+        with open(self.dead_letter_path, "a") as fh:
+            fh.writelines(json.dumps(r, default=str) + "\n" for r in records)
+
+    # --- METRICS ---
+
+    def stats(self):
+        latencies = np.asarray(self._post_latency) if self._post_latency else np.zeros(1)
+        return {
+            "statements": self.statements,
+            "payments": self.payments,
+            "posted": len(self._post_latency),
+            "reasoning_shed": self.shed,
+            "dead_lettered": self.dead_lettered,
+            "post_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "post_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "stages": [stage.stats() for stage in self.stages]
+        }
+
+    @staticmethod
+    def _print_stats(stats):
+        stages = " | ".join(
+            f"{s['stage']} backlog={s['backlog']} p95={s['p95_ms']}ms" for s in stats["stages"]
+        )
+        print(
+            f"[pipeline] {stats['statements']} statements | {stats['payments']:,} payments | "
+            f"post p95 {stats['post_p95_ms']}ms | {stages}",
+            file=sys.stderr, flush=True
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.pipeline", description="Watched-inbox reconciliation pipeline.")
+    parser.add_argument("--inbox", default="data/inbox", help="Directory watched for camt.053 statements")
+    parser.add_argument("--ledger", default="data/invoices.csv", help="Invoice ledger (.csv or .parquet)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run (default: until interrupted)")
+    parser.add_argument("--poll", type=float, default=0.25, help="Inbox poll interval in seconds")
+    parser.add_argument("--parse-workers", type=int, default=2)
+    parser.add_argument("--match-workers", type=int, default=4)
+    parser.add_argument("--reason-workers", type=int, default=4)
+    parser.add_argument("--log-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="In-flight LLM calls across all reason workers")
+    parser.add_argument("--llm-rps", type=float, default=10.0, help="LLM requests per second across all reason workers")
+    parser.add_argument("--report-every", type=float, default=5.0)
+    parser.add_argument("--no-reasoning", action="store_true", help="Skip LLM reasoning for exceptions")
+    parser.add_argument("--no-vault", action="store_true", help="Do not post results to the compliance log")
+    parser.add_argument("--vault-path", default="data/compliance_log.csv")
+    parser.add_argument("--metrics-file", default=None, help="Rewrite Prometheus metrics to this file")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--name-scorer", choices=["token_set", "tfidf"], default="token_set",
+                        help="Name-similarity backend for the matcher")
+    args = parser.parse_args(argv)
+
+    METRICS.configure_from_env()
+    if args.metrics_file:
+        METRICS.export_to_file(args.metrics_file)
+    if args.metrics_port:
+        METRICS.serve(args.metrics_port)
+
+    from backend.reconcile import BatchReconciler
+    engine = SmartMatchingEngine(name_scorer=args.name_scorer)
+    ledger = BatchReconciler(engine=engine).load_ledger(args.ledger)
+
+    assistant = None
+    if not args.no_reasoning:
+        from backend.ai_agent import GenAIAssistant
+        assistant = GenAIAssistant()
+    vault = None
+    if not args.no_vault:
+        from backend.compliance import ComplianceVault
+        vault = ComplianceVault(ledger_path=args.vault_path)
+
+    pipeline = ReconciliationPipeline(
+        ledger, engine=engine, assistant=assistant, vault=vault, inbox_dir=args.inbox, poll_interval=args.poll,
+        parse_workers=args.parse_workers, match_workers=args.match_workers, reason_workers=args.reason_workers,
+        log_workers=args.log_workers, queue_size=args.queue_size,
+        llm_concurrency=args.llm_concurrency, llm_requests_per_second=args.llm_rps
+    )
+    try:
+        asyncio.run(pipeline.run(duration=args.duration, report_every=args.report_every))
+    except KeyboardInterrupt:
+        pass
+    if args.metrics_file:
+        METRICS.write(args.metrics_file)
+    METRICS.shutdown()
+    stats = pipeline.stats()
+    print(f"Processed {stats['statements']} statements / {stats['payments']:,} payments "
+          f"(post p95 {stats['post_p95_ms']}ms) from {args.inbox}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Headless batch reconciliation for SmartCash AI.
+
+Streams a bank feed through the SmartMatchingEngine in bounded chunks and
+writes matches / review cases / exceptions incrementally, so nightly runs can execute on
+batch hosts without a browser session:
+
+    python -m backend.reconcile --bank data/bank_feed.csv --ledger data/invoices.csv \
+        --out data/recon --format parquet --chunksize 20000
+"""
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from backend.engine import SmartMatchingEngine
+from backend.ledger_store import LedgerStore
+from backend.compact_ledger import CompactLedger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def iter_frames(path, chunksize, columns=None):
+    """Yields DataFrame chunks (all values as strings) from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Reading Parquet input requires pyarrow.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas().astype(str)
+    else:
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize, usecols=columns)
+
+
+class _ChunkWriter:
+    """Appends result chunks to one CSV or Parquet file as they are produced."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._columns = None
+
+    def write(self, df):
+        self._columns = self._columns or list(df.columns)
+        if df.empty:
+            return
+        if self.fmt == "parquet":
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                # All-null columns in the first chunk would otherwise pin a null type
+                self._schema = pa.schema([
+                    pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type) for f in table.schema
+                ])
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        elif self.rows == 0 and self._columns is not None:
+            # No rows in this category: still leave a header-only file for downstream jobs
+            empty = pd.DataFrame({c: pd.Series(dtype=str) for c in self._columns})
+            if self.fmt == "parquet":
+                empty.to_parquet(self.path, index=False)
+            else:
+                empty.to_csv(self.path, index=False)
+
+
+class BatchReconciler:
+    """
+    Chunked bank-feed reconciliation with bounded memory.
+    Only the matcher columns of the ledger are kept resident; the bank feed
+    is read, matched and written one chunk at a time. Only STP results are
+    written as matches and posted to the compliance vault chunk by chunk;
+    candidates that clear the manual-review threshold without STP go to a
+    separate review file, and everything else is an exception.
+    """
+
+    LEDGER_COLS = ['Invoice_ID', 'Customer', 'Amount', 'Currency', 'ESG_Score', 'Due_Date']
+    RESULT_COLS = ['Matched_Invoice', 'Matched_Customer', 'Confidence', 'Match_Status']
+
+    def __init__(self, engine=None, vault=None, chunksize=50_000, operator="RECON_BATCH", progress=None):
+        self.engine = engine or SmartMatchingEngine()
+        self.vault = vault
+        self.chunksize = chunksize
+        self.operator = operator
+        self.progress = progress if progress is not None else self._print_progress
+        self._normalizer = LedgerStore()
+
+    @staticmethod
+    def _print_progress(stats):
+        print(
+            f"[reconcile] {stats['rows']:,} payments | {stats['matched']:,} matched | "
+            f"{stats['review']:,} review | {stats['exceptions']:,} exceptions | {stats['rows_per_sec']:,.0f} rows/s",
+            file=sys.stderr, flush=True
+        )
+
+    def load_ledger(self, path):
+        """Reads the ledger in chunks, keeping only the columns the engine scores on."""
+        parts = []
+        for chunk in iter_frames(path, self.chunksize):
+            chunk = self._normalizer.normalize_invoices(chunk).rename(columns={'Amount_Remaining': 'Amount'})
+            keep = [c for c in self.LEDGER_COLS if c in chunk.columns]
+            parts.append(chunk[keep].astype({c: str for c in keep if c != 'Amount'}))
+        if not parts:
+            return pd.DataFrame(columns=self.LEDGER_COLS)
+        return pd.concat(parts, ignore_index=True)
+
+    def match_chunk(self, bank_chunk, ledger):
+        """Best candidate per payment plus a match status (STP / EXCEPTION / INVALID)."""
+        bank_chunk = self._normalizer.normalize_bank_feed(bank_chunk)
+        bank_chunk = bank_chunk.astype({c: str for c in bank_chunk.select_dtypes('category').columns})
+
+        amounts = pd.to_numeric(bank_chunk.get('Amount'), errors='coerce')
+        payers = bank_chunk['Customer'] if 'Customer' in bank_chunk.columns else pd.Series(None, index=bank_chunk.index)
+        currencies = bank_chunk['Currency'] if 'Currency' in bank_chunk.columns else pd.Series('USD', index=bank_chunk.index)
+
+        self.engine.prime_names(payers.dropna(), ledger)
+        results = []
+        for amt, payer, ccy in zip(amounts, payers, currencies):
+            if pd.isna(amt) or pd.isna(payer) or not str(payer):
+                results.append((None, None, 0.0, "INVALID: Missing Amount/Payer"))
+                continue
+            # Only the best candidate is kept; unique STP hits end scoring early
+            best = next(self.engine.iter_matches(float(amt), str(payer), ccy, ledger, top_k=1), None)
+            if best is None:
+                results.append((None, None, 0.0, "EXCEPTION: No Candidate"))
+                continue
+            results.append((best['Invoice_ID'], best['Customer'], best['confidence'], best['status']))
+
+        out = bank_chunk.copy()
+        out[self.RESULT_COLS] = pd.DataFrame(results, columns=self.RESULT_COLS, index=bank_chunk.index)
+        return out
+
+    def run(self, bank_path, ledger_path, out_dir, fmt="csv"):
+        """Streams the bank feed through the matcher; returns a run summary."""
+        if fmt == "parquet" and not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet output requires pyarrow.")
+        os.makedirs(out_dir, exist_ok=True)
+        # Matched against the compact array form: far less resident memory per invoice
+        ledger = CompactLedger.from_frame(self.load_ledger(ledger_path))
+
+        matches = _ChunkWriter(os.path.join(out_dir, f"matches.{fmt}"), fmt)
+        review = _ChunkWriter(os.path.join(out_dir, f"review.{fmt}"), fmt)
+        exceptions = _ChunkWriter(os.path.join(out_dir, f"exceptions.{fmt}"), fmt)
+        start = time.perf_counter()
+        rows = 0
+        try:
+            for chunk in iter_frames(bank_path, self.chunksize):
+                result = self.match_chunk(chunk, ledger)
+                # Only STP results are posted; high-confidence exceptions still need a human
+                is_match = result['Match_Status'].str.startswith("STP")
+                is_review = ~is_match & (result['Confidence'] >= self.engine.manual_review_threshold)
+                matches.write(result[is_match])
+                review.write(result[is_review])
+                exceptions.write(result[~is_match & ~is_review])
+
+                if self.vault is not None and is_match.any():
+                    posted = result[is_match]
+                    self.vault.log_actions([
+                        {"invoice_ref": inv, "action_type": "RECON_STP", "amount": amt, "operator": self.operator}
+                        for inv, amt in zip(posted['Matched_Invoice'],
+                                            pd.to_numeric(posted['Amount'], errors='coerce').fillna(0.0))
+                    ])
+
+                rows += len(result)
+                elapsed = time.perf_counter() - start
+                self.progress({
+                    "rows": rows, "matched": matches.rows, "review": review.rows, "exceptions": exceptions.rows,
+                    "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0
+                })
+        finally:
+            matches.close()
+            review.close()
+            exceptions.close()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "payments": rows,
+            "matched": matches.rows,
+            "review": review.rows,
+            "exceptions": exceptions.rows,
+            "ledger_rows": len(ledger),
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            "matches_path": matches.path,
+            "review_path": review.path,
+            "exceptions_path": exceptions.path
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.reconcile", description="Headless batch reconciliation.")
+    parser.add_argument("--bank", default="data/bank_feed.csv", help="Bank feed (.csv or .parquet)")
+    parser.add_argument("--ledger", default="data/invoices.csv", help="Invoice ledger (.csv or .parquet)")
+    parser.add_argument("--out", default="data/recon", help="Output directory")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--operator", default="RECON_BATCH")
+    parser.add_argument("--no-vault", action="store_true", help="Do not post matches to the compliance log")
+    parser.add_argument("--vault-path", default="data/compliance_log.csv")
+    parser.add_argument("--name-scorer", choices=["token_set", "tfidf"], default="token_set",
+                        help="Name-similarity backend for the matcher")
+    args = parser.parse_args(argv)
+
+    vault = None
+    if not args.no_vault:
+        from backend.compliance import ComplianceVault
+        vault = ComplianceVault(ledger_path=args.vault_path)
+
+    engine = SmartMatchingEngine(name_scorer=args.name_scorer)
+    reconciler = BatchReconciler(engine=engine, vault=vault, chunksize=args.chunksize, operator=args.operator)
+    summary = reconciler.run(args.bank, args.ledger, args.out, fmt=args.format)
+    print(
+        f"Reconciled {summary['payments']:,} payments against {summary['ledger_rows']:,} invoices in "
+        f"{summary['seconds']}s ({summary['rows_per_sec']:,} rows/s): {summary['matched']:,} matched, "
+        f"{summary['review']:,} for review, {summary['exceptions']:,} exceptions -> {args.out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
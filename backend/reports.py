@@ -0,0 +1,201 @@
+import os
+import json
+import shutil
+import hashlib
+import weakref
+import tempfile
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from backend.match_cache import frame_fingerprint
+from backend.shared_ledger import snapshot
+
+# fpdf and python-pptx are only imported when a report is actually rendered
+
+
+def _latin1(value):
+    """Core PDF fonts are latin-1 only: replace anything they cannot encode."""
+    return str(value).encode('latin-1', 'replace').decode('latin-1')
+
+
+def _cell(pdf, x, y, w, h, text="", size=9, bold=False, align='L', border=1, fill=None, white=False):
+    """Absolutely positioned FPDF cell: top-left (x, y) and size in mm, optional RGB fill."""
+    pdf.set_font("Helvetica", 'B' if bold else '', size)
+    pdf.set_text_color(*((255, 255, 255) if white else (0, 0, 0)))
+    if fill is not None:
+        pdf.set_fill_color(*fill)
+    pdf.set_xy(x, y)
+    pdf.cell(w, h, _latin1(text), border, 0, align, fill is not None)
+
+
+def build_pdf(df, mode_name, liquidity, path):
+    """
+    Full-portfolio executive PDF written to `path` with the public FPDF API.
+    Page 1 carries the KPI summary and entity/rating totals; the appendix
+    lists every invoice in a paginated table (header repeated per page).
+    """
+    from fpdf import FPDF
+
+    header_fill = (22, 27, 34)
+    pdf = FPDF(unit='mm', format='A4')
+    pdf.set_auto_page_break(False)  # pagination is explicit so the table header repeats
+    pdf.add_page()
+    _cell(pdf, 10, 10, 190, 10, "SmartCash AI: Executive Treasury Report", size=16, bold=True, align='C', border=0)
+    _cell(pdf, 10, 20, 190, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", size=10, align='C', border=0)
+
+    _cell(pdf, 10, 40, 95, 10, f"Scenario: {mode_name}", size=12, bold=True, border=0)
+    _cell(pdf, 105, 40, 95, 10, f"Net Liquidity: ${liquidity/1e6:.2f}M", size=12, bold=True, border=0)
+    _cell(pdf, 10, 50, 95, 8, f"Invoices: {len(df):,}", size=10, border=0)
+    _cell(pdf, 105, 50, 95, 8, f"Gross Exposure: ${df['Amount_Remaining'].sum()/1e6:,.2f}M", size=10, border=0)
+    y = 63
+
+    # Summary: exposure by entity x rating (aggregated, never row-level)
+    if {'Company_Code', 'ESG_Score'} <= set(df.columns) and not df.empty:
+        summary = df.groupby(['Company_Code', 'ESG_Score'], observed=True)['Amount_Remaining'].agg(['sum', 'count'])
+        _cell(pdf, 10, y, 190, 8, "Exposure by Entity and Rating", size=11, bold=True, border=0)
+        y += 8
+        for (entity, rating), total, count in zip(summary.index, summary['sum'], summary['count']):
+            if y > 270:
+                pdf.add_page()
+                y = 10
+            _cell(pdf, 10, y, 70, 6, entity)
+            _cell(pdf, 80, y, 30, 6, rating, align='C')
+            _cell(pdf, 110, y, 50, 6, f"{total:,.2f}", align='R')
+            _cell(pdf, 160, y, 40, 6, f"{int(count):,}", align='R')
+            y += 6
+
+    # Appendix: every invoice, paginated
+    columns = [(10, 40, "Invoice"), (50, 60, "Customer"), (110, 45, "Amount"), (155, 45, "Due Date")]
+
+    def table_header(y):
+        for x, w, label in columns:
+            _cell(pdf, x, y, w, 7, label, bold=True, align='C', fill=header_fill, white=True)
+        return y + 7
+
+    pdf.add_page()
+    _cell(pdf, 10, 10, 190, 10, "Appendix: Portfolio Detail", size=12, bold=True, border=0)
+    y = table_header(20)
+
+    rows = df[['Invoice_ID', 'Customer', 'Amount_Remaining', 'Due_Date']].itertuples(index=False, name=None)
+    for inv_id, customer, amount, due in rows:
+        if y > 280:
+            pdf.add_page()
+            y = table_header(10)
+        _cell(pdf, 10, y, 40, 6, inv_id)
+        _cell(pdf, 50, y, 60, 6, str(customer)[:30])
+        _cell(pdf, 110, y, 45, 6, f"{amount:,.2f}", align='R')
+        _cell(pdf, 155, y, 45, 6, str(due)[:10])
+        y += 6
+
+    pdf.output(path)
+    return path
+
+
+def build_pptx(df, mode_name, liquidity, path):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+
+    title = slide.shapes.title
+    title.text = "SmartCash AI Executive Summary"
+
+    # KPI Stats
+    content = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
+    tf = content.text_frame
+    p = tf.add_paragraph()
+    p.text = f"Scenario Mode: {mode_name}"
+    p.font.size = Pt(24)
+
+    p2 = tf.add_paragraph()
+    p2.text = f"Risk-Adjusted Liquidity: ${liquidity/1e6:.2f}M"
+    p2.font.bold = True
+    p2.font.size = Pt(32)
+
+    p3 = tf.add_paragraph()
+    p3.text = f"Portfolio: {len(df):,} invoices · ${df['Amount_Remaining'].sum()/1e6:,.1f}M gross"
+    p3.font.size = Pt(18)
+
+    prs.save(path)
+    return path
+
+
+class ReportService:
+    """
+    Background Board-Report Generation for SmartCash AI.
+    Renders PDF/PPTX exports on a worker thread only when requested, and
+    caches the finished files by (ledger fingerprint, mode, filters), so
+    reruns and other sessions with the same view reuse them.
+    """
+
+    BUILDERS = {"pdf": build_pdf, "pptx": build_pptx}
+    REPORT_COLUMNS = ['Invoice_ID', 'Customer', 'Amount_Remaining', 'Due_Date', 'Company_Code', 'ESG_Score']
+
+    def __init__(self, output_dir=None, max_workers=2, max_entries=16):
+        self.output_dir = output_dir or tempfile.mkdtemp(prefix="smartcash_reports_")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        # A directory we created ourselves is removed on shutdown, or at interpreter exit at the latest
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.output_dir, True) if output_dir is None else None
+
+    def make_key(self, kind, df, mode_name, liquidity, filters=None):
+        cols = [c for c in self.REPORT_COLUMNS if c in df.columns]
+        payload = {
+            "kind": kind,
+            "ledger": frame_fingerprint(df, cols),
+            "mode": mode_name,
+            "liquidity": round(float(liquidity), 2),
+            "filters": filters or {}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key):
+        """The job future for a key (None if never requested or evicted)."""
+        with self._lock:
+            entry = self._jobs.get(key)
+            if entry is None:
+                return None
+            self._jobs.move_to_end(key)
+            return entry[0]
+
+    def submit(self, kind, key, df, mode_name, liquidity):
+        """Queues a render unless one exists for the key; returns its future."""
+        with self._lock:
+            if key in self._jobs:
+                return self._jobs[key][0]
+            # Snapshot of the report columns: later edits to the caller's frame cannot leak in
+            frame = snapshot(df[[c for c in self.REPORT_COLUMNS if c in df.columns]])
+            path = os.path.join(self.output_dir, f"{key[:16]}.{kind}")
+            job = self._executor.submit(self.BUILDERS[kind], frame, mode_name, liquidity, path)
+            self._jobs[key] = (job, path)
+            self._evict()
+            return job
+
+    @staticmethod
+    def _discard(path):
+        """Removes a report file, including one left behind by a failed render."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while len(self._jobs) > self.max_entries:
+            _, (old, path) = self._jobs.popitem(last=False)
+            # A render still in flight deletes its file once it finishes
+            old.add_done_callback(lambda _, path=path: self._discard(path))
+
+    def shutdown(self, wait=True):
+        """Stops the workers and deletes every cached report (and the temp directory if we created it)."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            jobs, self._jobs = list(self._jobs.values()), OrderedDict()
+        for job, path in jobs:
+            job.add_done_callback(lambda _, path=path: self._discard(path))
+        if self._cleanup is not None and wait:
+            self._cleanup()
@@ -0,0 +1,169 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Content-Addressed LLM Response Cache for SmartCash AI.
+    Completions are keyed on (normalized prompt, model, temperature) and
+    persisted to SQLite with TTL expiry and size-bounded LRU eviction.
+    A small in-process layer serves repeat hits without touching disk.
+    The SQLite file (SMARTCASH_LLM_CACHE, default data/llm_cache.sqlite) is
+    only opened on the first lookup or store.
+    """
+
+    DEFAULT_PATH = "data/llm_cache.sqlite"
+
+    def __init__(self, db_path=None, ttl_seconds=7 * 24 * 3600,
+                 max_entries=50_000, memory_entries=1024):
+        self.db_path = db_path or os.getenv("SMARTCASH_LLM_CACHE", self.DEFAULT_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._entries = 0
+
+    def _db(self):
+        """Opens (and if needed creates) the SQLite store on first use; call with the lock held."""
+        if self._conn is not None:
+            return self._conn
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(prompt, model, temperature):
+        """SHA-256 over the whitespace-normalized prompt plus model settings."""
+        normalized = " ".join(str(prompt).split())
+        payload = json.dumps([normalized, model, round(float(temperature), 4)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, prompt, model, temperature):
+        key = self.make_key(prompt, model, temperature)
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and now - cached[1] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+
+            row = self._db().execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._delete(key)
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, response, created_at)
+            self.hits += 1
+            return response
+
+    def put(self, prompt, model, temperature, response):
+        key = self.make_key(prompt, model, temperature)
+        now = time.time()
+
+        with self._lock:
+            existed = key in self._memory or self._db().execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self._conn.commit()
+            if not existed:
+                self._entries += 1
+            self._remember(key, response, now)
+
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _remember(self, key, response, created_at):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key):
+        self._memory.pop(key, None)
+        deleted = self._conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+        self._conn.commit()
+        self._entries -= deleted
+
+    def _evict(self):
+        """Drops the least recently used ~10% so eviction is amortized across puts."""
+        target = int(self.max_entries * 0.9)
+        overflow = self._entries - target
+        victims = [r[0] for r in self._conn.execute(
+            "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?", (overflow,)
+        )]
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in victims])
+        self._conn.commit()
+        for k in victims:
+            self._memory.pop(k, None)
+        self._entries -= len(victims)
+        self.evictions += len(victims)
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            deleted = self._db().execute("DELETE FROM responses WHERE created_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            self._entries -= deleted
+            self._memory.clear()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM responses")
+            self._conn.commit()
+            self._memory.clear()
+            self._entries = 0
+
+    def stats(self):
+        if self._conn is None and os.path.exists(self.db_path):
+            with self._lock:
+                self._db()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self._entries,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+
+class _FieldIndex:
+    """
+    Trigram inverted index over the distinct values of one ledger field.
+    Postings and value -> row lists are stored CSR-style in NumPy arrays.
+    """
+
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series.astype(str).str.lower(), sort=False)
+        self.values = pd.Series(np.asarray(uniques, dtype=object))
+        self.value_array = self.values.to_numpy()
+
+        # Value id -> row positions
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.row_order = order[codes[order] >= 0]
+        self.row_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Sorted values for prefix range lookups
+        self.sorted_ids = np.argsort(self.value_array.astype(str))
+        self.sorted_values = self.value_array[self.sorted_ids].astype(str)
+
+        self._build_trigrams()
+
+    def _build_trigrams(self):
+        lens = self.values.str.len().to_numpy()
+        max_len = int(lens.max()) if len(lens) else 0
+
+        tri_parts, id_parts = [], []
+        for k in range(max(0, max_len - 2)):
+            mask = lens >= k + 3
+            tri_parts.append(self.values[mask].str.slice(k, k + 3))
+            id_parts.append(np.flatnonzero(mask))
+
+        if not tri_parts:
+            self.trigram_ids = {}
+            self.postings = np.array([], dtype=np.int64)
+            self.posting_offsets = np.array([0], dtype=np.int64)
+            return
+
+        trigrams = pd.concat(tri_parts, ignore_index=True)
+        value_ids = np.concatenate(id_parts)
+        tri_codes, tri_uniques = pd.factorize(trigrams)
+
+        order = np.lexsort((value_ids, tri_codes))
+        tri_sorted, ids_sorted = tri_codes[order], value_ids[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (tri_sorted[1:] != tri_sorted[:-1]) | (ids_sorted[1:] != ids_sorted[:-1])
+        tri_sorted, ids_sorted = tri_sorted[keep], ids_sorted[keep]
+
+        self.trigram_ids = {t: i for i, t in enumerate(tri_uniques)}
+        self.postings = ids_sorted
+        self.posting_offsets = np.searchsorted(tri_sorted, np.arange(len(tri_uniques) + 1))
+
+    def _posting(self, trigram):
+        tid = self.trigram_ids.get(trigram)
+        if tid is None:
+            return np.array([], dtype=np.int64)
+        return self.postings[self.posting_offsets[tid]:self.posting_offsets[tid + 1]]
+
+    def match_substring(self, q):
+        """Value ids whose text contains q."""
+        if len(q) < 3:
+            # Too short for trigrams: scan the distinct values (not the rows)
+            return np.flatnonzero(self.values.str.contains(q, regex=False).to_numpy())
+
+        grams = {q[i:i + 3] for i in range(len(q) - 2)}
+        postings = sorted((self._posting(g) for g in grams), key=len)
+        candidates = postings[0]
+        for p in postings[1:]:
+            # Once the set is small, verifying directly beats probing large postings
+            if len(candidates) <= 256 or len(p) == 0:
+                if len(p) == 0:
+                    candidates = p
+                break
+            # Postings are sorted: membership by binary search, O(candidates * log postings)
+            pos = np.minimum(np.searchsorted(p, candidates), len(p) - 1)
+            candidates = candidates[p[pos] == candidates]
+
+        if len(q) == 3 or len(candidates) == 0:
+            return candidates
+        if len(candidates) <= 256:
+            return np.array([v for v in candidates if q in self.value_array[v]], dtype=np.int64)
+        confirmed = self.values.iloc[candidates].str.contains(q, regex=False).to_numpy()
+        return candidates[confirmed]
+
+    def match_prefix(self, q):
+        lo = np.searchsorted(self.sorted_values, q, side='left')
+        hi = np.searchsorted(self.sorted_values, q + '\uffff', side='left')
+        return self.sorted_ids[lo:hi]
+
+    def rows_for(self, value_ids):
+        if len(value_ids) == 0:
+            return np.array([], dtype=np.int64)
+        # Vectorized CSR gather: concatenates each value's row slice without a Python loop
+        starts = self.row_offsets[value_ids]
+        lens = self.row_offsets[value_ids + 1] - starts
+        shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lens)[:-1]]), lens)
+        return self.row_order[shift + np.arange(lens.sum())]
+
+
+class LedgerSearchIndex:
+    """
+    Prebuilt Global Search index for SmartCash AI.
+    Holds trigram/prefix indexes over the searchable ledger fields, built
+    once per ledger version, and answers case-insensitive substring and
+    prefix queries with row positions (usable with DataFrame.iloc).
+    """
+
+    SEARCH_FIELDS = ['Customer', 'Invoice_ID']
+
+    def __init__(self, ledger_df, fields=None, amount_col='Amount_Remaining', version=None):
+        self.version = version
+        self.n_rows = len(ledger_df)
+        self.fields = {
+            f: _FieldIndex(ledger_df[f]) for f in (fields or self.SEARCH_FIELDS) if f in ledger_df.columns
+        }
+
+        # Exposure per distinct (case-folded) customer for ranking typeahead suggestions
+        self.customers_by_name = []
+        self._cust_exposure = np.array([])
+        self._cust_display = np.array([], dtype=object)
+        if 'Customer' in self.fields:
+            names = ledger_df['Customer'].astype(str)
+            amounts = pd.to_numeric(ledger_df[amount_col], errors='coerce').fillna(0.0).to_numpy() \
+                if amount_col in ledger_df.columns else np.zeros(len(ledger_df))
+            codes, _ = pd.factorize(names.str.lower(), sort=False)
+            self._cust_exposure = np.bincount(codes, weights=amounts, minlength=len(self.fields['Customer'].values))
+            first_seen = np.unique(codes, return_index=True)[1]
+            self._cust_display = names.to_numpy()[first_seen]
+            self._cust_rank = np.argsort(-self._cust_exposure, kind='stable')
+            self.customers_by_name = sorted(names.unique().tolist())
+
+    def search(self, query, prefix=False):
+        """Sorted row positions whose searchable fields contain (or start with) the query."""
+        q = str(query).strip().lower()
+        if not q:
+            return np.arange(self.n_rows)
+
+        hits = []
+        for field in self.fields.values():
+            value_ids = field.match_prefix(q) if prefix else field.match_substring(q)
+            hits.append(field.rows_for(value_ids))
+        if not hits:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate(hits))
+
+    def suggest(self, query, limit=10):
+        """Typeahead: customers matching the query, highest exposure first (prefix hits before substring hits)."""
+        if 'Customer' not in self.fields:
+            return []
+        q = str(query).strip().lower()
+        if not q:
+            return self._cust_display[self._cust_rank[:limit]].tolist()
+
+        field = self.fields['Customer']
+        prefix_ids = field.match_prefix(q)
+        other_ids = np.setdiff1d(field.match_substring(q), prefix_ids, assume_unique=True)
+
+        ranked = [
+            ids[np.argsort(-self._cust_exposure[ids], kind='stable')] for ids in (prefix_ids, other_ids)
+        ]
+        return self._cust_display[np.concatenate(ranked)[:limit]].tolist()
@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from backend.compact_ledger import CompactLedger
+
+
+def _match_rows(engine, ledger, amounts, payers, currencies):
+    """Best candidate per payment against one shard (module-level so process pools can pickle it)."""
+    engine.prime_names([p for p in payers if not pd.isna(p)], ledger)
+    results = []
+    for amt, payer, ccy in zip(amounts, payers, currencies):
+        if pd.isna(amt) or pd.isna(payer) or not str(payer):
+            results.append("Invalid Data")
+            continue
+        matches = engine.run_match(float(amt), str(payer), ccy, ledger, top_k=1)
+        results.append(matches[0] if matches else None)
+    return results
+
+
+class ShardedLedger:
+    """
+    Company-Code / Currency Sharding Layer for SmartCash AI.
+    Partitions the ledger once by (Company_Code, Currency) and routes each
+    bank payment to the shard of its own entity and currency, so a payment
+    is only scored against invoices it can legally settle. Shards are
+    matched and aggregated in parallel and consolidated views are assembled
+    from the per-shard results; with more entities every shard, and thus
+    the work per payment, gets smaller.
+    """
+
+    SHARD_KEYS = ('Company_Code', 'Currency')
+
+    def __init__(self, ledger, keys=SHARD_KEYS, max_workers=None, version=None):
+        self.ledger = ledger
+        self.version = version
+        self.keys = [k for k in keys if k in ledger.columns]
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.shards = {}
+        if len(ledger):
+            if self.keys:
+                key_values = ledger[self.keys].astype(str)
+                for key, positions in key_values.groupby(self.keys, sort=True).indices.items():
+                    key = key if isinstance(key, tuple) else (key,)
+                    self.shards[key] = ledger.iloc[positions].reset_index(drop=True)
+            else:
+                self.shards[()] = ledger
+        self._selections = {}
+        self._compact = {}
+
+    def __len__(self):
+        return len(self.ledger)
+
+    @property
+    def shard_sizes(self):
+        return {key: len(shard) for key, shard in self.shards.items()}
+
+    def select(self, **partial):
+        """Ledger rows for a (possibly partial) shard key, e.g. select(Company_Code='1000 (US)')."""
+        wanted = tuple(str(partial[k]) if k in partial else None for k in self.keys)
+        if wanted not in self._selections:
+            parts = [
+                shard for key, shard in self.shards.items()
+                if all(w is None or w == k for w, k in zip(wanted, key))
+            ]
+            if len(parts) == 1:
+                selection = parts[0]
+            elif parts:
+                selection = pd.concat(parts, ignore_index=True)
+            else:
+                selection = self.ledger.iloc[0:0]
+            self._selections[wanted] = selection
+        return self._selections[wanted]
+
+    def compact(self, **partial):
+        """CompactLedger form of select(**partial), built once; the matcher scores on this."""
+        wanted = tuple(str(partial[k]) if k in partial else None for k in self.keys)
+        if wanted not in self._compact:
+            self._compact[wanted] = CompactLedger.from_frame(self.select(**partial))
+        return self._compact[wanted]
+
+    # --- ROUTING & MATCHING ---
+
+    def route(self, bank_df):
+        """
+        Groups bank rows by the shard keys the feed carries -> {partial key: row positions}.
+        Rows missing a key value fall back to every shard matching the keys they do have.
+        """
+        bank_keys = [k for k in self.keys if k in bank_df.columns]
+        if not bank_keys or bank_df.empty:
+            return {(): np.arange(len(bank_df))}
+        values = bank_df[bank_keys].astype(object).where(bank_df[bank_keys].notna(), None)
+        routes = {}
+        for key, positions in values.groupby(bank_keys, sort=False, dropna=False).indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            partial = tuple((k, str(v)) for k, v in zip(bank_keys, key) if v is not None and not pd.isna(v))
+            routes.setdefault(partial, []).append(positions)
+        return {partial: np.sort(np.concatenate(parts)) for partial, parts in routes.items()}
+
+    def match_bank_feed(self, engine, bank_df, cache=None, processes=False):
+        """
+        Best candidate per payment (aligned to bank_df rows, same shape as
+        MatchResultCache.match_bank_feed), matched shard by shard in parallel.
+        With a cache, results are reused per shard fingerprint; process pools
+        skip the cache (it lives in this process).
+        """
+        if bank_df.empty:
+            return []
+        results = [None] * len(bank_df)
+        work = []
+        for partial, positions in self.route(bank_df).items():
+            # An entity / currency without invoices yields an empty shard: nothing can match
+            work.append((self.compact(**dict(partial)), positions, bank_df.iloc[positions]))
+
+        def _thread_task(ledger, rows):
+            if cache is not None:
+                return cache.match_bank_feed(engine, rows, ledger)
+            return _match_rows(engine, ledger, *self._payment_columns(rows))
+
+        pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool_cls(max_workers=min(self.max_workers, max(1, len(work)))) as pool:
+            if processes:
+                futures = [pool.submit(_match_rows, engine, ledger, *self._payment_columns(rows)) for ledger, _, rows in work]
+            else:
+                futures = [pool.submit(_thread_task, ledger, rows) for ledger, _, rows in work]
+            for (_, positions, _), future in zip(work, futures):
+                for pos, value in zip(positions, future.result()):
+                    results[pos] = value
+        return results
+
+    @staticmethod
+    def _payment_columns(rows):
+        amounts = pd.to_numeric(rows['Amount'], errors='coerce').to_numpy()
+        payers = rows['Customer'].to_numpy()
+        currencies = rows['Currency'].astype(str).to_numpy() if 'Currency' in rows.columns else ['USD'] * len(rows)
+        return amounts, payers, currencies
+
+    # --- PER-SHARD AGGREGATION ---
+
+    def map_shards(self, func, **partial):
+        """Runs func(shard) on every shard (optionally only those matching a partial key) in parallel."""
+        wanted = {k: str(v) for k, v in partial.items()}
+        keys = [
+            key for key in self.shards
+            if all(wanted.get(k, v) == v for k, v in zip(self.keys, key))
+        ]
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            return dict(zip(keys, pool.map(lambda key: func(self.shards[key]), keys)))
+
+    def consolidate(self, func, combine=None, **partial):
+        """Map-reduce: per-shard results of func, merged by `combine` (default: pd.concat / sum)."""
+        parts = list(self.map_shards(func, **partial).values())
+        if combine is not None:
+            return combine(parts)
+        if parts and isinstance(parts[0], (pd.DataFrame, pd.Series)):
+            return pd.concat(parts)
+        return sum(parts)
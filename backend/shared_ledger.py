@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+
+def _copy_on_write():
+    """True when pandas copy-on-write is active (always from pandas 3, opt-in on 2.x)."""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def snapshot(frame):
+    """
+    Handle of `frame` that in-place writes can never propagate back through:
+    a shallow copy under copy-on-write (writes copy only the touched column),
+    a deep copy otherwise.
+    """
+    return frame.copy(deep=not _copy_on_write())
+
+
+class SharedLedger:
+    """
+    Process-wide, read-only ledger base for SmartCash AI.
+    Loaded once and shared by every session; callers get copy-on-write
+    handles of the frame, so a stray in-place edit can never leak into
+    another analyst's view.
+    """
+
+    def __init__(self, frame, version=None, key_col='Invoice_ID'):
+        self._frame = frame.reset_index(drop=True)
+        self.version = version
+        self.key_col = key_col if key_col in self._frame.columns else None
+        self._key_index = None
+        self._key_positions = None
+
+    @property
+    def frame(self):
+        """Whole-ledger handle (a deep copy before pandas copy-on-write): for cache builders, not per-rerun reads."""
+        return snapshot(self._frame)
+
+    @property
+    def columns(self):
+        return self._frame.columns
+
+    def __len__(self):
+        return len(self._frame)
+
+    def column(self, name, positions=None):
+        values = self._frame[name].to_numpy()
+        return values if positions is None else values[positions]
+
+    def take(self, positions, columns=None):
+        frame = self._frame if columns is None else self._frame[list(columns)]
+        return frame.iloc[positions]
+
+    @property
+    def key_index(self):
+        """Hash index on the key column, built once per process on first use."""
+        if self._key_index is None:
+            keys = self._frame[self.key_col].astype(str)
+            # Duplicate keys resolve to their first row, as the old `.index[...][0]` lookup did
+            first = ~keys.duplicated(keep='first').to_numpy()
+            self._key_index = pd.Index(keys[first])
+            self._key_positions = np.flatnonzero(first)
+        return self._key_index
+
+    def position_of(self, key):
+        """O(1) row position of one invoice key (KeyError if unknown)."""
+        if self.key_col is None:
+            raise KeyError(key)
+        slot = self.key_index.get_loc(str(key))
+        return int(self._key_positions[slot])
+
+    def positions_of(self, keys):
+        """Row positions of the given invoice keys (-1 where unknown)."""
+        keys = np.atleast_1d(keys)
+        if self.key_col is None or len(self) == 0:
+            return np.full(len(keys), -1)
+        slots = self.key_index.get_indexer(keys.astype(str))
+        return np.where(slots >= 0, self._key_positions[slots], -1)
+
+
+class SessionOverlay:
+    """
+    Per-session edit layer over a SharedLedger.
+    Stores only the cells a session changed (column -> {position: value});
+    reads patch those cells over the shared base on the fly.
+    """
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.base_version = shared.version
+        self._edits = {}
+
+    # --- EDITS ---
+
+    def set(self, positions, column, value):
+        """Sets one value (or one value per position) for the given row positions."""
+        positions = np.atleast_1d(positions)
+        values = np.broadcast_to(np.asarray(value, dtype=object), positions.shape)
+        edits = self._edits.setdefault(column, {})
+        edits.update(zip(positions.tolist(), values.tolist()))
+
+    def get(self, position, column):
+        edits = self._edits.get(column, {})
+        if position in edits:
+            return edits[position]
+        return self.shared.column(column)[position]
+
+    def reset(self, column=None):
+        if column is None:
+            self._edits.clear()
+        else:
+            self._edits.pop(column, None)
+
+    @property
+    def edited_cells(self):
+        return sum(len(e) for e in self._edits.values())
+
+    @property
+    def edited_columns(self):
+        return {column for column, edits in self._edits.items() if edits}
+
+    def rebase(self, shared):
+        """Carries the edits onto a reloaded base, re-keyed by invoice id (unknown ids are dropped)."""
+        overlay = SessionOverlay(shared)
+        if self.shared.key_col is None or shared.key_col is None:
+            return overlay
+        for column, edits in self._edits.items():
+            if not edits or column not in shared.columns:
+                continue
+            old_pos = np.fromiter(edits.keys(), dtype=np.int64, count=len(edits))
+            new_pos = shared.positions_of(self.shared.column(self.shared.key_col, old_pos))
+            keep = new_pos >= 0
+            overlay.set(new_pos[keep], column, np.asarray(list(edits.values()), dtype=object)[keep])
+        return overlay
+
+    # --- READS ---
+
+    def _patches(self, column, positions):
+        """(slots into `positions`, values) for the edited cells of `column`."""
+        edits = self._edits.get(column)
+        if not edits:
+            return None, None
+        edit_pos = np.fromiter(edits.keys(), dtype=np.int64, count=len(edits))
+        positions = np.asarray(positions)
+        if len(positions) and np.all(positions[1:] > positions[:-1]):
+            # Views keep positions sorted: binary search instead of hashing the whole view
+            slots = np.minimum(np.searchsorted(positions, edit_pos), len(positions) - 1)
+            slots[positions[slots] != edit_pos] = -1
+        else:
+            slots = pd.Index(positions).get_indexer(edit_pos)
+        hit = slots >= 0
+        return slots[hit], np.asarray(list(edits.values()), dtype=object)[hit]
+
+    def column(self, name, positions=None):
+        positions = np.arange(len(self.shared)) if positions is None else positions
+        values = self.shared.column(name, positions)
+        slots, patch = self._patches(name, positions)
+        if slots is None or len(slots) == 0:
+            return values
+        values = values.copy()
+        values[slots] = patch
+        return values
+
+    def frame(self, positions=None, columns=None):
+        """Materializes the requested rows/columns with this session's edits applied."""
+        positions = np.arange(len(self.shared)) if positions is None else positions
+        out = self.shared.take(positions, columns)
+        for col in out.columns:
+            slots, patch = self._patches(col, positions)
+            if slots is not None and len(slots):
+                out.iloc[slots, out.columns.get_loc(col)] = patch
+        return out
+
+    def view(self):
+        return LedgerView(self, np.arange(len(self.shared)))
+
+
+class LedgerView:
+    """
+    Filtered view over a session's ledger: just an array of base row
+    positions. Filters narrow the array; a DataFrame is only built by
+    frame(), for the rows (and columns) a page actually renders.
+    """
+
+    def __init__(self, overlay, positions):
+        self.overlay = overlay
+        self.positions = np.asarray(positions, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def empty(self):
+        return len(self.positions) == 0
+
+    def restrict(self, base_positions):
+        """Keeps only rows whose base position is in `base_positions` (e.g. search hits)."""
+        return LedgerView(self.overlay, self.positions[np.isin(self.positions, base_positions)])
+
+    def mask(self, keep):
+        return LedgerView(self.overlay, self.positions[np.asarray(keep, dtype=bool)])
+
+    def where(self, column, value):
+        return self.mask(self.column(column) == value)
+
+    def column(self, name):
+        return self.overlay.column(name, self.positions)
+
+    def frame(self, columns=None):
+        return self.overlay.frame(self.positions, columns)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+
+class StressScenarioEngine:
+    """
+    FX x Hedge Stress Scenario Engine for SmartCash AI.
+    The ledger is collapsed once into a currency x entity exposure matrix;
+    scenario grids are then valued with NumPy broadcasting, FX shocks applied
+    per currency and hedge ratios per entity, so a 1000 x 1000 grid costs two
+    small matrix products rather than a million Python-level evaluations.
+    """
+
+    def __init__(self, exposure, currencies, entities, fx_betas=None):
+        self.exposure = np.asarray(exposure, dtype=float).reshape(len(currencies), len(entities))
+        self.currencies = list(currencies)
+        self.entities = list(entities)
+        # Sensitivity of each currency to the headline FX shock (1.0 = moves fully with it)
+        betas = fx_betas or {}
+        self.fx_betas = np.array([betas.get(c, 1.0) for c in self.currencies], dtype=float)
+
+    @classmethod
+    def from_frame(cls, df, amount='Amount_Remaining', currency_col='Currency', entity_col='Company_Code', fx_betas=None):
+        """
+        Builds the exposure matrix from a ledger view. `amount` is a column
+        name or a row-aligned Series (e.g. risk-weighted collectible values).
+        """
+        values = df[amount] if isinstance(amount, str) else amount
+        values = pd.to_numeric(pd.Series(values, index=df.index), errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        currency = df[currency_col] if currency_col in df.columns else pd.Series('USD', index=df.index)
+        entity = df[entity_col] if entity_col in df.columns else pd.Series('Consolidated', index=df.index)
+
+        ccy_codes, ccy_labels = pd.factorize(currency, use_na_sentinel=False)
+        ent_codes, ent_labels = pd.factorize(entity, use_na_sentinel=False)
+        cells = np.bincount(
+            ccy_codes * len(ent_labels) + ent_codes, weights=values,
+            minlength=len(ccy_labels) * len(ent_labels)
+        )
+        return cls(cells, list(ccy_labels), list(ent_labels), fx_betas)
+
+    @property
+    def total(self):
+        return float(self.exposure.sum())
+
+    # --- SCENARIO AXES ---
+
+    def fx_matrix(self, fx_shocks):
+        """
+        Fractional FX move per (scenario, currency). 1-D shocks in percent are
+        scaled by the currency betas; a 2-D (n_fx, n_currency) array is used as is.
+        """
+        fx = np.asarray(fx_shocks, dtype=float) / 100
+        if fx.ndim == 1:
+            fx = fx[:, None] * self.fx_betas[None, :]
+        return fx
+
+    def hedge_matrix(self, hedge_ratios):
+        """
+        Hedge coverage per (scenario, entity), clipped to [0, 1]. 1-D ratios in
+        percent apply to every entity; a 2-D (n_hedge, n_entity) array is used as is.
+        """
+        hedge = np.clip(np.asarray(hedge_ratios, dtype=float) / 100, 0.0, 1.0)
+        if hedge.ndim == 1:
+            hedge = np.broadcast_to(hedge[:, None], (len(hedge), len(self.entities)))
+        return hedge
+
+    # --- VALUATION ---
+
+    def grid(self, fx_shocks, hedge_ratios):
+        """
+        Portfolio value for every (FX shock, hedge ratio) pair, shape (n_fx, n_hedge):
+        value[i, j] = total + sum over (c, e) of fx[i, c] * exposure[c, e] * (1 - hedge[j, e])
+        """
+        fx = self.fx_matrix(fx_shocks)
+        unhedged = 1.0 - self.hedge_matrix(hedge_ratios)
+        return self.total + (fx @ self.exposure) @ unhedged.T
+
+    def entity_impact(self, fx_shock, hedge_ratio):
+        """P&L of a single scenario broken down by entity (same units as the exposure)."""
+        fx = self.fx_matrix([fx_shock])[0]
+        unhedged = 1.0 - self.hedge_matrix([hedge_ratio])[0]
+        return pd.Series((fx @ self.exposure) * unhedged, index=self.entities)
@@ -0,0 +1,251 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class SyntheticLedgerGenerator:
+    """
+    Vectorized Synthetic Data Generator for SmartCash AI.
+    Produces invoices, bank feeds and camt.053 statements in the raw ERP /
+    bank schema that LedgerStore normalizes and the matching engine reads
+    (Invoice_ID, Customer, Amount, Currency, ...). Every column is drawn
+    with one NumPy call per chunk and low-cardinality fields are built as
+    categoricals from integer codes, so millions of rows take seconds and
+    a given (seed, chunksize) always reproduces the same files.
+    """
+
+    # Canonical ERP master data -> bank-side payer spellings (incl. the engine alias registry)
+    CUSTOMERS = {
+        "Tesla Inc": ["Tesla Inc", "TSLA MOTORS GMBH", "Tesla Giga-Factory", "tsla-motors-us"],
+        "Global Blue SE": ["Global Blue SE", "Global Blue (Remit)", "Globel Blue Intl"],
+        "Tech Retail Corp": ["Tech Retail Corp", "TechRetail-Europe", "Tech Ret Corp"],
+        "Eco Energy Systems": ["Eco Energy Systems", "Eco Energy Syst"],
+        "Saurabh Soft": ["Saurabh Soft", "saurabh_software_ltd", "Saurabh Soft Solutions"],
+        "Alpha Logistics": ["Alpha Logistics", "ALPHA LOGISTICS LTD"],
+        "Nordic Oil": ["Nordic Oil", "NORDIC OIL ASA"],
+        "Sino Tech": ["Sino Tech", "SINO TECH CO"],
+        "Indo Power": ["Indo Power", "INDO POWER PVT"],
+        "Euro Mart": ["Euro Mart", "EUROMART GMBH"]
+    }
+    ENTITIES = {"1000": "USD", "2000": "EUR", "3000": "GBP"}
+    RATINGS = ["AAA", "AA", "A", "B", "C", "D"]
+    RATING_WEIGHTS = [0.10, 0.20, 0.30, 0.20, 0.12, 0.08]
+    NOISE_PAYERS = ["Unknown Payer", "CASH DEPOSIT", "REF 000000", "Intercompany Sweep"]
+
+    INVOICE_COLUMNS = ['Invoice_ID', 'Company_Code', 'Customer', 'Amount', 'Currency',
+                       'Due_Date', 'Status', 'ESG_Score', 'Is_Disputed']
+    BANK_COLUMNS = ['Transaction_ID', 'Company_Code', 'Payer_Name', 'Amount_Received',
+                    'Currency', 'Date', 'Status', 'Bank_Reference']
+
+    CAMT_NS = "urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"
+
+    def __init__(self, seed=42, as_of=None, customers=None, entities=None,
+                 amount_range=(1_000, 500_000), large_share=0.0, large_range=(20_000_000, 35_000_000),
+                 due_offsets=(-30, 180), dispute_rate=0.02, rating_weights=None):
+        self.seed = seed
+        self.as_of = pd.Timestamp(as_of or datetime(2026, 1, 30)).normalize()
+        self.customers = customers or self.CUSTOMERS
+        if not isinstance(self.customers, dict):
+            self.customers = {c: [c] for c in self.customers}
+        self.entities = entities or self.ENTITIES
+        self.amount_range = amount_range
+        self.large_share = large_share
+        self.large_range = large_range
+        self.due_offsets = due_offsets
+        self.dispute_rate = dispute_rate
+        self.rating_weights = rating_weights or self.RATING_WEIGHTS
+
+        self._names = pd.Index(list(self.customers))
+        self._entity_codes = pd.Index(list(self.entities))
+        # Entities may share a currency: entity code -> currency category code
+        self._entity_ccy, self._currencies = pd.factorize(pd.Index(list(self.entities.values())))
+
+        # Flattened payer table: variants of customer i live at offsets[i]:offsets[i]+counts[i],
+        # unmatched-noise payers follow after all variants
+        variants = [v for name in self._names for v in self.customers[name]]
+        self._payers = pd.Index(list(dict.fromkeys(variants + self.NOISE_PAYERS)))
+        self._variant_codes = self._payers.get_indexer(variants)
+        self._noise_codes = self._payers.get_indexer(self.NOISE_PAYERS)
+        counts = np.array([len(self.customers[name]) for name in self._names])
+        self._variant_offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        self._variant_counts = counts
+
+    def _rng(self, chunk_no):
+        return np.random.default_rng([self.seed, chunk_no])
+
+    @staticmethod
+    def _ids(prefix, start, n):
+        if PYARROW_AVAILABLE:
+            # Arrow string kernels are several times faster than pandas str concatenation
+            numbers = pa.array(np.arange(start, start + n)).cast(pa.string())
+            return pc.binary_join_element_wise(prefix, numbers, "").to_pandas()
+        return prefix + pd.Series(np.arange(start, start + n)).astype(str)
+
+    @staticmethod
+    def _codes(values, categories):
+        """Position of each value in `categories` (cheap for categoricals built by this class)."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return categories.get_indexer(values.cat.categories)[values.cat.codes.to_numpy()]
+        return categories.get_indexer(values.to_numpy())
+
+    # --- INVOICES ---
+
+    def invoices(self, n, start=0, chunk_no=0):
+        rng = self._rng(chunk_no)
+        ent = rng.integers(0, len(self._entity_codes), n)
+        cust = rng.integers(0, len(self._names), n)
+
+        amount = rng.uniform(*self.amount_range, n)
+        if self.large_share:
+            large = rng.random(n) < self.large_share
+            amount[large] = rng.uniform(*self.large_range, int(large.sum()))
+
+        offsets = rng.integers(self.due_offsets[0], self.due_offsets[1], n)
+        due = np.datetime64(self.as_of.date(), 'D') - offsets.astype('timedelta64[D]')
+
+        return pd.DataFrame({
+            'Invoice_ID': self._ids("INV-", start, n),
+            'Company_Code': pd.Categorical.from_codes(ent, categories=self._entity_codes),
+            'Customer': pd.Categorical.from_codes(cust, categories=self._names),
+            'Amount': np.round(amount, 2),
+            'Currency': pd.Categorical.from_codes(self._entity_ccy[ent], categories=self._currencies),
+            'Due_Date': due,
+            'Status': pd.Categorical.from_codes((offsets > 0).astype(np.int8), categories=['Open', 'Overdue']),
+            'ESG_Score': pd.Categorical.from_codes(
+                rng.choice(len(self.RATINGS), n, p=self.rating_weights), categories=self.RATINGS
+            ),
+            'Is_Disputed': rng.random(n) < self.dispute_rate
+        })
+
+    # --- BANK FEED ---
+
+    def bank_feed(self, invoices, start=0, chunk_no=0, match_rate=0.8, fee_rate=0.15, short_pay_rate=0.05):
+        """
+        One payment per invoice: `match_rate` of them settle a real invoice
+        (exact, net of a bank fee, or short-paid, under a payer-name variant),
+        the rest are unmatched noise.
+        """
+        rng = self._rng(chunk_no + 1_000_003)
+        n = len(invoices)
+        amount = invoices['Amount'].to_numpy(dtype=float).copy()
+        cust_idx = self._codes(invoices['Customer'], self._names)
+
+        # Payer spelling: random variant of the invoice's customer
+        pick = (rng.random(n) * self._variant_counts[cust_idx]).astype(int)
+        payer = self._variant_codes[self._variant_offsets[cust_idx] + pick]
+
+        roll = rng.random(n)
+        fee = roll < fee_rate
+        amount[fee] -= np.minimum(5.0, 0.001 * amount[fee]) * rng.random(int(fee.sum()))
+        short = (roll >= fee_rate) & (roll < fee_rate + short_pay_rate)
+        amount[short] *= rng.uniform(0.5, 0.95, int(short.sum()))
+
+        noise = rng.random(n) >= match_rate
+        payer[noise] = rng.choice(self._noise_codes, int(noise.sum()))
+        amount[noise] = rng.uniform(*self.amount_range, int(noise.sum()))
+        reference = invoices['Invoice_ID'].where(~noise, "NOTPROVIDED")
+
+        booked = pd.to_datetime(invoices['Due_Date']).to_numpy(dtype='datetime64[D]') \
+            + rng.integers(-10, 30, n).astype('timedelta64[D]')
+
+        return pd.DataFrame({
+            'Transaction_ID': self._ids("TXN-", start, n),
+            'Company_Code': invoices['Company_Code'].array,
+            'Payer_Name': pd.Categorical.from_codes(payer, categories=self._payers),
+            'Amount_Received': np.round(amount, 2),
+            'Currency': invoices['Currency'].array,
+            'Date': booked,
+            'Status': pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=['Unmatched']),
+            'Bank_Reference': reference.to_numpy()
+        })
+
+    def iter_chunks(self, n_rows, chunksize=1_000_000, **bank_kwargs):
+        """Yields (invoices, bank_feed) chunk pairs covering n_rows invoices."""
+        for chunk_no, start in enumerate(range(0, n_rows, chunksize)):
+            inv = self.invoices(min(chunksize, n_rows - start), start=start, chunk_no=chunk_no)
+            yield inv, self.bank_feed(inv, start=start, chunk_no=chunk_no, **bank_kwargs)
+
+    # --- CAMT.053 ---
+
+    @staticmethod
+    def _xml_escape(series):
+        return (series.astype(str).str.replace("&", "&amp;", regex=False)
+                .str.replace("<", "&lt;", regex=False).str.replace(">", "&gt;", regex=False))
+
+    def camt053_entries(self, bank):
+        """One <Ntry> element per payment, assembled with vectorized string ops."""
+        return (
+            '<Ntry><Amt Ccy="' + bank['Currency'].astype(str) + '">'
+            + bank['Amount_Received'].map('{:.2f}'.format) + '</Amt><CdtDbtInd>CRDT</CdtDbtInd>'
+            + '<Sts>BOOK</Sts><BookgDt><Dt>' + bank['Date'].astype(str).str.slice(0, 10) + '</Dt></BookgDt>'
+            + '<NtryDtls><TxDtls><Refs><EndToEndId>' + bank['Transaction_ID'].astype(str) + '</EndToEndId></Refs>'
+            + '<RltdPties><Dbtr><Nm>' + self._xml_escape(bank['Payer_Name']) + '</Nm></Dbtr></RltdPties>'
+            + '<RmtInf><Ustrd>' + self._xml_escape(bank['Bank_Reference']) + '</Ustrd></RmtInf>'
+            + '</TxDtls></NtryDtls></Ntry>'
+        )
+
+    def camt053_header(self, statement_id="SMARTCASH-SYNTH"):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<Document xmlns="{self.CAMT_NS}"><BkToCstmrStmt>'
+            f'<GrpHdr><MsgId>{statement_id}</MsgId><CreDtTm>{self.as_of.isoformat()}</CreDtTm></GrpHdr>'
+            f'<Stmt><Id>{statement_id}-1</Id>\n'
+        )
+
+    CAMT_FOOTER = '</Stmt></BkToCstmrStmt></Document>\n'
+
+    def camt053(self, bank):
+        """Complete camt.053 document (bytes) for a bank-feed frame."""
+        body = "\n".join(self.camt053_entries(bank))
+        return (self.camt053_header() + body + "\n" + self.CAMT_FOOTER).encode("utf-8")
+
+    # --- CHUNKED WRITERS ---
+
+    def write(self, out_dir, n_rows, fmt="csv", chunksize=1_000_000, camt=False, **bank_kwargs):
+        """
+        Streams invoices.<fmt>, bank_feed.<fmt> (and optionally bank_feed.camt053.xml)
+        to out_dir one chunk at a time. Returns the written paths.
+        """
+        if fmt == "parquet" and not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet output requires pyarrow.")
+        os.makedirs(out_dir, exist_ok=True)
+        paths = {
+            "invoices": os.path.join(out_dir, f"invoices.{fmt}"),
+            "bank_feed": os.path.join(out_dir, f"bank_feed.{fmt}")
+        }
+        if camt:
+            paths["camt053"] = os.path.join(out_dir, "bank_feed.camt053.xml")
+
+        writers = {}
+        camt_fh = open(paths["camt053"], "w", encoding="utf-8") if camt else None
+        try:
+            if camt_fh:
+                camt_fh.write(self.camt053_header())
+            for i, (inv, bank) in enumerate(self.iter_chunks(n_rows, chunksize, **bank_kwargs)):
+                for name, df in (("invoices", inv), ("bank_feed", bank)):
+                    if fmt == "parquet":
+                        table = pa.Table.from_pandas(df, preserve_index=False)
+                        if name not in writers:
+                            writers[name] = pq.ParquetWriter(paths[name], table.schema)
+                        writers[name].write_table(table)
+                    else:
+                        df.to_csv(paths[name], mode="w" if i == 0 else "a", header=i == 0, index=False)
+                if camt_fh:
+                    camt_fh.write("\n".join(self.camt053_entries(bank)) + "\n")
+            if camt_fh:
+                camt_fh.write(self.CAMT_FOOTER)
+        finally:
+            for w in writers.values():
+                w.close()
+            if camt_fh:
+                camt_fh.close()
+        return paths
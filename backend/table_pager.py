@@ -0,0 +1,67 @@
+import math
+import numpy as np
+import pandas as pd
+
+
+class TablePager:
+    """
+    Server-side paging for large result tables (match results, audit log).
+    Sorting uses a cached argsort per column and filtering a cached
+    lower-cased row text, so each request only slices the visible page
+    and column subset out of the backing DataFrame.
+    """
+
+    def __init__(self, df, filter_columns=None):
+        self.df = df
+        self.filter_columns = [c for c in (filter_columns or df.columns) if c in df.columns]
+        self._orders = {}
+        self._row_text = None
+
+    def __len__(self):
+        return len(self.df)
+
+    def _order(self, column, ascending=True):
+        """Row order for a column; missing values stay last in both directions."""
+        if column not in self._orders:
+            values = self.df[column]
+            if not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+                # Stringify present values only, so NaN/None sort last instead of as 'nan'
+                values = values.astype(str).mask(values.isna())
+            ordered = values.reset_index(drop=True).sort_values(kind='stable', na_position='last')
+            self._orders[column] = (ordered.index.to_numpy(), int(ordered.notna().sum()))
+        order, n_valid = self._orders[column]
+        if ascending:
+            return order
+        return np.concatenate([order[:n_valid][::-1], order[n_valid:]])
+
+    def _filter_mask(self, text):
+        if self._row_text is None:
+            parts = [self.df[c].astype(str).str.lower() for c in self.filter_columns]
+            self._row_text = parts[0].str.cat(parts[1:], sep="\x1f") if parts else pd.Series("", index=self.df.index)
+        return self._row_text.str.contains(text.lower(), regex=False).to_numpy()
+
+    def query(self, page=1, page_size=50, sort_by=None, ascending=True, filter_text="", columns=None):
+        """
+        Returns {'rows', 'total', 'pages', 'page'} where 'rows' holds only the
+        requested page (1-based) and columns.
+        """
+        if sort_by in self.df.columns:
+            positions = self._order(sort_by, ascending)
+        else:
+            positions = np.arange(len(self.df))
+
+        if filter_text:
+            positions = positions[self._filter_mask(filter_text)[positions]]
+
+        total = len(positions)
+        pages = max(1, math.ceil(total / page_size))
+        page = min(max(1, int(page)), pages)
+        visible = positions[(page - 1) * page_size: page * page_size]
+
+        cols = [c for c in (columns or self.df.columns) if c in self.df.columns]
+        return {
+            "rows": self.df.iloc[visible][cols],
+            "total": total,
+            "pages": pages,
+            "page": page
+        }
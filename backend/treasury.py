@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from backend.compact_ledger import CompactLedger
 
 class TreasuryManager:
     def __init__(self):
@@ -43,31 +44,119 @@ class TreasuryManager:
             "liquidity_position": total_unapplied
         }
 
+    def calculate_liquidity_health_from_store(self, store, today=None):
+        """
+        Same metrics as calculate_liquidity_health, served from the running
+        aggregates of an ExposureAggregateStore instead of a ledger scan.
+        The store must use the same open filter (its default, Status == 'Open').
+        """
+        if tuple(store.open_statuses) != ('Open',):
+            raise ValueError("Liquidity health counts Status == 'Open' invoices only; "
+                             f"store tracks {store.open_statuses}")
+        if store.open_count == 0:
+            return {}
+
+        avg_dso = store.get_avg_days_overdue(today or datetime.now())
+        total_unapplied = store.get_open_ar()
+        daily_opportunity_cost = (total_unapplied * self.risk_free_rate) / 365
+        total_loss = daily_opportunity_cost * max(0, avg_dso)
+
+        return {
+            "avg_dso": round(avg_dso, 1),
+            "opportunity_cost_usd": round(total_loss, 2),
+            "concentration_risk": store.get_concentration_risk(0.20),
+            "liquidity_position": total_unapplied
+        }
+
+    def calculate_liquidity_health_sharded(self, sharded, today=None):
+        """
+        Same metrics as calculate_liquidity_health, computed per Company_Code /
+        Currency shard of a ShardedLedger in parallel and merged from partial
+        sums (amounts, days overdue, per-customer exposure).
+        """
+        today = pd.Timestamp(today or datetime.now())
+
+        def partials(shard):
+            open_invoices = shard[shard['Status'] == 'Open']
+            days = (today - pd.to_datetime(open_invoices['Due_Date'])).dt.days
+            return {
+                "days_sum": float(days.sum()),
+                "days_count": int(days.count()),
+                "by_customer": open_invoices.groupby('Customer', observed=True)['Amount'].sum()
+            }
+
+        parts = list(sharded.map_shards(partials).values())
+        if not parts:
+            return {}
+
+        days_count = sum(p["days_count"] for p in parts)
+        avg_dso = sum(p["days_sum"] for p in parts) / days_count if days_count else 0
+        by_customer = pd.concat([p["by_customer"] for p in parts])
+        by_customer = by_customer.groupby(level=0).sum()
+        total_unapplied = by_customer.sum()
+        daily_opportunity_cost = (total_unapplied * self.risk_free_rate) / 365
+        total_loss = daily_opportunity_cost * max(0, avg_dso)
+
+        concentration = by_customer / total_unapplied
+        return {
+            "avg_dso": round(avg_dso, 1),
+            "opportunity_cost_usd": round(total_loss, 2),
+            "concentration_risk": concentration[concentration > 0.20].to_dict(),
+            "liquidity_position": total_unapplied
+        }
+
     def get_cash_forecast(self, invoices_df, horizon_days=90):
         """
         Generates a 90-day cash inflow forecast.
         Adjusts expected payment dates based on ESG scores (Risk-Adjusted Forecasting).
+        A CompactLedger is forecast on its arrays (day resolution); a DataFrame
+        only needs Status, Due_Date, ESG_Score and Amount.
         """
-        open_invoices = invoices_df[invoices_df['Status'] == 'Open'].copy()
-        open_invoices['Due_Date'] = pd.to_datetime(open_invoices['Due_Date'])
-        
         # Risk-Adjustment Logic: 
         # ESG 'E' rated clients are modeled to pay 15 days late
         # ESG 'AAA' rated clients pay on time
-        def adjust_date(row):
-            delay = 0
-            if row['ESG_Score'] in ['E', 'D']: delay = 15
-            elif row['ESG_Score'] == 'C': delay = 7
-            return row['Due_Date'] + timedelta(days=delay)
+        if isinstance(invoices_df, CompactLedger):
+            return self._compact_cash_forecast(invoices_df)
 
-        open_invoices['Expected_Payment_Date'] = open_invoices.apply(adjust_date, axis=1)
-        
-        forecast = open_invoices.groupby('Expected_Payment_Date')['Amount'].sum().reset_index()
-        forecast = forecast.sort_values(by='Expected_Payment_Date')
+        open_invoices = invoices_df[invoices_df['Status'] == 'Open']
+        ratings = open_invoices['ESG_Score'].astype(object)
+        delay = np.where(ratings.isin(['E', 'D']), 15, np.where(ratings == 'C', 7, 0))
+        expected = pd.to_datetime(open_invoices['Due_Date']) + pd.to_timedelta(delay, unit='D')
+
+        forecast = open_invoices['Amount'].groupby(expected.rename('Expected_Payment_Date')).sum().reset_index()
+        forecast = forecast.sort_values(by='Expected_Payment_Date', ignore_index=True)
         
         return forecast
 
+    def _compact_cash_forecast(self, ledger):
+        """get_cash_forecast on a CompactLedger's record array."""
+        records = ledger.records
+        delay_by_rating = np.array([15 if e in ['E', 'D'] else 7 if e == 'C' else 0 for e in ledger.esg_scores])
+        is_open = ledger.mask('status', 'Open') & (records['due_days'] != CompactLedger.NO_DATE)
+        expected = records['due_days'][is_open].astype(np.int64) + delay_by_rating[records['esg'][is_open]]
+
+        days, slot = np.unique(expected, return_inverse=True)
+        amounts = np.bincount(slot, weights=np.nan_to_num(records['amount'][is_open]), minlength=len(days))
+        return pd.DataFrame({
+            'Expected_Payment_Date': days.astype('datetime64[D]').astype('datetime64[us]'),
+            'Amount': amounts
+        })
+
     def get_fx_exposure(self, invoices_df):
         """Identifies net exposure by currency for FX hedging strategies."""
+        if isinstance(invoices_df, CompactLedger):
+            records = invoices_df.records
+            totals = np.bincount(records['currency'], weights=np.nan_to_num(records['amount']),
+                                 minlength=len(invoices_df.currencies))
+            return {ccy: total for ccy, total in zip(invoices_df.currencies, totals) if not pd.isna(ccy)}
         exposure = invoices_df.groupby('Currency')['Amount'].sum().to_dict()
         return exposure
+
+    def get_fx_exposure_sharded(self, sharded):
+        """get_fx_exposure assembled from per-shard totals of a ShardedLedger."""
+        totals = sharded.map_shards(lambda shard: shard['Amount'].sum())
+        exposure = {}
+        for key, amount in totals.items():
+            currency = dict(zip(sharded.keys, key)).get('Currency', 'USD')
+            exposure[currency] = exposure.get(currency, 0) + amount
+        return exposure
@@ -0,0 +1,87 @@
+"""
+Import-time profile for the backend and app modules.
+Each module is imported in a fresh interpreter with `-X importtime`; the
+report shows cumulative import cost, the slowest dependencies, and which
+heavy UI / LLM libraries were pulled in.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time backend.engine backend.ai_agent --top 5
+"""
+import sys
+import argparse
+import subprocess
+
+DEFAULT_MODULES = [
+    "backend.ai_agent",
+    "backend.analytics",
+    "backend.compliance",
+    "backend.dunning",
+    "backend.engine",
+    "backend.exposure_store",
+    "backend.iso_parser",
+    "backend.ledger_store",
+    "backend.treasury",
+    "app.components.visuals",
+]
+
+# Libraries a batch job / container cold start should not pay for unless used
+HEAVY_MODULES = ["openai", "dotenv", "plotly", "fpdf", "pptx", "streamlit", "sklearn", "pyarrow"]
+
+
+def profile_module(module):
+    """Returns (cumulative_us, [(cumulative_us, direct dependency), ...], heavy modules loaded)."""
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    # Lines look like "import time:   self |  cumulative | <indent>name"; children precede parents
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name[1:]))
+
+    total, deps = 0, []
+    for i, (us, name) in enumerate(rows):
+        if name == module:
+            total = us
+            j = i - 1
+            while j >= 0 and rows[j][1].startswith(" "):
+                child_us, child = rows[j]
+                if not child.startswith("   "):
+                    deps.append((child_us, child.strip()))
+                j -= 1
+            break
+
+    heavy = [m for m in proc.stdout.strip().split(",") if m]
+    return total, sorted(deps, reverse=True), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<28}{'import ms':>10}  heavy deps loaded")
+    for module in args.modules:
+        try:
+            total, rows, heavy = profile_module(module)
+        except RuntimeError as e:
+            print(f"{module:<28}{'ERR':>10}  {e}")
+            continue
+        print(f"{module:<28}{total / 1000:>10.1f}  {', '.join(heavy) or '-'}")
+        for us, name in rows[:args.top]:
+            print(f"    {name:<24}{us / 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
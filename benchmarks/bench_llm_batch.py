@@ -0,0 +1,43 @@
+"""
+Offline benchmark: sequential vs batched exception reasoning against the
+FakeLLMProvider (no network, no API key).
+
+    python -m benchmarks.bench_llm_batch --exceptions 5000 --latency 0.2
+"""
+import time
+import asyncio
+import argparse
+import tempfile
+from backend.ai_agent import GenAIAssistant
+from backend.llm_batch import FakeLLMProvider
+from backend.response_cache import ResponseCache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exceptions", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rps", type=float, default=500.0)
+    args = parser.parse_args()
+
+    batch = [({"Amount": 1000.0 + i, "Payer": f"Payer {i}"}, [{"Invoice_ID": f"INV-{i}"}])
+             for i in range(args.exceptions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assistant = GenAIAssistant(cache=ResponseCache(db_path=f"{tmp}/bench.sqlite"))
+        provider = FakeLLMProvider(latency=args.latency)
+
+        start = time.perf_counter()
+        assistant.reason_exceptions(batch, provider=provider,
+                                    max_concurrency=args.concurrency, requests_per_second=args.rps)
+        batched = time.perf_counter() - start
+
+    sequential = args.exceptions * args.latency
+    print(f"exceptions={args.exceptions} latency={args.latency}s concurrency={args.concurrency} rps={args.rps}")
+    print(f"sequential (estimated): {sequential:8.2f}s")
+    print(f"batched:                {batched:8.2f}s  ({args.exceptions / batched:,.0f} exceptions/s)")
+
+
+if __name__ == "__main__":
+    main()
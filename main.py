@@ -1,10 +1,23 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from backend.engine import SmartMatchingEngine
+from backend.ledger_store import LedgerStore
+from backend.dunning import BulkDunningRun
+from backend.compliance import ComplianceVault
+from backend.match_cache import MatchResultCache, frame_fingerprint
+from backend.search_index import LedgerSearchIndex
+from backend.ageing import AgeingEngine
+from backend.shared_ledger import SharedLedger, SessionOverlay
+from backend.ledger_state import InvoiceStateStore
+from backend.stress import StressScenarioEngine
+from backend.exposure_cube import ExposureCube
+from backend.sharding import ShardedLedger
+from backend.metrics import METRICS
+from app.components.tables import render_paged_table
+from app.components.visuals import render_stress_heatmap, render_risk_radar
 
 # --- 1. BOILERPLATE & STABILITY INITIALIZATION ---
 if 'audit' not in st.session_state:
@@ -21,70 +34,87 @@ def get_matcher():
     return SmartMatchingEngine()
 
 matcher = get_matcher()
-@st.cache_data
-def load_institutional_data():
-    try:
-        # Load files from your data folder
-        inv_df = pd.read_csv("data/invoices.csv")
-        bank_df = pd.read_csv("data/bank_feed.csv")
-        
-        # 1. Clean headers (Remove hidden spaces)
-        inv_df.columns = inv_df.columns.str.strip()
-        bank_df.columns = bank_df.columns.str.strip()
-
-        # 2. FIX FOR MATCHER: Map your GitHub headers to app headers
-        # This resolves: "Ensure invoices.csv has an Invoice_ID column"
-        inv_df = inv_df.rename(columns={
-            'Invoice_No': 'Invoice_ID',    # Maps your CSV to Matcher
-            'Customer_Name': 'Customer',   # Maps your CSV to Matcher
-            'Amount': 'Amount_Remaining'
-        })
-        
-        bank_df = bank_df.rename(columns={
-            'Payer_Name': 'Customer',      # Maps your bank file to Matcher
-            'Amount_Received': 'Amount'
-        })
-
-        # 3. SAFETY DEFAULTS: Ensure columns exist for Risk Radar
-        if 'Is_Disputed' not in inv_df.columns: inv_df['Is_Disputed'] = False
-        if 'Status' not in inv_df.columns: inv_df['Status'] = 'Open'
-        if 'ESG_Score' not in inv_df.columns: inv_df['ESG_Score'] = 'A'
-        if 'Currency' not in inv_df.columns: inv_df['Currency'] = 'USD'
-        if 'Company_Code' not in inv_df.columns: inv_df['Company_Code'] = 'Main'
-
-        # 4. Convert Dates
-        inv_df['Due_Date'] = pd.to_datetime(inv_df['Due_Date'], errors='coerce')
-        
-        return inv_df, bank_df
-    except Exception as e:
-        st.error(f"⚠️ Data Loading Error: {e}")
-        return pd.DataFrame(), pd.DataFrame()
-        
-        # 3. SAFETY DEFAULTS: Prevents "Column Unavailable" crashes
-        required_cols = {
-            'Is_Disputed': False,
-            'Status': 'Open',
-            'Esg_Score': 'A',
-            'Company_Code': 'Main_Entity',
-            'Currency': 'USD'
-        }
-        for col, default in required_cols.items():
-            if col not in inv_df.columns:
-                inv_df[col] = default
-
-        # 4. DATA TYPES
-        inv_df['Due_Date'] = pd.to_datetime(inv_df['Due_Date'], errors='coerce')
-        bank_df['Date'] = pd.to_datetime(bank_df.get('Date'), errors='coerce')
-        
-        return inv_df, bank_df
-    except Exception as e:
-        st.error(f"⚠️ Initialization Error: {e}")
-        # Returns empty dataframes with correct columns so features don't disappear
-        return pd.DataFrame(columns=['Customer', 'Invoice_ID', 'Amount_Remaining', 'Due_Date', 'Status', 'Company_Code', 'Esg_Score', 'Is_Disputed', 'Currency']), pd.DataFrame()
-if 'ledger' not in st.session_state or 'bank' not in st.session_state:
-    ledger_df, bank_df = load_institutional_data()
-    st.session_state.ledger = ledger_df
-    st.session_state.bank = bank_df
+
+@st.cache_resource
+def get_metrics():
+    """Hot-path metrics; SMARTCASH_METRICS / _FILE / _PORT enable recording and Prometheus export."""
+    return METRICS.configure_from_env()
+
+get_metrics()
+
+@st.cache_resource
+def get_match_cache():
+    """Bounded match-result cache shared by every session."""
+    return MatchResultCache(max_entries=200_000)
+
+@st.cache_resource
+def get_vault():
+    """Shared WORM compliance log for batch actions (bulk dunning)."""
+    return ComplianceVault()
+
+@st.cache_resource
+def get_ledger_store():
+    """Columnar ledger store: CSV feeds are converted to typed Parquet once per process."""
+    return LedgerStore(data_dir="data")
+
+LEDGER_COLUMNS = ['Customer', 'Invoice_ID', 'Amount_Remaining', 'Due_Date', 'Status', 'Company_Code', 'ESG_Score', 'Is_Disputed', 'Currency']
+
+def load_institutional_data(company_code=None, status=None):
+    """Typed, memory-mapped slices; entity/status filters are pushed down to the reader. Read errors propagate."""
+    store = get_ledger_store()
+    inv_df = store.load_invoices(company_code=company_code, status=status)
+    bank_df = store.load_bank_feed(company_code=company_code)
+    return inv_df, bank_df
+
+def ledger_scope():
+    """
+    Ledger slice this process serves, pushed down to the Parquet reader:
+    SMARTCASH_COMPANY_CODES / SMARTCASH_LEDGER_STATUS (comma-separated).
+    Unset loads the full ledger.
+    """
+    def _values(var):
+        values = tuple(v.strip() for v in os.getenv(var, "").split(",") if v.strip())
+        return values or None
+    return _values("SMARTCASH_COMPANY_CODES"), _values("SMARTCASH_LEDGER_STATUS")
+
+@st.cache_resource
+def get_shared_ledger(company_code=None, status=None):
+    """
+    One immutable ledger + bank feed per process (and scope); sessions only keep an edit overlay.
+    Load errors raise out of the cache, so a transient failure is retried on the next rerun.
+    """
+    ledger_df, bank_df = load_institutional_data(company_code=company_code, status=status)
+    # Every column: the version keys the search index, exposure cube and shard caches alike
+    version = frame_fingerprint(ledger_df, list(ledger_df.columns))
+    return SharedLedger(ledger_df, version=version), bank_df
+
+try:
+    shared_ledger, shared_bank = get_shared_ledger(*ledger_scope())
+except Exception as e:
+    st.error(f"⚠️ Data Loading Error: {e}")
+    # Uncached empty ledger with the right columns for this run only, so features don't disappear
+    shared_ledger, shared_bank = SharedLedger(pd.DataFrame(columns=LEDGER_COLUMNS), version="unavailable"), pd.DataFrame()
+if 'overlay' not in st.session_state:
+    st.session_state.overlay = SessionOverlay(shared_ledger)
+elif st.session_state.overlay.base_version != shared_ledger.version:
+    # Ledger reloaded: carry this session's disputes over by Invoice_ID
+    st.session_state.overlay = st.session_state.overlay.rebase(shared_ledger)
+overlay = st.session_state.overlay
+if 'state_store' not in st.session_state:
+    st.session_state.state_store = InvoiceStateStore(overlay)
+state_store = st.session_state.state_store
+state_store.overlay = overlay
+
+# Cached builders take the SharedLedger itself: its frame is only read on a cache miss
+@st.cache_resource(max_entries=4)
+def get_search_index(ledger_version, _shared):
+    """Trigram/prefix index over the searchable ledger fields, built once per ledger version."""
+    return LedgerSearchIndex(_shared.frame, version=ledger_version)
+
+@st.cache_resource(max_entries=4)
+def get_sharded_ledger(ledger_version, _shared):
+    """Engine-schema ledger partitioned by Company_Code x Currency, built once per ledger version."""
+    return ShardedLedger(_shared.frame.rename(columns={'Amount_Remaining': 'Amount'}), version=ledger_version)
 
 def handle_clear():
     st.session_state.search_key = ""
@@ -117,23 +147,27 @@ with h_col3:
 st.divider()
 
 # --- 5. SEARCH & FILTER LOGIC ---
-view_df = st.session_state.ledger.copy()
-
-if not view_df.empty:
-    if search_term:
-        view_df = view_df[view_df['Customer'].astype(str).str.contains(search_term, case=False) | 
-                          view_df['Invoice_ID'].astype(str).str.contains(search_term, case=False)]
-    elif chat_term:
-        view_df = view_df[view_df['Customer'].astype(str).str.contains(chat_term, case=False) | 
-                          view_df['Invoice_ID'].astype(str).str.contains(chat_term, case=False)]
+# Filters narrow an array of row positions over the shared ledger; rows are
+# only materialized for what a page actually shows or acts on.
+ledger_view = overlay.view()
+
+if not ledger_view.empty:
+    query = search_term or chat_term
+    if query:
+        # Index lookup returns ledger row positions (no per-keystroke column scan)
+        search_index = get_search_index(shared_ledger.version, shared_ledger)
+        ledger_view = ledger_view.restrict(search_index.search(query))
+        suggestions = search_index.suggest(query, limit=5)
+        if suggestions:
+            st.caption("🔎 Top exposures: " + " · ".join(suggestions))
 
 with st.sidebar:
     st.header("⚙️ Controls")
     menu = st.radio("Workspace", ["📈 Dashboard", "🛡️ Risk Radar", "⚡ Workbench", "📜 Audit"])
     latency = st.slider("Collection Latency (Days)", 0, 90, 15)
     
-    if 'Company_Code' in st.session_state.ledger.columns and not st.session_state.ledger.empty:
-        entities = ["Consolidated"] + list(st.session_state.ledger['Company_Code'].unique())
+    if 'Company_Code' in shared_ledger.columns and len(shared_ledger):
+        entities = ["Consolidated"] + list(pd.unique(shared_ledger.column('Company_Code')))
         ent_f = st.selectbox("Company Entity", entities)
     else:
         st.warning("⚠️ 'Company_Code' column not found.")
@@ -142,25 +176,46 @@ with st.sidebar:
     st.divider()
     stress_test = st.toggle("Enable Stress Loading", help="Simulate high-risk market conditions")
 
-if ent_f != "Consolidated" and not view_df.empty:
-    if 'Company_Code' in view_df.columns:
-        view_df = view_df[view_df['Company_Code'] == ent_f]
-    
-if 'Amount_Remaining' in view_df.columns and not view_df.empty:
-    liq_pool = (pd.to_numeric(view_df['Amount_Remaining'], errors='coerce').sum() / 1e6) - (latency * 0.12)
+if ent_f != "Consolidated" and not ledger_view.empty:
+    if 'Company_Code' in shared_ledger.columns:
+        ledger_view = ledger_view.where('Company_Code', ent_f)
+
+def view_rows(keep=None, columns=None):
+    """Materializes the filtered view (optionally narrowed by a row mask) for the given columns."""
+    view = ledger_view if keep is None else ledger_view.mask(keep)
+    return view.frame([c for c in columns if c in shared_ledger.columns] if columns else None)
+
+if 'Amount_Remaining' in shared_ledger.columns and not ledger_view.empty:
+    liq_pool = (pd.to_numeric(pd.Series(ledger_view.column('Amount_Remaining')), errors='coerce').sum() / 1e6) - (latency * 0.12)
 else:
     liq_pool = 0.0
 
 today = datetime(2026, 1, 30)
 
+@st.cache_resource(max_entries=4)
+def get_exposure_cube(ledger_version, _shared):
+    """Company x Currency x Rating x Customer exposure cube, built once per ledger version."""
+    return ExposureCube.from_frame(_shared.frame, as_of=today, version=ledger_version)
+
+def get_view_cube(query, entity):
+    """Slices the shared cube by entity; searches and session edits to cube columns aggregate the view."""
+    if query or overlay.edited_columns & set(ExposureCube.SOURCE_COLUMNS):
+        return ExposureCube.from_frame(view_rows(columns=ExposureCube.SOURCE_COLUMNS), as_of=today)
+    cube = get_exposure_cube(shared_ledger.version, shared_ledger)
+    return cube if entity == "Consolidated" else cube.slice(Company_Code=entity)
+
 # --- 6. WORKSPACE ---
 
+# Plotly is imported only by the pages that draw charts (Workbench/Audit never need it)
 if menu == "📈 Dashboard":
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     m1, m2, m3, m4 = st.columns(4)
     m1.metric("Cash Conversion Cycle", f"{42+latency} Days", f"{'+3d' if stress_test else '-1d'}", delta_color="inverse")
     m2.metric("Filtered Liquidity", f"${liq_pool:.2f}M")
     m3.metric("Adjusted DSO", f"{34+latency}d")
-    m4.metric("Matching Items", len(view_df))
+    m4.metric("Matching Items", len(ledger_view))
 
     st.divider()
 
@@ -184,28 +239,12 @@ if menu == "📈 Dashboard":
 
     st.subheader("⏳ Accounts Receivable Ageing Analysis")
 
-    if 'Status' in view_df.columns and not view_df.empty:
-        ov = view_df[view_df['Status'] == 'Overdue'].copy()
+    if 'Status' in shared_ledger.columns and not ledger_view.empty:
+        is_overdue = ledger_view.column('Status') == 'Overdue'
+        ov = view_rows(is_overdue, ['Due_Date', 'Amount_Remaining'])
         
         if not ov.empty and 'Due_Date' in ov.columns:
-            ov['Due_Date'] = pd.to_datetime(ov['Due_Date'])
-            
-            def get_bucket(invoice_date):
-                try:
-                    diff = (today - invoice_date).days
-                    if diff <= 15: return "0-15"
-                    elif diff <= 30: return "16-30"
-                    elif diff <= 60: return "31-60"
-                    elif diff <= 90: return "61-90"
-                    elif diff <= 120: return "91-120"
-                    elif diff <= 180: return "121-180"
-                    elif diff <= 360: return "181-360"
-                    else: return "361+"
-                except: return "Unknown"
-
-            ov['Bucket'] = ov['Due_Date'].apply(get_bucket)
-            order = ["0-15", "16-30", "31-60", "61-90", "91-120", "121-180", "181-360", "361+"]
-            age_data = ov.groupby('Bucket')['Amount_Remaining'].sum().reindex(order, fill_value=0).reset_index()
+            age_data = AgeingEngine.operational(as_of=today).bucket_totals(ov, 'Amount_Remaining')
             
             fig_age = px.bar(age_data, x='Bucket', y='Amount_Remaining', 
                              labels={'Bucket': 'Days Past Due (DPD)', 'Amount_Remaining': 'Balance ($)'},
@@ -213,12 +252,12 @@ if menu == "📈 Dashboard":
             fig_age.update_layout(template="plotly_dark", height=450)
             st.plotly_chart(fig_age, use_container_width=True)
         else: 
-            total_pending = view_df['Amount_Remaining'].sum()
+            total_pending = pd.Series(ledger_view.column('Amount_Remaining')).sum()
             st.info(f"✅ No overdue items found for the current selection.")
             st.metric("Total Outstanding (Current)", f"${total_pending:,.2f}")
             
             st.write("📅 **Upcoming Receivables (Next 30 Days):**")
-            upcoming = view_df[view_df['Status'] != 'Overdue'].sort_values('Due_Date').head(5)
+            upcoming = view_rows(~is_overdue, ['Customer', 'Due_Date', 'Amount_Remaining']).sort_values('Due_Date').head(5)
             if not upcoming.empty:
                 st.dataframe(upcoming[['Customer', 'Due_Date', 'Amount_Remaining']], use_container_width=True)
     else:
@@ -230,57 +269,25 @@ if menu == "📈 Dashboard":
     fx_range = np.array([-15, -10, -5, -2, 0, 5, 10])
     hedge_range = np.array([0, 25, 50, 75, 100])
     multiplier = 0.85 if stress_test else 1.0
-    z_data = [[round(liq_pool * multiplier * (1 + (fx/100) * (1 - (h/100))), 2) for h in hedge_range] for fx in fx_range]
-
-    fig_h = go.Figure(data=go.Heatmap(
-        z=z_data, x=[f"{h}% Hedge" for h in hedge_range], y=[f"{fx}% Vol" for fx in fx_range],
-        colorscale='RdYlGn', text=z_data, texttemplate="$%{text}M", hoverinfo="z"
-    ))
-    fig_h.update_layout(template="plotly_dark", height=400, xaxis_title="Hedge Coverage", yaxis_title="FX Volatility (%)")
-    st.plotly_chart(fig_h, use_container_width=True)
+    # FX shocks hit each currency's exposure, hedges each entity's; latency drag is not FX-sensitive
+    stress_engine = (StressScenarioEngine.from_frame(view_rows(columns=['Amount_Remaining', 'Currency', 'Company_Code']))
+                     if not ledger_view.empty else None)
+    if stress_engine is not None:
+        z_data = np.round((stress_engine.grid(fx_range, hedge_range) / 1e6 - latency * 0.12) * multiplier, 2)
+    else:
+        z_data = np.zeros((len(fx_range), len(hedge_range)))
+    render_stress_heatmap(z_data, fx_range, hedge_range, height=400)
 
 elif menu == "🛡️ Risk Radar":
-    if not view_df.empty:
+    if not ledger_view.empty:
         weights = {'AAA':0.05, 'AA':0.1, 'A':0.2, 'B':0.4, 'C':0.6, 'D':0.9}
-        
-        # Safe column processing
-        for col in ['Company_Code', 'Currency', 'ESG_Score', 'Customer']:
-            if col in view_df.columns:
-                view_df[col] = view_df[col].astype(str).replace('nan', 'Unknown')
-            else:
-                view_df[col] = "Unknown"
-        
-        # Fix: Ensure all numeric and categorical data is cleaned before passing to Plotly
-        view_df['Amount_Remaining'] = pd.to_numeric(view_df['Amount_Remaining'], errors='coerce').fillna(0)
-        view_df = view_df.fillna("Unknown") 
-        
-        if 'ESG_Score' in view_df.columns:
-            view_df['Exposure'] = view_df['Amount_Remaining'] * view_df['ESG_Score'].map(weights).fillna(0)
-        else:
-            view_df['Exposure'] = 0
-            
-        view_df['Amount_M'] = view_df['Amount_Remaining'] / 1_000_000
-
-        fig_s = px.sunburst(
-            view_df, 
-            path=['Company_Code', 'Currency', 'ESG_Score', 'Customer'], 
-            values='Exposure', 
-            color='ESG_Score',
-            color_discrete_map={
-                'AAA':'#238636', 'AA':'#2ea043', 'A':'#d29922', 
-                'B':'#db6d28', 'C':'#f85149', 'D':'#b62323'
-            },
-            hover_data=['Amount_M']
-        )
-        
-        fig_s.update_traces(
-            hovertemplate="<b>%{label}</b><br>" + 
-                          "Total Value: $%{customdata[0]:,.4f}M<br>" + 
-                          "Risk Exposure: $%{value:,.2f}<extra></extra>"
-        )
 
-        fig_s.update_layout(height=700, template="plotly_dark")
-        st.plotly_chart(fig_s, use_container_width=True)
+        # Cube cells are risk-weighted once; every sunburst ring is a roll-up of them
+        cube = get_view_cube(search_term or chat_term, ent_f).with_weights(weights, name='Exposure')
+        render_risk_radar(
+            cube, path=['Company_Code', 'Currency', 'ESG_Score', 'Customer'], value='Exposure',
+            title=None, height=700
+        )
     else:
         st.info("Please ensure data is loaded to view Risk Radar.")
         
@@ -290,46 +297,34 @@ elif menu == "⚡ Workbench":
     
     with t1:
         st.write("**Intelligent Bank Reconciliation**")
-        match_df = st.session_state.bank.copy()
-        ledger_ref = st.session_state.ledger
+        match_df = shared_bank.copy()
         
-        if not match_df.empty and 'Customer' in match_df.columns and 'Invoice_ID' in ledger_ref.columns:
-            # --- FIX STARTS HERE ---
-            def get_invoice(row):
-                try:
-                    # Clean the data: Convert amount to number and name to string
-                    clean_amt = pd.to_numeric(row['Amount'], errors='coerce')
-                    clean_cust = str(row['Customer']) if pd.notnull(row['Customer']) else ""
-                    
-                    # If data is missing or invalid, skip matching for this row
-                    if not clean_cust or pd.isna(clean_amt):
-                        return "Invalid Data"
-
-                    results = matcher.run_match(
-                        amount=clean_amt, 
-                        customer_name=clean_cust, 
-                        currency=row.get('Currency', 'USD'), 
-                        ledger_df=ledger_ref
-                    )
-                    
-                    if results:
-                        best = results[0]
-                        conf = float(best.get('confidence', 0))
-                        return f"{best['Invoice_ID']} ({int(conf*100)}%)"
+        if not match_df.empty and 'Customer' in match_df.columns and 'Invoice_ID' in shared_ledger.columns:
+            # Payments only settle invoices of their own entity and currency, so each
+            # one is scored against its Company_Code x Currency shard (shards run in
+            # parallel). Results are cached per bank-row content under a fingerprint
+            # of the shard and engine config: reruns, tab switches and search
+            # keystrokes only re-match new or changed payments.
+            if ent_f != "Consolidated" and 'Company_Code' in match_df.columns:
+                match_df = match_df[match_df['Company_Code'].astype(str) == str(ent_f)].reset_index(drop=True)
+            sharded = get_sharded_ledger(shared_ledger.version, shared_ledger)
+            best_matches = sharded.match_bank_feed(matcher, match_df, cache=get_match_cache())
+
+            def format_suggestion(best):
+                if best is None:
                     return "No Match"
-                except:
-                    return "Matching Error"
-
-            # --- FIX ENDS HERE ---
+                if isinstance(best, str):
+                    return best
+                return f"{best['Invoice_ID']} ({int(float(best.get('confidence', 0))*100)}%)"
 
-            match_df['Suggested_Invoice'] = match_df.apply(get_invoice, axis=1)
-            st.dataframe(match_df, use_container_width=True)
+            match_df['Suggested_Invoice'] = [format_suggestion(b) for b in best_matches]
+            render_paged_table(match_df, key="matcher", filter_columns=['Customer', 'Suggested_Invoice'])
             st.info("AI Matcher identified links between receipts and receivables.")
         else:
             st.warning("Cannot run Matcher. Ensure 'invoices.csv' has an 'Invoice_ID' column and both files have 'Customer'.")
             
     with t2:
-        ov = view_df[view_df['Status'] == 'Overdue'] if 'Status' in view_df.columns else pd.DataFrame()
+        ov = view_rows(ledger_view.column('Status') == 'Overdue') if 'Status' in shared_ledger.columns else pd.DataFrame()
         if not ov.empty:
             target = st.selectbox("Select Debtor", ov['Customer'].unique())
             inv = ov[ov['Customer'] == target].iloc[0]
@@ -359,33 +354,50 @@ Treasury Operations Team"""
                     "Detail": f"Sent to {target}"
                 })
                 st.success("Notice dispatched.")
+
+            st.divider()
+            st.markdown("### 📬 Bulk Dunning Run")
+            st.caption(f"{ov['Customer'].nunique()} debtors · {len(ov)} overdue invoices · one consolidated notice per debtor")
+            if st.button("📤 Run Bulk Dunning (All Overdue)"):
+                # Open-but-past-due rows count too, so the run gets the whole filtered view (on click only)
+                summary = BulkDunningRun(vault=get_vault()).run(view_rows(), outbox_dir="data/outbox", as_of=today)
+                st.session_state.audit.insert(0, {
+                    "Time": datetime.now().strftime("%H:%M"),
+                    "Action": "DUNNING_BULK",
+                    "ID": f"{summary['notices']} notices",
+                    "Detail": f"{summary['invoices']} invoices → {summary['outbox']}"
+                })
+                st.success(f"{summary['notices']} notices written to {summary['outbox']} ({summary['by_tier']}).")
         else: 
             st.info(f"✅ No overdue items found for dunning.")
 
     with t3:
         c_flag, c_res = st.columns(2)
-        if not view_df.empty:
-            id_col = 'Invoice_ID' if 'Invoice_ID' in view_df.columns else 'Invoice'
+        if not ledger_view.empty:
+            id_col = 'Invoice_ID' if 'Invoice_ID' in shared_ledger.columns else 'Invoice'
+            ids = ledger_view.column(id_col)
+            is_disputed = ledger_view.column('Is_Disputed').astype(bool)
             with c_flag:
-                not_disputed = view_df[~view_df['Is_Disputed']]
-                if not not_disputed.empty:
-                    to_freeze = st.selectbox("Invoice to Freeze", not_disputed[id_col])
-                    if st.button("🚩 Freeze Invoice"):
-                        idx = st.session_state.ledger.index[st.session_state.ledger[id_col] == to_freeze][0]
-                        st.session_state.ledger.at[idx, 'Is_Disputed'] = True
-                        st.session_state.audit.insert(0, {"Time": datetime.now().strftime("%H:%M"), "Action": "DISPUTE_FLAG", "ID": to_freeze, "Detail": "Manual Dispute"})
+                not_disputed = ids[~is_disputed]
+                if len(not_disputed):
+                    to_freeze = st.multiselect("Invoices to Freeze", not_disputed)
+                    if st.button("🚩 Freeze Invoices") and to_freeze:
+                        # Hash-indexed bulk update of this session's overlay, journaled to the vault
+                        changed = state_store.freeze(to_freeze)
+                        state_store.flush_to_vault(get_vault())
+                        st.session_state.audit.insert(0, {"Time": datetime.now().strftime("%H:%M"), "Action": "DISPUTE_FLAG", "ID": ", ".join(changed[:5]) + (" …" if len(changed) > 5 else ""), "Detail": f"Manual Dispute ({len(changed)} invoices)"})
                         st.rerun()
                 else:
                     st.info("No invoices available to freeze.")
                     
             with c_res:
-                disputed = view_df[view_df['Is_Disputed']]
-                if not disputed.empty:
-                    to_resolve = st.selectbox("Invoice to Unfreeze", disputed[id_col])
-                    if st.button("✅ Resolve"):
-                        idx = st.session_state.ledger.index[st.session_state.ledger[id_col] == to_resolve][0]
-                        st.session_state.ledger.at[idx, 'Is_Disputed'] = False
-                        st.session_state.audit.insert(0, {"Time": datetime.now().strftime("%H:%M"), "Action": "RESOLVED", "ID": to_resolve, "Detail": "Issue Settled"})
+                disputed = ids[is_disputed]
+                if len(disputed):
+                    to_resolve = st.multiselect("Invoices to Unfreeze", disputed)
+                    if st.button("✅ Resolve") and to_resolve:
+                        changed = state_store.unfreeze(to_resolve)
+                        state_store.flush_to_vault(get_vault())
+                        st.session_state.audit.insert(0, {"Time": datetime.now().strftime("%H:%M"), "Action": "RESOLVED", "ID": ", ".join(changed[:5]) + (" …" if len(changed) > 5 else ""), "Detail": f"Issue Settled ({len(changed)} invoices)"})
                         st.rerun()
                 else: 
                     st.info("No active disputes.")
@@ -396,7 +408,7 @@ elif menu == "📜 Audit":
     st.write("### 📜 System Audit Log")
     if st.session_state.audit:
         audit_df = pd.DataFrame(st.session_state.audit)
-        st.table(audit_df)
+        render_paged_table(audit_df, key="audit")
         if st.button("🗑️ Clear Log"):
             st.session_state.audit = []
             st.rerun()
@@ -1,40 +1,25 @@
-import pandas as pd
-import numpy as np
-import os
-
-def generate_institutional_data():
-    # Fix for GitHub Runners: Ensure the data directory exists
-    if not os.path.exists('data'):
-        os.makedirs('data')
+import argparse
+from backend.synthetic import SyntheticLedgerGenerator
 
+def generate_institutional_data(rows=50, out_dir='data', fmt='csv', seed=42, chunksize=1_000_000, camt=False):
+    """
+    Writes invoices + bank feed in the raw ERP/bank schema that LedgerStore
+    normalizes and backend/engine.py reads (Invoice_ID, Customer, Amount, ...).
+    Scales to millions of rows: data is generated and written chunk by chunk.
+    """
     # Seed for reproducibility in CI/CD tests
-    np.random.seed(42)
-    rows = 50
-
-    # Match the schema used in backend/engine.py and tests
-    invoices = pd.DataFrame({
-        'Invoice_ID': [f'INV-{2026000 + i}' for i in range(rows)],
-        'Customer': np.random.choice(['Tesla Inc', 'Saurabh Soft', 'Acme Corp'], size=rows),
-        'Amount_Remaining': np.round(np.random.uniform(1000, 50000, size=rows), 2),
-        'Currency': np.random.choice(['USD', 'EUR', 'GBP'], size=rows),
-        'Due_Date': ['2026-02-15'] * rows,
-        'Status': np.random.choice(['Open', 'Paid'], size=rows),
-        'Company_Code': np.random.choice(['US01', 'EU10', 'AP20'], size=rows),
-        'ESG_Score': np.random.choice(['AAA', 'AA', 'A', 'B', 'C', 'D'], size=rows)
-    })
-
-    # Bank Feed with the matching keys for the AI Matcher
-    bank = pd.DataFrame({
-        'Bank_TX_ID': [f'TXN-{i}' for i in range(10)],
-        'Payer_Name': np.random.choice(['TSLA MOTORS', 'SAURABH SOFTWARE', 'ACME CORP'], size=10),
-        'Amount_Received': np.round(np.random.uniform(1000, 50000, size=10), 2),
-        'Currency': np.random.choice(['USD', 'EUR'], size=10),
-        'Company_Code': np.random.choice(['US01', 'EU10'], size=10)
-    })
-
-    invoices.to_csv('data/invoices.csv', index=False)
-    bank.to_csv('data/bank_feed.csv', index=False)
-    print("✅ Success: Mock data generated with synchronized column names.")
+    generator = SyntheticLedgerGenerator(seed=seed)
+    paths = generator.write(out_dir, rows, fmt=fmt, chunksize=chunksize, camt=camt)
+    print(f"✅ Success: {rows:,} invoices / payments written to {', '.join(paths.values())}")
+    return paths
 
 if __name__ == "__main__":
-    generate_institutional_data()
+    parser = argparse.ArgumentParser(description="Generate schema-consistent synthetic ledger data.")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--camt", action="store_true", help="Also write a camt.053 XML statement")
+    args = parser.parse_args()
+    generate_institutional_data(args.rows, args.out, args.format, args.seed, args.chunksize, args.camt)
@@ -0,0 +1,135 @@
+import pytest
+import numpy as np
+import pandas as pd
+import backend.name_matcher as name_matcher
+from backend.engine import SmartMatchingEngine
+from backend.compact_ledger import CompactLedger
+from backend.synthetic import SyntheticLedgerGenerator
+from backend.treasury import TreasuryManager
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-001', 'INV-002', 'INV-003', 'INV-004'],
+        'Customer': ['Tesla Inc', 'Global Blue SE', 'Tesla Inc', 'Saurabh Soft'],
+        'Amount': [50000.00, 1500.00, 7200.00, 2500.00],
+        'Currency': ['USD', 'EUR', 'USD', 'USD'],
+        'Status': ['Open', 'Open', 'Paid', 'Open'],
+        'ESG_Score': ['AA', 'C', 'AA', 'E'],
+        'Due_Date': pd.to_datetime(['2026-02-01', '2026-02-01', None, '2026-02-10'])
+    })
+
+def test_records_are_interned_and_compact():
+    """
+    Test 1: Values are interned behind narrow integer codes and round-trip to the engine schema.
+    """
+    invoices = SyntheticLedgerGenerator(seed=2).invoices(20_000)
+    compact = CompactLedger.from_frame(invoices)
+
+    assert compact.records.dtype['customer'] == np.int8 and compact.records.itemsize <= 24
+    assert len(compact.customers) == invoices['Customer'].nunique()
+    as_strings = invoices.astype({c: str for c in ['Company_Code', 'Customer', 'Currency', 'Status', 'ESG_Score']})
+    assert compact.nbytes * 3 < as_strings.memory_usage(deep=True).sum()
+
+    back = compact.to_frame()
+    assert back['Invoice_ID'].tolist() == invoices['Invoice_ID'].tolist()
+    assert back['Amount'].tolist() == invoices['Amount'].tolist()
+    assert back['Customer'].astype(str).tolist() == invoices['Customer'].astype(str).tolist()
+    assert compact.fingerprint == CompactLedger.from_frame(invoices).fingerprint
+
+def test_matches_equal_for_frames_and_compact_ledgers(ledger):
+    """
+    Test 2: The array matcher keeps the waterfall semantics (statuses, 'N/A' fields, due-date text).
+    """
+    engine = SmartMatchingEngine()
+    compact = CompactLedger.from_frame(ledger)
+    for payment in [(50000.00, "tsla motors gmbh", "USD"), (1500.00, "Zeta Holdings", "EUR"), (2497.0, "Saurabh Soft", "USD")]:
+        assert engine.run_match(*payment, compact) == engine.run_match(*payment, ledger)
+
+    best = engine.run_match(50000.00, "tsla motors gmbh", "USD", compact)[0]
+    assert best['Invoice_ID'] == 'INV-001' and best['status'] == "EXCEPTION: High Confidence" and best['confidence'] == 0.9
+    assert best['due_date'] == '2026-02-01 00:00:00' and best['esg_score'] == 'AA'
+
+    unknown = engine.run_match(1500.00, "Zeta Holdings", "EUR", compact)[0]
+    assert unknown['confidence'] == 0.7
+    assert unknown['status'] == "EXCEPTION: High Confidence (Amount Matched, Name Check Required)"
+
+    bare = engine.run_match(2500.00, "Saurabh Soft", "USD", ledger[['Invoice_ID', 'Customer', 'Amount', 'Currency']])
+    assert bare[0]['esg_score'] == 'N/A' and bare[0]['due_date'] == 'N/A'
+    assert engine.run_match(10.0, "Tesla Inc", "USD", ledger.drop(columns=['Currency'])) == []
+
+def test_name_scores_are_computed_once_per_customer(ledger, monkeypatch):
+    """
+    Test 3: Fuzzy scoring runs only for amount hits, once per customer, and is reused for a repeat payer.
+    """
+    calls = []
+    ratio = name_matcher.fuzz.token_set_ratio
+    monkeypatch.setattr(name_matcher.fuzz, "token_set_ratio", lambda a, b: calls.append(b) or ratio(a, b))
+
+    engine = SmartMatchingEngine()
+    compact = CompactLedger.from_frame(ledger)
+    engine.run_match(50000.00, "Tesla Inc", "USD", compact)
+    assert calls == ['tesla inc']
+
+    engine.run_match(7200.00, "Tesla Inc", "USD", compact)
+    assert calls == ['tesla inc']
+    engine.run_match(2500.00, "Saurabh Soft", "USD", compact)
+    assert calls == ['tesla inc', 'saurabh soft']
+
+def test_treasury_forecast_and_fx_on_compact_ledger(ledger):
+    """
+    Test 4: The cash forecast applies rating delays to open invoices only; FX exposure matches the frame path.
+    """
+    treasury = TreasuryManager()
+    compact = CompactLedger.from_frame(ledger)
+
+    forecast = treasury.get_cash_forecast(compact)
+    assert forecast['Expected_Payment_Date'].dt.strftime('%Y-%m-%d').tolist() == ['2026-02-01', '2026-02-08', '2026-02-25']
+    assert forecast['Amount'].tolist() == [50000.0, 1500.0, 2500.0]
+    assert treasury.get_cash_forecast(ledger).equals(forecast)
+
+    assert treasury.get_fx_exposure(compact) == pytest.approx(treasury.get_fx_exposure(ledger))
+
+def test_frame_forecast_needs_only_forecast_columns():
+    """
+    Test 5: A DataFrame forecast needs only Status/Due_Date/ESG_Score/Amount and keeps intra-day due times apart.
+    """
+    frame = pd.DataFrame({
+        'Status': ['Open', 'Open', 'Open', 'Paid'],
+        'Due_Date': ['2026-03-01 09:00', '2026-03-01 17:30', '2026-02-22 09:00', '2026-03-01 09:00'],
+        'ESG_Score': ['AA', 'AA', 'C', 'AA'],
+        'Amount': [100.0, 250.0, 40.0, 999.0]
+    })
+
+    forecast = TreasuryManager().get_cash_forecast(frame)
+    assert forecast['Expected_Payment_Date'].dt.strftime('%Y-%m-%d %H:%M').tolist() == ['2026-03-01 09:00', '2026-03-01 17:30']
+    assert forecast['Amount'].tolist() == [140.0, 250.0]
+
+def test_dataframe_input_is_converted_once(ledger, monkeypatch):
+    """
+    Test 6: Repeated run_match calls on one DataFrame reuse its compact form (and name memo) until the frame goes away.
+    """
+    import gc
+    import backend.compact_ledger as compact_ledger
+    conversions = []
+    from_frame = CompactLedger.from_frame.__func__
+    monkeypatch.setattr(CompactLedger, "from_frame", classmethod(lambda cls, df: conversions.append(len(df)) or from_frame(cls, df)))
+
+    engine = SmartMatchingEngine()
+    first = engine.run_match(50000.00, "tsla motors gmbh", "USD", ledger)
+    assert engine.run_match(50000.00, "tsla motors gmbh", "USD", ledger) == first
+    engine.run_match(2500.00, "Saurabh Soft", "USD", ledger)
+    assert conversions == [4]
+    assert CompactLedger.of(ledger).memo
+
+    engine.run_match(50000.00, "tsla motors gmbh", "USD", ledger.copy())
+    engine.run_match(50000.00, "tsla motors gmbh", "USD", ledger.head(3))
+    assert conversions == [4, 4, 3]
+
+    scratch = ledger.copy()
+    CompactLedger.of(scratch)
+    key = id(scratch)
+    assert key in compact_ledger._FRAME_LEDGERS
+    del scratch
+    gc.collect()
+    assert key not in compact_ledger._FRAME_LEDGERS
@@ -0,0 +1,74 @@
+import os
+import pytest
+import pandas as pd
+from backend.dunning import BulkDunningRun
+from backend.compliance import ComplianceVault
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-001', 'INV-002', 'INV-003', 'INV-004', 'INV-005', 'INV-006'],
+        'Customer': ['Tesla Inc', 'Tesla Inc', 'Nordic Oil', 'Nordic Oil', 'Sino Tech', 'Euro Mart'],
+        'Amount_Remaining': [1000.0, 2500.0, 400.0, 600.0, 2_000_000.0, 50.0],
+        'Currency': ['USD', 'EUR', 'GBP', 'GBP', 'USD', 'EUR'],
+        'Due_Date': ['2026-01-01', '2025-12-01', '2025-10-01', '2026-02-15', '2025-12-20', '2025-12-01'],
+        'Status': ['Overdue', 'Overdue', 'Overdue', 'Open', 'Overdue', 'Overdue'],
+        'ESG_Score': ['AA', 'AA', 'B', 'B', 'D', 'A'],
+        'Is_Disputed': [False, False, False, False, False, True]
+    })
+
+def test_notices_consolidate_per_debtor(ledger):
+    """
+    Test 1: One notice per debtor; not-yet-due and disputed invoices are skipped.
+    """
+    notices = BulkDunningRun().build_notices(ledger, as_of='2026-01-30').set_index('Customer')
+
+    assert sorted(notices.index) == ['Nordic Oil', 'Sino Tech', 'Tesla Inc']
+    assert notices.loc['Tesla Inc', 'Invoice_Count'] == 2
+    assert notices.loc['Tesla Inc', 'Totals'] == 'USD 1,000.00 + EUR 2,500.00'
+    assert notices.loc['Nordic Oil', 'Invoice_IDs'] == 'INV-003'
+    assert 'INV-004' not in notices.loc['Nordic Oil', 'Notice']
+
+def test_esg_tiers_drive_tone_and_escalation(ledger):
+    """
+    Test 2: ESG tier selects the template; only high-risk large/old accounts escalate.
+    """
+    notices = BulkDunningRun().build_notices(ledger, as_of='2026-01-30').set_index('Customer')
+
+    assert notices.loc['Tesla Inc', 'Tier'] == 'COLLABORATIVE'
+    assert notices.loc['Nordic Oil', 'Tier'] == 'FIRM'
+    assert notices.loc['Sino Tech', 'Notice'].startswith('Subject: URGENT: Final Notice')
+    assert notices['Escalate'].tolist().count(True) == 1
+    assert bool(notices.loc['Sino Tech', 'Escalate'])
+
+def test_run_streams_outbox_and_audits(ledger, tmp_path):
+    """
+    Test 3: Each notice is written to the outbox and logged once to the vault.
+    """
+    vault = ComplianceVault(ledger_path=str(tmp_path / "compliance_log.csv"))
+    outbox = tmp_path / "outbox"
+
+    summary = BulkDunningRun(vault=vault).run(ledger, outbox_dir=str(outbox), as_of='2026-01-30')
+
+    assert summary['notices'] == 3 and summary['invoices'] == 4
+    assert summary['escalated_to_model'] == 0  # No assistant configured
+    assert len(os.listdir(outbox)) == 3
+
+    logs = vault.get_logs()
+    assert len(logs) == 3
+    assert set(logs['Action']) == {'DUNNING_COLLABORATIVE', 'DUNNING_FIRM', 'DUNNING_ESCALATION'}
+
+def test_tone_follows_adaptive_email_tiers(ledger):
+    """
+    Test 4: Only AA/A debtors get the friendly reminder; AAA and unknown ratings (e.g. 'Overdue') are formal.
+    """
+    ledger = ledger.copy()
+    ledger.loc[[0, 1], 'ESG_Score'] = ['AAA', 'AAA']
+    ledger.loc[2, 'ESG_Score'] = 'Overdue'
+    ledger.loc[5, ['ESG_Score', 'Is_Disputed']] = ['A', False]
+    notices = BulkDunningRun().build_notices(ledger, as_of='2026-01-30').set_index('Customer')
+
+    assert notices.loc['Tesla Inc', 'Tier'] == 'FIRM'
+    assert notices.loc['Nordic Oil', 'Tier'] == 'FIRM' and notices.loc['Nordic Oil', 'ESG_Score'] == 'N/A'
+    assert notices.loc['Euro Mart', 'Tier'] == 'COLLABORATIVE'
+    assert notices.loc['Euro Mart', 'Notice'].startswith('Subject: Friendly reminder')
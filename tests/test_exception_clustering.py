@@ -0,0 +1,63 @@
+import pytest
+import pandas as pd
+from backend.exception_clustering import ExceptionClusterer
+from backend.ai_agent import GenAIAssistant
+from backend.llm_batch import FakeLLMProvider
+from backend.response_cache import ResponseCache
+
+@pytest.fixture
+def exceptions():
+    """Three fee short-pays from one payer, one 50% partial and one unknown payer."""
+    df = pd.DataFrame({
+        'Customer': ['TSLA Motors GmbH', 'tsla motors gmbh ', 'TSLA-Motors GmbH', 'TSLA Motors GmbH', 'Zylos Mfg'],
+        'Amount': [49985.0, 9980.0, 24975.0, 25000.0, 700.0],
+        'Currency': ['USD', 'USD', 'USD', 'USD', 'EUR']
+    })
+    candidates = [
+        [{'Invoice_ID': 'INV-1', 'Customer': 'Tesla Inc', 'Amount': 50000.0}],
+        [{'Invoice_ID': 'INV-2', 'Customer': 'Tesla Inc', 'Amount': 10000.0}],
+        [{'Invoice_ID': 'INV-3', 'Customer': 'Tesla Inc', 'Amount': 25000.0}],
+        [{'Invoice_ID': 'INV-1', 'Customer': 'Tesla Inc', 'Amount': 50000.0}],
+        []
+    ]
+    return df, candidates
+
+def test_feature_patterns(exceptions):
+    """
+    Test 1: Amount deltas are classified into fee, short-pay and no-candidate patterns.
+    """
+    df, candidates = exceptions
+    features = ExceptionClusterer().build_features(df, candidates)
+
+    assert features['Delta_Pattern'].tolist()[:3] == ['FEE_SHORT'] * 3
+    assert features['Delta_Pattern'].iloc[3].startswith('SHORT_PAY')
+    assert features['Delta_Pattern'].iloc[4] == 'NO_CANDIDATE'
+    assert features['Payer_Key'].nunique() == 2
+
+def test_clusters_share_root_cause(exceptions):
+    """
+    Test 2: The three fee short-pays collapse into one cluster.
+    """
+    df, candidates = exceptions
+    cluster_ids, reps = ExceptionClusterer().cluster(df, candidates)
+
+    assert cluster_ids.iloc[0] == cluster_ids.iloc[1] == cluster_ids.iloc[2]
+    assert cluster_ids.nunique() == 3
+    assert len(reps) == 3
+    assert ExceptionClusterer.compression_ratio(cluster_ids) == pytest.approx(5 / 3)
+
+def test_reasoning_fans_out_per_cluster(exceptions, tmp_path, monkeypatch):
+    """
+    Test 3: One provider call per cluster; every member receives its cluster's answer.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    df, candidates = exceptions
+    assistant = GenAIAssistant(cache=ResponseCache(db_path=str(tmp_path / "c.sqlite")))
+    provider = FakeLLMProvider(latency=0)
+
+    answers, stats = assistant.reason_exception_clusters(df, candidates, provider=provider, requests_per_second=1000)
+
+    assert provider.calls == 3
+    assert stats == {"exceptions": 5, "clusters": 3, "compression_ratio": 1.67}
+    assert answers[0] == answers[1] == answers[2]
+    assert answers[3] != answers[0]
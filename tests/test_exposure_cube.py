@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+import pandas as pd
+from backend.exposure_cube import ExposureCube
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-1', 'INV-2', 'INV-3', 'INV-4', 'INV-5'],
+        'Company_Code': ['1000 (US)', '1000 (US)', '2000 (EU)', '2000 (EU)', None],
+        'Currency': ['USD', 'USD', 'EUR', 'EUR', 'USD'],
+        'ESG_Score': ['AA', 'AA', 'B', 'C', 'C'],
+        'Customer': ['Tesla', 'Tesla', 'EcoEnergy', 'EcoEnergy', 'GlobalBlue'],
+        'Amount_Remaining': [100.0, 50.0, 200.0, 300.0, 25.0],
+        'Due_Date': ['2026-01-10', '2026-02-15', '2026-01-20', None, '2026-01-29']
+    })
+
+@pytest.fixture
+def cube(ledger):
+    return ExposureCube.from_frame(ledger, as_of='2026-01-30')
+
+def test_cells_match_invoice_groupby(ledger, cube):
+    """
+    Test 1: Cube cells reproduce the row-level groupby (sums, counts, average days late).
+    """
+    assert len(cube) == 4 and cube.total == 675.0
+    assert cube.cells.loc[cube.cells['Company_Code'] == 'Unknown', 'Customer'].tolist() == ['GlobalBlue']
+
+    by_customer = cube.rollup(['Customer']).set_index('Customer')
+    assert by_customer.loc['Tesla', 'Amount'] == 150.0 and by_customer.loc['Tesla', 'Count'] == 2
+    # 20 days late + not yet due (0) -> 10; the undated EcoEnergy invoice is left out of the average
+    assert by_customer.loc['Tesla', 'Avg_Days_Late'] == 10.0
+    assert by_customer.loc['EcoEnergy', 'Avg_Days_Late'] == 10.0
+
+    grand = cube.rollup([])
+    assert grand.loc[0, 'Amount'] == 675.0 and grand.loc[0, 'Count'] == 5
+
+def test_slices_weights_and_top(cube):
+    """
+    Test 2: Slices filter cells, weights add a measure, top keeps the largest groups per rating.
+    """
+    eu = cube.slice(Company_Code='2000 (EU)')
+    assert eu.total == 500.0
+    assert cube.slice(ESG_Score=['AA', 'B']).total == 350.0
+    assert cube.rollup(['Currency'], Company_Code='1000 (US)')['Amount'].tolist() == [150.0]
+
+    weighted = cube.with_weights({'AA': 0.1, 'B': 0.5})
+    assert weighted.rollup([])['Exposure'].iloc[0] == pytest.approx(15.0 + 100.0)
+
+    focus = cube.top(1, ['Customer', 'ESG_Score'], within='ESG_Score')
+    assert focus.rollup(['ESG_Score', 'Customer'])['Customer'].tolist() == ['Tesla', 'EcoEnergy', 'EcoEnergy']
+
+def test_hierarchy_nodes_are_consistent(cube):
+    """
+    Test 3: Sunburst nodes carry ids/parents and every parent equals the sum of its children.
+    """
+    nodes = cube.hierarchy(['Company_Code', 'ESG_Score', 'Customer'])
+    assert set(nodes['depth']) == {1, 2, 3}
+    assert nodes['id'].is_unique
+    assert set(nodes.loc[nodes['depth'] > 1, 'parent']) <= set(nodes['id'])
+
+    child_sums = nodes[nodes['depth'] > 1].groupby('parent')['Amount'].sum()
+    parents = nodes.set_index('id').loc[child_sums.index, 'Amount']
+    assert np.allclose(child_sums.to_numpy(), parents.to_numpy())
+    assert nodes.loc[nodes['depth'] == 1, 'Amount'].sum() == cube.total
+
+def test_empty_and_categorical_inputs(ledger):
+    """
+    Test 4: Empty views build an empty cube; categorical dimensions aggregate like strings.
+    """
+    empty = ExposureCube.from_frame(ledger.iloc[:0])
+    assert len(empty) == 0 and empty.rollup(['Customer']).empty
+
+    categorical = ledger.astype({'ESG_Score': 'category', 'Currency': 'category'})
+    cube = ExposureCube.from_frame(categorical, as_of='2026-01-30')
+    assert cube.rollup(['ESG_Score'])['Amount'].tolist() == [150.0, 200.0, 325.0]
+
+def test_top_n_hierarchy_folds_other():
+    """
+    Test 5: top_n keeps the largest children per node and folds the rest into one 'Other' leaf.
+    """
+    n = 5000
+    ledger = pd.DataFrame({
+        'Company_Code': ['1000 (US)', '2000 (EU)'] * (n // 2),
+        'ESG_Score': ['AA'] * n,
+        'Customer': [f"Customer {i:04d}" for i in range(n)],
+        'Amount_Remaining': np.arange(n, dtype=float)
+    })
+    cube = ExposureCube.from_frame(ledger)
+    nodes = cube.hierarchy(['Company_Code', 'Customer'], top_n=10)
+
+    leaves = nodes[nodes['depth'] == 2]
+    assert len(leaves) == 2 * 11
+    assert leaves.groupby('parent')['label'].apply(lambda s: (s == 'Other').sum()).tolist() == [1, 1]
+    assert 'Customer 4999' in set(leaves['label']) and 'Customer 0001' not in set(leaves['label'])
+    # Folding never changes the totals
+    assert leaves['Amount'].sum() == cube.total
+    assert cube.hierarchy(['Company_Code', 'Customer'], top_n=10) is nodes
@@ -0,0 +1,94 @@
+import pytest
+import pandas as pd
+from backend.exposure_store import ExposureAggregateStore
+from backend.treasury import TreasuryManager
+
+@pytest.fixture
+def ledger():
+    """Small multi-entity ledger with one overdue and one disputed invoice."""
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-001', 'INV-002', 'INV-003', 'INV-004'],
+        'Company_Code': ['1000', '1000', '2000', '2000'],
+        'Customer': ['Tesla Inc', 'Tesla Inc', 'Global Blue SE', 'Saurabh Soft'],
+        'Amount': [50000.0, 10000.0, 1500.0, 2500.0],
+        'Currency': ['USD', 'USD', 'EUR', 'USD'],
+        'Status': ['Open', 'Open', 'Open', 'Overdue'],
+        'ESG_Score': ['AA', 'AA', 'A', 'B'],
+        'Due_Date': ['2026-01-01', '2025-12-01', '2026-01-15', '2026-01-20'],
+        'Is_Disputed': [False, True, False, False]
+    })
+
+@pytest.fixture
+def store(ledger):
+    return ExposureAggregateStore.from_ledger(ledger)
+
+def test_rebuild_serves_treasury_inputs(store):
+    """
+    Test 1: Only Status == 'Open' invoices are counted and exposures match a ledger groupby.
+    """
+    assert store.get_open_ar() == 61500.0
+    assert store.get_open_ar(exclude_disputed=True) == 51500.0
+    assert store.get_fx_exposure() == {'USD': 60000.0, 'EUR': 1500.0}
+    assert set(store.get_concentration_risk(0.20)) == {'Tesla Inc'}
+
+def test_event_stream_transitions(store, ledger):
+    """
+    Test 2: Created, partially paid, paid and disputed events update the
+    aggregates incrementally and stay consistent with a full rebuild.
+    """
+    store.apply_event({"type": "INVOICE_CREATED", "Invoice_ID": "INV-005", "Company_Code": "2000",
+                       "Customer": "Global Blue SE", "Currency": "EUR", "ESG_Score": "A", "Amount": 500.0})
+    store.apply_event({"type": "INVOICE_PARTIALLY_PAID", "Invoice_ID": "INV-001", "Amount": 20000.0})
+    store.apply_event({"type": "INVOICE_PAID", "Invoice_ID": "INV-003"})
+    store.apply_event({"type": "INVOICE_DISPUTED", "Invoice_ID": "INV-002", "Is_Disputed": False})
+
+    assert store.get_fx_exposure() == {'USD': 40000.0, 'EUR': 500.0}
+    assert store.get_open_ar(exclude_disputed=True) == 40500.0
+
+    # Mirror the same postings on the ledger and run the periodic control
+    updated = ledger.copy()
+    updated.loc[0, 'Amount'] = 30000.0
+    updated.loc[2, 'Status'] = 'Paid'
+    updated.loc[1, 'Is_Disputed'] = False
+    updated.loc[len(updated)] = ['INV-005', '2000', 'Global Blue SE', 500.0, 'EUR', 'Open', 'A', '2026-02-01', False]
+
+    report = store.check_consistency(updated)
+    assert report['consistent'] is True
+
+def test_consistency_check_repairs_drift(store, ledger):
+    """
+    Test 3: A missed posting is detected and repaired by the full rebuild.
+    """
+    store.apply_event({"type": "INVOICE_PAID", "Invoice_ID": "INV-001"})
+    report = store.check_consistency(ledger)
+
+    assert report['consistent'] is False
+    assert ('1000', 'USD', 'Tesla Inc', 'AA') in report['drifted_keys']
+    assert store.get_open_ar() == 61500.0
+
+def test_liquidity_health_from_store(store, ledger):
+    """
+    Test 4: TreasuryManager fed from the store returns the same figures as the ledger scan.
+    """
+    treasury = TreasuryManager()
+    health = treasury.calculate_liquidity_health_from_store(store, today=pd.Timestamp.now())
+    expected = treasury.calculate_liquidity_health(ledger)
+
+    assert health['liquidity_position'] == expected['liquidity_position'] == 61500.0
+    assert health['avg_dso'] == pytest.approx(expected['avg_dso'], abs=0.1)
+    assert health['concentration_risk'] == pytest.approx(expected['concentration_risk'])
+
+    with pytest.raises(ValueError):
+        treasury.calculate_liquidity_health_from_store(ExposureAggregateStore(open_statuses=('Open', 'Overdue')))
+
+def test_rebuild_uses_event_defaults(ledger):
+    """
+    Test 5: A ledger without Company_Code/ESG_Score rebuilds and checks clean, keyed like the matching events.
+    """
+    bare = ledger.drop(columns=['Company_Code', 'ESG_Score'])
+    store = ExposureAggregateStore.from_ledger(bare)
+    assert store.check_consistency(bare)['consistent'] is True
+
+    events = ExposureAggregateStore()
+    events.apply_events({"type": "INVOICE_CREATED", **row} for row in bare[bare['Status'] == 'Open'].to_dict('records'))
+    assert dict(store.aggregates) == dict(events.aggregates)
@@ -0,0 +1,27 @@
+import sys
+import subprocess
+
+def _loaded_after_import(module, candidates):
+    probe = f"import sys, {module}; print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+def test_ai_agent_defers_provider_sdks():
+    """
+    Test 1: Importing the AI agent must not pull in the LLM SDK, dotenv or pandas.
+    """
+    assert _loaded_after_import("backend.ai_agent", ["openai", "dotenv", "pandas", "asyncio"]) == []
+
+def test_backend_modules_skip_ui_libraries():
+    """
+    Test 2: Headless backend imports never load UI / report libraries.
+    """
+    for module in ["backend.engine", "backend.treasury", "backend.dunning", "backend.ledger_store"]:
+        assert _loaded_after_import(module, ["streamlit", "fpdf", "pptx", "openai"]) == [], module
+
+def test_default_matcher_skips_sklearn():
+    """
+    Test 3: The engine (and the batch reconciler / pipeline behind it) loads scikit-learn only for the TF-IDF scorer.
+    """
+    for module in ["backend.engine", "backend.reconcile", "backend.pipeline"]:
+        assert _loaded_after_import(module, ["sklearn", "scipy"]) == [], module
@@ -0,0 +1,112 @@
+import os
+import pytest
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from backend.ledger_store import LedgerStore
+
+@pytest.fixture
+def store(tmp_path):
+    """Writes a raw ERP-style feed (ERP headers, padded names) into a temp data dir."""
+    pd.DataFrame({
+        ' Invoice_ID ': ['INV-001', 'INV-002', 'INV-003', 'INV-004'],
+        'Company_Code': [1000, 1000, 2000, 3000],
+        'Customer': ['Tesla Inc', 'Saurabh Soft', 'Tesla Inc', 'Global Blue SE'],
+        'Amount': [50000.0, 1500.0, 2500.0, 900.0],
+        'Currency': ['USD', 'USD', 'EUR', 'GBP'],
+        'Due_Date': ['2026-01-01', '2026-01-15', 'not-a-date', '2026-02-01'],
+        'Status': ['Open', 'Overdue', 'Overdue', 'Open'],
+        'ESG_Score': ['AA', 'B', 'AA', 'A'],
+        'Is_Disputed': [False, True, False, False]
+    }).to_csv(tmp_path / "invoices.csv", index=False)
+    pd.DataFrame({
+        'Transaction_ID': ['TXN-1', 'TXN-2'],
+        'Company_Code': [1000, 2000],
+        'Payer_Name': ['Tesla Inc', 'Tesla Inc'],
+        'Amount_Received': [50000.0, 2500.0],
+        'Currency': ['USD', 'EUR']
+    }).to_csv(tmp_path / "bank_feed.csv", index=False)
+    return LedgerStore(data_dir=str(tmp_path))
+
+def test_typed_normalized_schema(store):
+    """
+    Test 1: The converted ledger carries the app schema and typed columns.
+    """
+    inv = store.load_invoices()
+
+    assert {'Invoice_ID', 'Amount_Remaining', 'Is_Disputed'} <= set(inv.columns)
+    for col in LedgerStore.CATEGORICAL_COLS:
+        assert isinstance(inv[col].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(inv['Due_Date'])
+    assert inv['Is_Disputed'].dtype == bool
+    assert inv['Amount_Remaining'].sum() == 54900.0
+
+def test_predicate_pushdown_filters(store):
+    """
+    Test 2: Entity / customer / status filters return only the requested slice.
+    """
+    us = store.load_invoices(company_code=1000)
+    assert sorted(us['Invoice_ID']) == ['INV-001', 'INV-002']
+
+    tesla_overdue = store.load_invoices(customer='Tesla Inc', status='Overdue')
+    assert tesla_overdue['Invoice_ID'].tolist() == ['INV-003']
+
+    bank = store.load_bank_feed(company_code=['2000'])
+    assert bank['Customer'].tolist() == ['Tesla Inc']
+    assert bank['Amount'].tolist() == [2500.0]
+
+def test_conversion_is_cached(store):
+    """
+    Test 3: The CSV is converted once; later reads reuse the Parquet file.
+    """
+    path = store.convert("invoices")
+    mtime = os.path.getmtime(path)
+
+    assert store.convert("invoices") == path
+    assert os.path.getmtime(path) == mtime
+    assert store.list_company_codes() == ['1000', '2000', '3000']
+
+def test_schema_survives_sparse_first_chunk(tmp_path):
+    """
+    Test 4: A column empty in the first chunk and int-looking amounts keep their declared types in later chunks.
+    """
+    pd.DataFrame({
+        'Invoice_ID': ['INV-001', 'INV-002', 'INV-003'],
+        'Customer': ['Tesla Inc', 'Saurabh Soft', 'Tesla Inc'],
+        'Amount': ['100', '250', '99.5'],
+        'Remarks': [None, None, 'Short-paid'],
+        'Due_Date': [None, None, '2026-01-15']
+    }).to_csv(tmp_path / "invoices.csv", index=False)
+    store = LedgerStore(data_dir=str(tmp_path), chunksize=2)
+
+    inv = store.load_invoices()
+    assert inv['Remarks'].tolist()[-1] == 'Short-paid' and inv['Remarks'].isna().sum() == 2
+    assert sorted(inv['Amount_Remaining']) == [99.5, 100.0, 250.0]
+    assert inv['Due_Date'].notna().sum() == 1
+
+def test_filtered_read_skips_row_groups(tmp_path):
+    """
+    Test 5: Interleaved entities are written sorted into entity-aligned row groups, so a filter prunes the rest.
+    """
+    codes = [1000, 2000, 3000] * 8
+    pd.DataFrame({
+        'Invoice_ID': [f'INV-{i:03d}' for i in range(len(codes))],
+        'Company_Code': codes,
+        'Customer': ['Tesla Inc'] * len(codes),
+        'Amount': [100.0] * len(codes)
+    }).to_csv(tmp_path / "invoices.csv", index=False)
+    store = LedgerStore(data_dir=str(tmp_path), chunksize=5, row_group_size=4)
+    path = store.convert("invoices")
+
+    metadata = pq.ParquetFile(path).metadata
+    entity = pq.ParquetFile(path).schema_arrow.get_field_index('Company_Code')
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(entity).statistics
+        assert stats.min == stats.max
+
+    fragment = next(ds.dataset(path).get_fragments())
+    touched = fragment.subset(ds.field('Company_Code').isin(['2000'])).row_groups
+    assert 0 < len(touched) < metadata.num_row_groups
+
+    inv = store.load_invoices(company_code='2000')
+    assert sorted(inv['Invoice_ID']) == [f'INV-{i:03d}' for i in range(1, len(codes), 3)]
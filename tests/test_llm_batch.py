@@ -0,0 +1,117 @@
+import time
+import asyncio
+import pytest
+from backend.llm_batch import TokenBucket, RateLimiter, FakeLLMProvider, run_batch
+from backend.ai_agent import GenAIAssistant
+from backend.response_cache import ResponseCache
+
+@pytest.fixture
+def assistant(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return GenAIAssistant(cache=ResponseCache(db_path=str(tmp_path / "llm_cache.sqlite")))
+
+@pytest.fixture
+def exception_batch():
+    return [({"Amount": 1000.0 + i, "Payer": f"Payer {i}"}, [{"Invoice_ID": f"INV-{i}"}]) for i in range(40)]
+
+def test_batch_results_are_ordered_and_bounded(assistant, exception_batch):
+    """
+    Test 1: Answers line up with inputs and in-flight calls never exceed the limit.
+    """
+    provider = FakeLLMProvider(latency=0.01)
+    answers = assistant.reason_exceptions(exception_batch, provider=provider,
+                                          max_concurrency=5, requests_per_second=1000)
+
+    expected = [assistant.reason_exceptions([item], provider=FakeLLMProvider(latency=0))[0] for item in exception_batch[:3]]
+    assert answers[:3] == expected
+    assert len(answers) == 40
+    assert provider.peak_concurrency <= 5
+
+def test_transient_failures_are_retried(assistant, exception_batch):
+    """
+    Test 2: Simulated 429/503s are retried with jitter until they succeed.
+    """
+    provider = FakeLLMProvider(latency=0, failure_rate=0.3, seed=7)
+    answers = assistant.reason_exceptions(exception_batch, provider=provider,
+                                          requests_per_second=1000, max_retries=8)
+
+    assert all(a.startswith("[FAKE:") for a in answers)
+    assert provider.calls > len(exception_batch)
+
+def test_exhausted_retries_surface_as_errors(assistant, exception_batch):
+    """
+    Test 3: A provider that always fails yields the standard error string per item.
+    """
+    provider = FakeLLMProvider(latency=0, failure_rate=1.0)
+    answers = assistant.reason_exceptions(exception_batch[:3], provider=provider,
+                                          requests_per_second=1000, max_retries=1)
+
+    assert all(a.startswith("AI Reasoning Error:") for a in answers)
+    assert provider.calls == 6
+
+def test_token_bucket_enforces_rate():
+    """
+    Test 4: 20 requests at 100 req/s with a burst of 10 take at least ~0.1s.
+    """
+    async def _run():
+        bucket = TokenBucket(rate=100, capacity=10)
+        start = time.monotonic()
+        for _ in range(20):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(_run()) >= 0.09
+
+def test_cached_prompts_skip_provider(tmp_path):
+    """
+    Test 5: Prompts already in the response cache are not re-sent.
+    """
+    cache = ResponseCache(db_path=str(tmp_path / "c.sqlite"))
+    provider = FakeLLMProvider(latency=0)
+    prompts = ["p1", "p2", "p1 "]
+
+    first = asyncio.run(run_batch(prompts, provider, "m", 0.2, requests_per_second=1000, cache=cache))
+    second = asyncio.run(run_batch(prompts, provider, "m", 0.2, requests_per_second=1000, cache=cache))
+
+    assert first == second
+    assert provider.calls <= 3
+
+def test_sync_wrapper_inside_running_loop(assistant, exception_batch):
+    """
+    Test 6: reason_exceptions works from async code, and cache I/O stays off the event-loop thread.
+    """
+    import threading
+    cache_threads = []
+    get, put = assistant.cache.get, assistant.cache.put
+    assistant.cache.get = lambda *a: cache_threads.append(threading.get_ident()) or get(*a)
+    assistant.cache.put = lambda *a: cache_threads.append(threading.get_ident()) or put(*a)
+
+    async def _from_async_code():
+        loop_thread = threading.get_ident()
+        answers = assistant.reason_exceptions(exception_batch[:4], provider=FakeLLMProvider(latency=0))
+        direct = await assistant.reason_exceptions_async(exception_batch[:4], provider=FakeLLMProvider(latency=0))
+        return loop_thread, answers, direct
+
+    loop_thread, answers, direct = asyncio.run(_from_async_code())
+    assert answers == direct and len(answers) == 4
+    assert cache_threads and loop_thread not in cache_threads
+
+def test_shared_limiter_spans_batches():
+    """
+    Test 7: Concurrent batches sharing one RateLimiter stay within its concurrency and request rate together.
+    """
+    provider = FakeLLMProvider(latency=0.02)
+
+    async def _run():
+        limiter = RateLimiter(max_concurrency=2, requests_per_second=20)
+        start = time.monotonic()
+        await asyncio.gather(*(
+            run_batch([f"batch {b} prompt {i}" for i in range(10)], provider, "m", 0.2, limiter=limiter)
+            for b in range(4)
+        ))
+        return time.monotonic() - start
+
+    # 40 requests, burst of 20, then 20 req/s: ~1s (a bucket per batch would never wait)
+    elapsed = asyncio.run(_run())
+    assert provider.calls == 40 and provider.peak_concurrency <= 2
+    assert elapsed >= 0.9
@@ -0,0 +1,82 @@
+import pytest
+import pandas as pd
+from backend.engine import SmartMatchingEngine
+from backend.match_cache import MatchResultCache, frame_fingerprint
+
+class CountingEngine(SmartMatchingEngine):
+    """Engine that counts how many payments were actually scored."""
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def run_match(self, payment_amt, payer_name, currency, invoice_df, **kwargs):
+        self.calls += 1
+        return super().run_match(payment_amt, payer_name, currency, invoice_df, **kwargs)
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-001', 'INV-002', 'INV-003'],
+        'Customer': ['Tesla Inc', 'Global Blue SE', 'Saurabh Soft'],
+        'Amount': [50000.00, 1500.00, 2500.00],
+        'Currency': ['USD', 'EUR', 'USD']
+    })
+
+@pytest.fixture
+def bank():
+    return pd.DataFrame({
+        'Customer': ['tsla motors gmbh', 'Global Blue SE', 'Saurabh Soft', None],
+        'Amount': [50000.00, 1500.00, 2500.00, 10.0],
+        'Currency': ['USD', 'EUR', 'USD', 'USD']
+    })
+
+def test_reruns_hit_cache(ledger, bank):
+    """
+    Test 1: A second run over the same inputs scores nothing new.
+    """
+    engine, cache = CountingEngine(), MatchResultCache()
+    first = cache.match_bank_feed(engine, bank, ledger)
+    second = cache.match_bank_feed(engine, bank, ledger)
+
+    assert engine.calls == 3  # Invalid row is never scored
+    assert first == second
+    assert first[0]['Invoice_ID'] == 'INV-001'
+    assert first[3] == "Invalid Data"
+
+def test_only_changed_rows_rematched(ledger, bank):
+    """
+    Test 2: Appending or editing bank rows re-matches only those rows.
+    """
+    engine, cache = CountingEngine(), MatchResultCache()
+    cache.match_bank_feed(engine, bank, ledger)
+
+    updated = pd.concat([bank, pd.DataFrame({'Customer': ['Tesla Inc'], 'Amount': [49985.0], 'Currency': ['USD']})], ignore_index=True)
+    updated.loc[1, 'Amount'] = 1490.0
+    cache.match_bank_feed(engine, updated, ledger)
+
+    assert engine.calls == 5
+
+def test_ledger_or_config_change_invalidates(ledger, bank):
+    """
+    Test 3: A ledger edit or engine threshold change forces a fresh match.
+    """
+    engine, cache = CountingEngine(), MatchResultCache()
+    cache.match_bank_feed(engine, bank, ledger)
+
+    edited = ledger.copy()
+    edited.loc[0, 'Amount'] = 49000.0
+    assert frame_fingerprint(edited, MatchResultCache.LEDGER_COLS) != frame_fingerprint(ledger, MatchResultCache.LEDGER_COLS)
+    cache.match_bank_feed(engine, bank, edited)
+    assert engine.calls == 6
+
+    engine.stp_threshold = 0.9
+    cache.match_bank_feed(engine, bank, edited)
+    assert engine.calls == 9
+
+def test_cache_is_bounded(ledger, bank):
+    """
+    Test 4: The shared cache never grows beyond max_entries.
+    """
+    cache = MatchResultCache(max_entries=2)
+    cache.match_bank_feed(SmartMatchingEngine(), bank, ledger)
+    assert cache.stats()['entries'] == 2
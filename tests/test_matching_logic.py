@@ -95,3 +95,41 @@ def test_empty_ledger_handling(engine):
     
     assert isinstance(results, list)
     assert len(results) == 0
+
+def test_top_k_keeps_best_candidates_in_order(engine):
+    """
+    Test 7: top_k returns the same leading candidates as the full ranking, ties kept in ledger order.
+    """
+    ledger = pd.DataFrame({
+        'Invoice_ID': [f'INV-{i:03d}' for i in range(6)],
+        'Customer_Name': ['Tesla Inc', 'Tesla Motors', 'Tesla Inc', 'Global Blue SE', 'Tesla Inc', 'Tesla Inc'],
+        'Amount': [1000.00, 1000.00, 1003.00, 1000.00, 1000.00, 5000.00],
+        'Currency': ['USD'] * 6
+    })
+    full = engine.run_match(1000.00, "Tesla Inc", "USD", ledger)
+    assert [r['Invoice_ID'] for r in full[:2]] == ['INV-000', 'INV-004']
+    for k in (1, 2, 3, 10):
+        assert engine.run_match(1000.00, "Tesla Inc", "USD", ledger, top_k=k) == full[:k]
+    assert list(engine.iter_matches(1000.00, "Tesla Inc", "USD", ledger)) == full
+
+def test_streaming_stops_at_unique_stp_hit(sample_invoices, monkeypatch):
+    """
+    Test 8: iter_matches yields a unique STP hit alone without scoring fee-tolerance candidates.
+    """
+    import backend.name_matcher as name_matcher
+    engine = SmartMatchingEngine()
+    engine.stp_threshold = 0.85
+    ledger = pd.concat([sample_invoices, pd.DataFrame({
+        'Invoice_ID': ['INV-004'], 'Customer_Name': ['Tesla Gigafactory'], 'Amount': [49990.00], 'Currency': ['USD']
+    })], ignore_index=True)
+
+    scored = []
+    ratio = name_matcher.fuzz.token_set_ratio
+    monkeypatch.setattr(name_matcher.fuzz, "token_set_ratio", lambda a, b: scored.append(b) or ratio(a, b))
+
+    streamed = list(engine.iter_matches(50000.00, "tsla motors gmbh", "USD", ledger))
+    assert [r['Invoice_ID'] for r in streamed] == ['INV-001'] and streamed[0]['status'] == "STP: Automated"
+    assert scored == ['tesla inc']
+
+    full = engine.run_match(50000.00, "tsla motors gmbh", "USD", ledger)
+    assert full[0] == streamed[0] and [r['Invoice_ID'] for r in full] == ['INV-001', 'INV-004']
@@ -0,0 +1,111 @@
+import asyncio
+import urllib.request
+import pytest
+import pandas as pd
+from backend.metrics import METRICS, MetricsRegistry
+from backend.engine import SmartMatchingEngine
+from backend.match_cache import MatchResultCache
+from backend.compliance import ComplianceVault
+from backend.iso_parser import ISO20022Parser
+from backend.llm_batch import FakeLLMProvider, run_batch
+from backend.response_cache import ResponseCache
+
+@pytest.fixture
+def metrics():
+    """The process-wide registry, enabled for one test and left clean afterwards."""
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+def test_disabled_registry_records_nothing():
+    """
+    Test 1: While disabled, counters, gauges and timers are no-ops; enabling starts recording.
+    """
+    registry = MetricsRegistry(namespace="t")
+    hits = registry.counter("hits_total", "Hits", ["result"])
+    latency = registry.histogram("op_seconds", "Latency")
+
+    hits.inc(result="hit")
+    with latency.time():
+        pass
+    assert hits.value(result="hit") == 0 and latency.count() == 0
+
+    registry.enable()
+    hits.inc(result="hit")
+    hits.inc(2, result="miss")
+    with latency.time():
+        pass
+    assert hits.value(result="hit") == 1 and hits.value(result="miss") == 2
+    assert latency.count() == 1
+    assert registry.counter("hits_total", "Hits", ["result"]) is hits
+    with pytest.raises(ValueError):
+        registry.gauge("hits_total", "Hits")
+
+def test_prometheus_text_and_file_export(tmp_path):
+    """
+    Test 2: Export follows the Prometheus text format (cumulative buckets, +Inf, escaped labels).
+    """
+    registry = MetricsRegistry(namespace="t", enabled=True)
+    latency = registry.histogram("op_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage='a"b')
+    registry.gauge("depth", "Queue depth").set(7)
+
+    text = registry.render()
+    assert "# TYPE t_op_seconds histogram" in text and "# TYPE t_depth gauge" in text
+    assert 't_op_seconds_bucket{stage="a\\"b",le="0.1"} 1' in text
+    assert 't_op_seconds_bucket{stage="a\\"b",le="1.0"} 2' in text
+    assert 't_op_seconds_bucket{stage="a\\"b",le="+Inf"} 3' in text
+    assert 't_op_seconds_count{stage="a\\"b"} 3' in text and "t_depth 7" in text
+
+    path = registry.write(str(tmp_path / "metrics" / "smartcash.prom"))
+    assert open(path).read() == text
+
+def test_hot_paths_record_when_enabled(tmp_path, metrics):
+    """
+    Test 3: Parser, matcher, match cache, vault and LLM batch calls all feed the shared registry.
+    """
+    parser = ISO20022Parser()
+    assert len(parser.parse_camt053(parser.generate_iso_sample().strip().encode())) == 1
+    assert metrics.get("parser_entries_total").value() == 1
+
+    ledger = pd.DataFrame({'Invoice_ID': ['INV-1', 'INV-2'], 'Customer': ['Tesla Inc', 'Saurabh Soft'],
+                           'Amount': [100.0, 200.0], 'Currency': ['USD', 'USD']})
+    bank = pd.DataFrame({'Customer': ['tsla motors gmbh'], 'Amount': [100.0], 'Currency': ['USD']})
+    cache = MatchResultCache()
+    cache.match_bank_feed(SmartMatchingEngine(), bank, ledger)
+    cache.match_bank_feed(SmartMatchingEngine(), bank, ledger)
+    assert metrics.get("matcher_payments_total").value() == 1
+    assert metrics.get("matcher_candidates_total").value() == 1
+    assert metrics.get("matcher_fuzzy_calls_total").value() == 1
+    assert metrics.get("matcher_stage_seconds").count(stage="score") == 1
+    assert metrics.get("match_cache_lookups_total").value(result="hit") == 1
+
+    vault = ComplianceVault(ledger_path=str(tmp_path / "log.csv"))
+    vault.log_actions([{"invoice_ref": "INV-1", "action_type": "RECON_STP"}] * 3)
+    assert metrics.get("vault_records_total").value() == 3
+    assert metrics.get("vault_commit_seconds").count(mode="batch") == 1
+
+    response_cache = ResponseCache(db_path=str(tmp_path / "llm.sqlite"))
+    for _ in range(2):
+        asyncio.run(run_batch(["a"], FakeLLMProvider(latency=0), "m", 0.2, cache=response_cache))
+    assert metrics.get("llm_cache_lookups_total").value(result="hit") == 1
+    assert metrics.get("llm_call_seconds").count(outcome="ok") == 1
+
+def test_http_exporter_serves_metrics(metrics):
+    """
+    Test 4: The local HTTP exporter serves the current registry in Prometheus text format.
+    """
+    metrics.get("vault_records_total").inc(5)
+    server = metrics.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        metrics.shutdown()
+    assert "smartcash_vault_records_total 5" in body
+    assert "# TYPE smartcash_matcher_stage_seconds histogram" in body
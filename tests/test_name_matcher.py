@@ -0,0 +1,129 @@
+import pytest
+import numpy as np
+import backend.name_matcher as name_matcher
+from backend.engine import SmartMatchingEngine
+from backend.compact_ledger import CompactLedger
+from backend.match_cache import MatchResultCache
+from backend.name_matcher import TfidfNameScorer, TokenSetScorer
+from backend.synthetic import SyntheticLedgerGenerator
+
+@pytest.fixture
+def feeds():
+    generator = SyntheticLedgerGenerator(seed=5)
+    invoices = generator.invoices(400)
+    bank = generator.bank_feed(invoices).rename(columns={'Payer_Name': 'Customer', 'Amount_Received': 'Amount'})
+    return invoices, bank.head(120)
+
+def test_tfidf_scores_on_token_set_scale(feeds):
+    """
+    Test 1: Calibrated TF-IDF similarity agrees with token_set_ratio on name checks (>= 0.5) and on exact names.
+    """
+    invoices, bank = feeds
+    ledger = CompactLedger.from_frame(invoices)
+    payers = sorted({str(p).lower().strip() for p in bank['Customer']} | {"globel blue intl", "zeta holdings"})
+
+    tfidf = TfidfNameScorer().score_batch(ledger, payers)
+    codes = np.arange(len(ledger.customers))
+    token_set = np.array([TokenSetScorer().scores(ledger, p, codes)[0] for p in payers])
+
+    assert tfidf.shape == token_set.shape and tfidf.min() >= 0.0 and tfidf.max() <= 1.0
+    assert ((tfidf >= 0.5) == (token_set >= 0.5)).mean() > 0.9
+    exact = [payers.index(c) for c in ledger.clean_customers if c in payers]
+    assert exact and np.all(tfidf[exact].max(axis=1) > 0.99)
+
+    customers = list(ledger.clean_customers)
+    if 'global blue se' in customers:
+        assert tfidf[payers.index("globel blue intl"), customers.index('global blue se')] >= 0.5
+    assert tfidf[payers.index("zeta holdings")].max() < 0.5
+
+def test_batch_priming_and_top_k(feeds):
+    """
+    Test 2: A feed is scored with one sparse product per batch; top_k returns the best customers in order.
+    """
+    invoices, bank = feeds
+    ledger = CompactLedger.from_frame(invoices)
+    scorer = TfidfNameScorer(batch_size=16)
+    payers = [str(p).lower().strip() for p in bank['Customer']]
+
+    assert scorer.prime(ledger, payers) == len(set(payers)) * len(ledger.customers)
+    assert scorer.prime(ledger, payers) == 0
+    codes = np.arange(len(ledger.customers))
+    row, computed = scorer.scores(ledger, payers[0], codes)
+    assert computed == 0 and np.allclose(row, scorer.score_batch(ledger, [payers[0]])[0])
+
+    full = scorer.score_batch(ledger, payers[:5])
+    for scores, best in zip(full, scorer.top_k(ledger, payers[:5], k=3)):
+        assert [s for _, s in best] == sorted((round(float(s), 4) for s in scores), reverse=True)[:3]
+        assert best[0][0] == ledger.customers[int(np.argmax(scores))]
+
+def test_engine_selects_backend_per_instance(feeds, monkeypatch):
+    """
+    Test 3: Engines pick their name backend independently; the TF-IDF engine needs no pairwise fuzzy calls.
+    """
+    invoices, bank = feeds
+    ledger = CompactLedger.from_frame(invoices)
+    default, tfidf = SmartMatchingEngine(), SmartMatchingEngine(name_scorer="tfidf")
+    assert isinstance(default.name_scorer, TokenSetScorer) and isinstance(tfidf.name_scorer, TfidfNameScorer)
+    with pytest.raises(ValueError):
+        SmartMatchingEngine(name_scorer="soundex")
+
+    tfidf.prime_names(bank['Customer'], ledger)
+    calls = []
+    ratio = name_matcher.fuzz.token_set_ratio
+    monkeypatch.setattr(name_matcher.fuzz, "token_set_ratio", lambda a, b: calls.append(b) or ratio(a, b))
+
+    matched = agree = 0
+    for amt, payer, ccy in zip(bank['Amount'], bank['Customer'], bank['Currency'].astype(str)):
+        fast = tfidf.run_match(float(amt), str(payer), ccy, ledger, top_k=1)
+        slow = default.run_match(float(amt), str(payer), ccy, ledger, top_k=1)
+        assert bool(fast) == bool(slow)
+        if fast:
+            matched += 1
+            agree += (fast[0]['Invoice_ID'], fast[0]['status']) == (slow[0]['Invoice_ID'], slow[0]['status'])
+    assert matched > len(bank) / 2 and agree >= 0.95 * matched
+    assert calls and all(c in ledger.clean_customers for c in calls)
+    calls.clear()
+    for amt, payer, ccy in zip(bank['Amount'], bank['Customer'], bank['Currency'].astype(str)):
+        tfidf.run_match(float(amt), str(payer), ccy, ledger)
+    assert calls == []
+
+def test_match_cache_keeps_backends_apart(feeds):
+    """
+    Test 4: Cached results are keyed by the name backend, and cached TF-IDF results equal direct matching.
+    """
+    invoices, bank = feeds
+    cache = MatchResultCache()
+    tfidf = SmartMatchingEngine(name_scorer=TfidfNameScorer())
+
+    cached = cache.match_bank_feed(tfidf, bank, invoices)
+    assert cache.misses == len(bank)
+    cache.match_bank_feed(SmartMatchingEngine(), bank, invoices)
+    assert cache.hits == 0 and cache.misses == 2 * len(bank)
+
+    ledger = CompactLedger.from_frame(invoices)
+    for (_, row), value in zip(bank.iterrows(), cached):
+        direct = tfidf.run_match(float(row['Amount']), str(row['Customer']), str(row['Currency']), ledger, top_k=1)
+        assert value == (direct[0] if direct else None)
+
+def test_model_survives_memo_eviction(feeds, monkeypatch):
+    """
+    Test 5: The fitted model is kept apart from the score memo, shared by sub-ledgers, and calibrated across the ledger.
+    """
+    invoices, _ = feeds
+    ledger = CompactLedger.from_frame(invoices)
+    scorer = TfidfNameScorer(calibration_names=4)
+    fits = []
+    fit = scorer._fit
+    monkeypatch.setattr(scorer, "_fit", lambda names: fits.append(names) or fit(names))
+
+    model = scorer._model(ledger)
+    for i in range(ledger.MEMO_LIMIT + 1):
+        ledger.remember(("token_set_ratio", f"payer {i}"), lambda: np.zeros(1))
+    assert scorer._model(ledger) is model and scorer._model(ledger.take(np.arange(10))) is model
+    assert len(fits) == 1
+
+    names = [f"{letter} holdings" for letter in "abcdefghijklmnopqrstuvwxyz"]
+    sampled = []
+    monkeypatch.setattr(name_matcher.fuzz, "token_set_ratio", lambda q, n: sampled.append(n) or 0)
+    scorer._calibrate(model["vectorizer"], names)
+    assert sorted(set(sampled)) == ["a holdings", "i holdings", "r holdings", "z holdings"]
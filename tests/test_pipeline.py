@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+import pytest
+import pandas as pd
+from backend.pipeline import ReconciliationPipeline
+from backend.llm_batch import FakeLLMProvider
+from backend.ai_agent import GenAIAssistant
+from backend.compliance import ComplianceVault
+from backend.response_cache import ResponseCache
+from backend.synthetic import SyntheticLedgerGenerator
+
+@pytest.fixture
+def feeds():
+    generator = SyntheticLedgerGenerator(seed=3)
+    invoices = generator.invoices(60)
+    bank = generator.bank_feed(invoices)
+    ledger = invoices[['Invoice_ID', 'Customer', 'Amount', 'Currency', 'ESG_Score', 'Due_Date']]
+    ledger = ledger.astype({'Customer': str, 'Currency': str, 'ESG_Score': str})
+    return generator, ledger, bank
+
+@pytest.fixture
+def assistant(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return GenAIAssistant(cache=ResponseCache(db_path=str(tmp_path / "llm_cache.sqlite")))
+
+def test_inbox_statements_flow_to_vault(tmp_path, feeds, assistant):
+    """
+    Test 1: Statements dropped into the inbox are parsed, matched, reasoned, logged and archived.
+    """
+    generator, ledger, bank = feeds
+    vault = ComplianceVault(ledger_path=str(tmp_path / "log.csv"))
+    inbox = tmp_path / "inbox"
+
+    async def scenario():
+        pipeline = ReconciliationPipeline(
+            ledger, assistant=assistant, vault=vault, inbox_dir=str(inbox),
+            llm_provider=FakeLLMProvider(latency=0), poll_interval=0.02
+        )
+        await pipeline.start()
+        for k in range(2):
+            (inbox / f"stmt{k}.xml").write_bytes(generator.camt053(bank.iloc[k * 15:(k + 1) * 15]))
+        while pipeline.statements < 2:
+            await asyncio.sleep(0.02)
+        await pipeline.stop(timeout=30)
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+    stats = pipeline.stats()
+    assert stats['statements'] == 2 and stats['payments'] == 30 and stats['posted'] == 30
+    assert {s['stage']: s['processed'] for s in stats['stages']}['log'] == 30
+    assert sorted(os.listdir(inbox / "processed")) == ['stmt0.xml', 'stmt1.xml']
+
+    results = list(pipeline.results)
+    assert {r['payment_id'] for r in results} == {f"stmt{k}-{i}" for k in range(2) for i in range(15)}
+    exceptions = [r for r in results if r['action'] == 'RECON_EXCEPTION']
+    assert exceptions and all(r['reasoning'].startswith("[FAKE:") for r in exceptions)
+
+    logged = pd.read_csv(tmp_path / "log.csv")
+    assert len(logged) == 30
+    assert set(logged['Action']) <= {'RECON_STP', 'RECON_REVIEW', 'RECON_EXCEPTION'}
+
+def test_slow_llm_does_not_stall_matching(tmp_path, feeds, assistant):
+    """
+    Test 2: With a slow model, every payment is posted long before reasoning drains.
+    """
+    generator, ledger, bank = feeds
+    path = tmp_path / "stmt.xml"
+    path.write_bytes(generator.camt053(bank.iloc[:30]))
+
+    async def scenario():
+        pipeline = ReconciliationPipeline(
+            ledger, assistant=assistant, llm_provider=FakeLLMProvider(latency=0.3),
+            reason_workers=1, reason_batch=1
+        )
+        await pipeline.start()
+        start = time.monotonic()
+        await pipeline.submit(str(path))
+        while pipeline.stats()['posted'] < 30:
+            await asyncio.sleep(0.01)
+        posted_after = time.monotonic() - start
+        reason_backlog = pipeline.reason.backlog + pipeline.reason.in_flight
+        await pipeline.stop(timeout=60)
+        return pipeline, posted_after, reason_backlog, time.monotonic() - start
+
+    pipeline, posted_after, reason_backlog, drained_after = asyncio.run(scenario())
+    assert reason_backlog > 1
+    assert posted_after < drained_after / 2
+    assert pipeline.stats()['stages'][1]['p95_ms'] < 1000
+
+def test_reasoning_is_shed_and_audit_spills_when_saturated(tmp_path, feeds, assistant):
+    """
+    Test 3: Past the reasoning backlog limit exceptions skip the LLM; full log queues spill, never drop.
+    """
+    generator, ledger, bank = feeds
+    path = tmp_path / "stmt.xml"
+    path.write_bytes(generator.camt053(bank))
+    vault = ComplianceVault(ledger_path=str(tmp_path / "log.csv"))
+
+    async def scenario():
+        pipeline = ReconciliationPipeline(
+            ledger, assistant=assistant, vault=vault, llm_provider=FakeLLMProvider(latency=0.2),
+            reason_workers=1, reason_batch=1, max_reason_backlog=1, queue_size=2, log_batch=1
+        )
+        await pipeline.start()
+        await pipeline.submit(str(path))
+        await pipeline.stop(timeout=60)
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+    stats = pipeline.stats()
+    assert stats['reasoning_shed'] > 0
+    assert any(r['reasoning'] == "Reasoning skipped: LLM backlog" for r in pipeline.results)
+    assert stats['stages'][3]['spilled'] > 0
+    assert len(pd.read_csv(tmp_path / "log.csv")) == len(bank)
+
+def test_unparseable_statement_is_quarantined(tmp_path, feeds):
+    """
+    Test 4: A statement with no readable entries is moved to failed/ and yields no payments.
+    """
+    _, ledger, _ = feeds
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    bad = inbox / "broken.xml"
+    bad.write_bytes(b"<Document><not-camt/>")
+
+    async def scenario():
+        pipeline = ReconciliationPipeline(ledger, inbox_dir=str(inbox))
+        await pipeline.start()
+        await pipeline.submit(str(bad))
+        await pipeline.stop(timeout=10)
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+    assert pipeline.stats()['payments'] == 0
+    assert os.listdir(inbox / "failed") == ["broken.xml"]
+
+def test_failures_still_reach_the_audit_log(tmp_path, feeds, assistant, monkeypatch):
+    """
+    Test 5: Failed reasoning is logged with a note, vault writes are retried then dead-lettered,
+    and a statement is archived only after its last record is logged.
+    """
+    generator, ledger, bank = feeds
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for k in range(2):
+        (inbox / f"stmt{k}.xml").write_bytes(generator.camt053(bank.iloc[k * 10:(k + 1) * 10]))
+
+    class FlakyVault:
+        def __init__(self, failures):
+            self.failures, self.records, self.archived_at_write = failures, [], []
+
+        def log_actions(self, records):
+            self.archived_at_write.append(os.listdir(inbox / "processed") if (inbox / "processed").exists() else [])
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk full")
+            self.records += records
+
+    async def broken_llm(*args, **kwargs):
+        raise RuntimeError("LLM unavailable")
+    monkeypatch.setattr(assistant, "reason_exceptions_async", broken_llm)
+
+    async def scenario(vault, path, **kwargs):
+        pipeline = ReconciliationPipeline(ledger, assistant=assistant, vault=vault, inbox_dir=str(inbox),
+                                          log_batch=1000, log_retry_delay=0, **kwargs)
+        await pipeline.start()
+        await pipeline.submit(str(inbox / path))
+        await pipeline.stop(timeout=30)
+        return pipeline
+
+    vault = FlakyVault(failures=2)
+    pipeline = asyncio.run(scenario(vault, "stmt0.xml"))
+    exceptions = [r for r in pipeline.results if r['action'] == 'RECON_EXCEPTION']
+    assert exceptions and all(r['reasoning'].startswith("Reasoning failed: RuntimeError") for r in exceptions)
+    assert len(vault.records) == 10 and pipeline.stats()['dead_lettered'] == 0
+    assert all(listing == [] for listing in vault.archived_at_write)
+    assert os.listdir(inbox / "processed") == ["stmt0.xml"]
+
+    pipeline = asyncio.run(scenario(FlakyVault(failures=10), "stmt1.xml", log_retries=1))
+    dead = pd.read_json(inbox / "failed" / "audit_dead_letter.jsonl", lines=True)
+    assert pipeline.stats()['dead_lettered'] == len(dead) == 10 and pipeline.unlogged == []
+    assert sorted(os.listdir(inbox / "processed")) == ["stmt0.xml", "stmt1.xml"]
@@ -0,0 +1,76 @@
+import pytest
+import pandas as pd
+from backend.engine import SmartMatchingEngine
+from backend.reconcile import BatchReconciler, main
+from backend.compliance import ComplianceVault
+
+@pytest.fixture
+def feeds(tmp_path):
+    pd.DataFrame({
+        'Invoice_ID': ['INV-1', 'INV-2', 'INV-3'],
+        'Customer': ['Tesla Inc', 'Global Blue SE', 'Eco Energy Systems'],
+        'Amount': ['1000.00', '2500.00', '700.00'],
+        'Currency': ['USD', 'EUR', 'USD'],
+        'Due_Date': ['2026-01-01', '2026-01-15', '2026-02-01'],
+        'Status': ['Open', 'Overdue', 'Open']
+    }).to_csv(tmp_path / "invoices.csv", index=False)
+    pd.DataFrame({
+        'Transaction_ID': ['TXN-1', 'TXN-2', 'TXN-3', 'TXN-4', 'TXN-5'],
+        'Payer_Name': ['tsla motors gmbh', 'Global Blue SE', 'Unknown Payer', '', 'Eco Energy Systems'],
+        'Amount_Received': ['1000.00', '2500.00', '99.00', '10.00', '700.00'],
+        'Currency': ['USD', 'EUR', 'GBP', 'USD', 'USD']
+    }).to_csv(tmp_path / "bank.csv", index=False)
+    return tmp_path
+
+def test_streams_matches_and_exceptions(feeds):
+    """
+    Test 1: Chunked run splits payments into matches, review cases and exceptions and reports progress.
+    """
+    progress = []
+    reconciler = BatchReconciler(chunksize=2, progress=progress.append)
+    summary = reconciler.run(str(feeds / "bank.csv"), str(feeds / "invoices.csv"), str(feeds / "out"))
+
+    # Default weights top out below the STP threshold: high-confidence hits are review cases, not matches
+    assert summary['payments'] == 5 and summary['matched'] == 0 and summary['review'] == 3
+    assert summary['exceptions'] == 2
+    assert [p['rows'] for p in progress] == [2, 4, 5]
+
+    review = pd.read_csv(summary['review_path'])
+    assert review['Matched_Invoice'].tolist() == ['INV-1', 'INV-2', 'INV-3']
+    assert review['Match_Status'].str.startswith("EXCEPTION: High Confidence").all()
+    assert pd.read_csv(summary['matches_path']).empty
+    exceptions = pd.read_csv(summary['exceptions_path'])
+    assert set(exceptions['Transaction_ID']) == {'TXN-3', 'TXN-4'}
+    assert exceptions.loc[exceptions['Transaction_ID'] == 'TXN-4', 'Match_Status'].str.startswith("INVALID").all()
+
+def test_parquet_output_and_vault_postings(feeds):
+    """
+    Test 2: Parquet output is written incrementally and only STP matches are posted to the vault.
+    """
+    pytest.importorskip("pyarrow")
+    vault = ComplianceVault(ledger_path=str(feeds / "log.csv"))
+    engine = SmartMatchingEngine()
+    engine.stp_threshold = 0.85
+    reconciler = BatchReconciler(engine=engine, vault=vault, chunksize=2, progress=lambda s: None)
+    summary = reconciler.run(str(feeds / "bank.csv"), str(feeds / "invoices.csv"), str(feeds / "out"), fmt="parquet")
+
+    matches = pd.read_parquet(summary['matches_path'])
+    assert matches['Match_Status'].str.startswith("STP").all()
+    assert len(matches) + len(pd.read_parquet(summary['review_path'])) == 3
+    assert len(pd.read_parquet(summary['exceptions_path'])) == 2
+    logs = vault.get_logs()
+    assert len(matches) > 0 and sorted(logs['Invoice_Ref']) == sorted(matches['Matched_Invoice'])
+    assert logs['Action'].unique().tolist() == ['RECON_STP']
+    assert logs['Operator'].unique().tolist() == ['RECON_BATCH']
+
+def test_cli_entry_point(feeds, capsys):
+    """
+    Test 3: `python -m backend.reconcile` runs headless from arguments.
+    """
+    code = main([
+        "--bank", str(feeds / "bank.csv"), "--ledger", str(feeds / "invoices.csv"),
+        "--out", str(feeds / "cli"), "--chunksize", "3", "--no-vault"
+    ])
+    assert code == 0
+    assert "Reconciled 5 payments against 3 invoices" in capsys.readouterr().out
+    assert (feeds / "cli" / "matches.csv").exists() and (feeds / "cli" / "exceptions.csv").exists()
@@ -0,0 +1,99 @@
+import os
+import re
+import zlib
+import pytest
+import pandas as pd
+from backend.reports import ReportService, build_pdf
+
+@pytest.fixture
+def portfolio():
+    n = 200
+    return pd.DataFrame({
+        'Invoice_ID': [f"INV-{i}" for i in range(n)],
+        'Customer': ['Tesla (US)', 'Zürich Re', 'EcoEnergy', 'GlobalBlue'] * (n // 4),
+        'Amount_Remaining': [1000.0 + i for i in range(n)],
+        'Due_Date': ['2026-01-15'] * n,
+        'Company_Code': ['1000 (US)', '2000 (EU)'] * (n // 2),
+        'ESG_Score': ['AAA', 'BBB', 'CCC', 'A'] * (n // 4)
+    })
+
+@pytest.fixture
+def service(tmp_path):
+    svc = ReportService(output_dir=str(tmp_path), max_entries=2)
+    yield svc
+    svc.shutdown()
+
+def test_cache_key_tracks_view(service, portfolio):
+    """
+    Test 1: Keys are stable for the same view and change with data, mode, filters and kind.
+    """
+    key = service.make_key("pdf", portfolio, "Normal", 1e6, {"search": "Consolidated"})
+    assert key == service.make_key("pdf", portfolio.copy(), "Normal", 1e6, {"search": "Consolidated"})
+
+    edited = portfolio.copy()
+    edited.loc[0, 'Amount_Remaining'] = 1.0
+    assert key != service.make_key("pdf", edited, "Normal", 1e6, {"search": "Consolidated"})
+    assert key != service.make_key("pdf", portfolio, "Stress Test", 1e6, {"search": "Consolidated"})
+    assert key != service.make_key("pdf", portfolio, "Normal", 1e6, {"search": "Tesla (US)"})
+    assert key != service.make_key("pptx", portfolio, "Normal", 1e6, {"search": "Consolidated"})
+
+def test_background_render_is_deduplicated(service, portfolio):
+    """
+    Test 2: Repeated submits for one key share a single job; finished files are valid.
+    """
+    pdf_key = service.make_key("pdf", portfolio, "Normal", 1e6)
+    job = service.submit("pdf", pdf_key, portfolio, "Normal", 1e6)
+    assert service.submit("pdf", pdf_key, portfolio, "Normal", 1e6) is job
+    assert service.get(pdf_key) is job
+
+    with open(job.result(timeout=30), "rb") as fh:
+        assert fh.read(5) == b"%PDF-"
+
+    pptx_key = service.make_key("pptx", portfolio, "Normal", 1e6)
+    pptx_path = service.submit("pptx", pptx_key, portfolio, "Normal", 1e6).result(timeout=30)
+    with open(pptx_path, "rb") as fh:
+        assert fh.read(2) == b"PK"
+
+def test_pdf_appendix_paginates_every_row(tmp_path, portfolio):
+    """
+    Test 3: The appendix lists all invoices across pages with a consistent xref table.
+    """
+    path = build_pdf(portfolio, "Normal", 1e6, str(tmp_path / "report.pdf"))
+    raw = open(path, "rb").read()
+
+    pages = raw.count(b"/Type /Page\n")
+    assert pages >= 4
+    text = b"".join(zlib.decompress(s) for s in re.findall(rb"stream\n(.*?)\nendstream", raw, re.S))
+    assert all(f"(INV-{i})".encode() in text for i in range(len(portfolio)))
+    assert text.count(b"(Invoice)") == pages - 1  # header on every appendix page
+    assert b"Tesla \\(US\\)" in text and "Zürich".encode('latin-1') in text
+
+    start = int(re.search(rb"startxref\n(\d+)", raw).group(1))
+    offsets = raw[start:].split(b"trailer")[0].split(b"\n")[2:-1]
+    for num, entry in enumerate(offsets[1:], start=1):
+        assert raw[int(entry[:10]):].startswith(f"{num} 0 obj".encode())
+
+def test_eviction_removes_files(service, portfolio):
+    """
+    Test 4: Least recently used reports beyond max_entries are dropped from disk.
+    """
+    paths = []
+    for mode in ["Normal", "Stress Test", "Recovery"]:
+        key = service.make_key("pptx", portfolio, mode, 1e6)
+        paths.append(service.submit("pptx", key, portfolio, mode, 1e6).result(timeout=30))
+
+    assert service.get(service.make_key("pptx", portfolio, "Normal", 1e6)) is None
+    assert not os.path.exists(paths[0])
+    assert all(os.path.exists(p) for p in paths[1:])
+
+def test_shutdown_removes_temp_dir(portfolio):
+    """
+    Test 5: A service without an output_dir deletes its reports and temp directory on shutdown.
+    """
+    service = ReportService(max_entries=1)
+    key = service.make_key("pptx", portfolio, "Normal", 1e6)
+    path = service.submit("pptx", key, portfolio, "Normal", 1e6).result(timeout=30)
+    assert os.path.exists(path)
+
+    service.shutdown()
+    assert not os.path.exists(path) and not os.path.exists(service.output_dir)
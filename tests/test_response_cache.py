@@ -0,0 +1,89 @@
+import time
+import pytest
+from backend.response_cache import ResponseCache
+from backend.ai_agent import GenAIAssistant
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(db_path=str(tmp_path / "llm_cache.sqlite"), max_entries=10)
+
+def test_content_addressed_keys(cache):
+    """
+    Test 1: Whitespace-only prompt differences share an entry; model and
+    temperature are part of the key.
+    """
+    cache.put("Bank Payment:   45000 EUR\n  Tesla", "gpt-4o-mini", 0.2, "Fee short-pay.")
+
+    assert cache.get("Bank Payment: 45000 EUR Tesla", "gpt-4o-mini", 0.2) == "Fee short-pay."
+    assert cache.get("Bank Payment: 45000 EUR Tesla", "gpt-4o-mini", 0.7) is None
+    assert cache.get("Bank Payment: 45000 EUR Tesla", "gpt-4o", 0.2) is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert stats['hit_rate'] == round(1 / 3, 4)
+
+def test_persistence_ttl_and_eviction(tmp_path):
+    """
+    Test 2: Entries survive a restart, expire after the TTL and the store
+    stays within its size bound.
+    """
+    path = str(tmp_path / "llm_cache.sqlite")
+    ResponseCache(db_path=path).put("prompt", "m", 0.2, "answer")
+    assert ResponseCache(db_path=path).get("prompt", "m", 0.2) == "answer"
+
+    expired = ResponseCache(db_path=path, ttl_seconds=0)
+    time.sleep(0.01)
+    assert expired.get("prompt", "m", 0.2) is None
+
+    bounded = ResponseCache(db_path=path, max_entries=10)
+    for i in range(25):
+        bounded.put(f"prompt {i}", "m", 0.2, f"answer {i}")
+    assert bounded.stats()['entries'] <= 10
+    assert bounded.stats()['evictions'] > 0
+    assert bounded.get("prompt 24", "m", 0.2) == "answer 24"
+
+class _FakeClient:
+    """Minimal stand-in for the OpenAI client that counts completions."""
+    def __init__(self, reply):
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+        self.reply = reply
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = type("Message", (), {"content": self.reply})
+        return type("Response", (), {"choices": [type("Choice", (), {"message": message})]})
+
+def test_assistant_hit_skips_provider_client(cache, monkeypatch):
+    """
+    Test 3: A repeated exception explanation is served from the cache
+    without building the provider client.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    payment = {"Amount": 49985.0, "Payer": "Tesla Inc"}
+    matches = [{"Invoice_ID": "INV-001", "confidence": 0.88}]
+
+    first = GenAIAssistant(cache=cache)
+    first._client = _FakeClient("Bank fee deducted. Resolution Path: Post with write-off.")
+    answer = first.reason_exception(payment, matches)
+    assert first._client.calls == 1
+
+    second = GenAIAssistant(cache=cache)
+    assert second.reason_exception(payment, matches) == answer
+    assert second._client is None
+
+def test_cache_file_opened_on_first_use(tmp_path, monkeypatch):
+    """
+    Test 4: MOCK mode never touches disk; the cache file (SMARTCASH_LLM_CACHE) is created on the first lookup.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("SMARTCASH_LLM_CACHE", str(tmp_path / "cache" / "llm.sqlite"))
+
+    assistant = GenAIAssistant()
+    assert assistant.reason_exception({"Amount": 10.0}, []) == GenAIAssistant.MOCK_REASONING
+    assert not (tmp_path / "data").exists() and not (tmp_path / "cache").exists()
+
+    assert assistant.cache.get("prompt", "m", 0.2) is None
+    assert (tmp_path / "cache" / "llm.sqlite").exists()
@@ -0,0 +1,44 @@
+import pytest
+import numpy as np
+import pandas as pd
+from backend.search_index import LedgerSearchIndex
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame({
+        'Invoice_ID': ['INV-1001', 'INV-1002', 'INV-2001', 'INV-2002', 'INV-3001'],
+        'Customer': ['Tesla Inc', 'Tech Retail Corp', 'Tesla Inc', 'Global Blue SE', 'TESLA INC'],
+        'Amount_Remaining': [100.0, 5000.0, 200.0, 50.0, 300.0]
+    })
+
+@pytest.fixture
+def index(ledger):
+    return LedgerSearchIndex(ledger)
+
+@pytest.mark.parametrize("query", ["tesla", "TeS", "inv-20", "1", "ue s", "retail corp", "zzz", "INV-1002"])
+def test_substring_matches_pandas_contains(index, ledger, query):
+    """
+    Test 1: Index results equal the case-insensitive str.contains scan it replaces.
+    """
+    expected = np.flatnonzero((
+        ledger['Customer'].str.contains(query, case=False, regex=False)
+        | ledger['Invoice_ID'].str.contains(query, case=False, regex=False)
+    ).to_numpy())
+    assert index.search(query).tolist() == expected.tolist()
+
+def test_prefix_queries(index):
+    """
+    Test 2: Prefix mode only returns values that start with the query.
+    """
+    assert index.search("inv-1", prefix=True).tolist() == [0, 1]
+    assert index.search("te", prefix=True).tolist() == [0, 1, 2, 4]
+    assert index.search("").tolist() == [0, 1, 2, 3, 4]
+
+def test_typeahead_ranked_by_exposure(index):
+    """
+    Test 3: Suggestions merge case variants and rank prefix hits by exposure.
+    """
+    assert index.suggest("te") == ['Tech Retail Corp', 'Tesla Inc']
+    assert index.suggest("blue") == ['Global Blue SE']
+    assert index.suggest("", limit=1) == ['Tech Retail Corp']
+    assert index.customers_by_name == ['Global Blue SE', 'TESLA INC', 'Tech Retail Corp', 'Tesla Inc']
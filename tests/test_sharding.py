@@ -0,0 +1,103 @@
+import pytest
+import pandas as pd
+from backend.engine import SmartMatchingEngine
+from backend.match_cache import MatchResultCache
+from backend.sharding import ShardedLedger
+from backend.synthetic import SyntheticLedgerGenerator
+from backend.treasury import TreasuryManager
+
+class ScanCountingEngine(SmartMatchingEngine):
+    """Engine that counts how many ledger rows were scored."""
+    def __init__(self):
+        super().__init__()
+        self.rows_scanned = 0
+
+    def run_match(self, payment_amt, payer_name, currency, invoice_df, **kwargs):
+        self.rows_scanned += len(invoice_df)
+        return super().run_match(payment_amt, payer_name, currency, invoice_df, **kwargs)
+
+@pytest.fixture
+def feeds():
+    generator = SyntheticLedgerGenerator(seed=11)
+    invoices = generator.invoices(240)
+    bank = generator.bank_feed(invoices).rename(columns={'Payer_Name': 'Customer', 'Amount_Received': 'Amount'})
+    return invoices, bank.head(60)
+
+def test_matches_stay_within_entity_and_currency(feeds):
+    """
+    Test 1: Sharded matches never cross entities/currencies and agree with the consolidated best in-shard match.
+    """
+    invoices, bank = feeds
+    sharded = ShardedLedger(invoices)
+    assert sum(sharded.shard_sizes.values()) == len(invoices)
+
+    results = sharded.match_bank_feed(SmartMatchingEngine(), bank)
+    consolidated = MatchResultCache().match_bank_feed(SmartMatchingEngine(), bank, invoices)
+    entity_of = invoices.set_index('Invoice_ID')['Company_Code'].astype(str)
+
+    matched = 0
+    for (_, row), best, full in zip(bank.iterrows(), results, consolidated):
+        if isinstance(best, dict):
+            matched += 1
+            assert entity_of[best['Invoice_ID']] == str(row['Company_Code'])
+            assert best['Currency'] == str(row['Currency'])
+        if isinstance(full, dict) and entity_of[full['Invoice_ID']] == str(row['Company_Code']):
+            assert best['Invoice_ID'] == full['Invoice_ID']
+    assert matched > len(bank) / 2
+
+def test_work_per_payment_shrinks_with_shards(feeds):
+    """
+    Test 2: Each payment is scored against its shard only, and the shared cache is reused per shard.
+    """
+    invoices, bank = feeds
+    sharded = ShardedLedger(invoices)
+    engine = ScanCountingEngine()
+    cache = MatchResultCache()
+
+    first = sharded.match_bank_feed(engine, bank, cache=cache)
+    sizes = sharded.shard_sizes
+    expected = sum(sizes.get((str(c), str(ccy)), 0) for c, ccy in zip(bank['Company_Code'], bank['Currency']))
+    assert len(sizes) > 1 and engine.rows_scanned == expected < len(bank) * len(invoices)
+
+    scanned = engine.rows_scanned
+    assert sharded.match_bank_feed(engine, bank, cache=cache) == first
+    assert engine.rows_scanned == scanned
+
+def test_rows_without_keys_fall_back_to_wider_shards(feeds):
+    """
+    Test 3: Payments missing Company_Code are matched across every shard of their currency.
+    """
+    invoices, bank = feeds
+    sharded = ShardedLedger(invoices)
+    currency = str(bank['Currency'].iloc[0])
+
+    no_entity = bank.drop(columns=['Company_Code'])
+    routes = sharded.route(no_entity)
+    assert all(dict(partial).keys() == {'Currency'} for partial in routes)
+    assert len(sharded.select(Currency=currency)) == (invoices['Currency'].astype(str) == currency).sum()
+
+    results = sharded.match_bank_feed(SmartMatchingEngine(), no_entity)
+    assert len(results) == len(bank)
+    assert all(r['Currency'] == c for r, c in zip(results, no_entity['Currency'].astype(str)) if isinstance(r, dict))
+
+def test_consolidated_treasury_views_equal_single_ledger(feeds):
+    """
+    Test 4: Liquidity health and FX exposure assembled from shards equal the consolidated computation.
+    """
+    invoices, _ = feeds
+    invoices = invoices.astype({'Customer': str, 'Currency': str, 'Status': str})
+    treasury = TreasuryManager()
+    sharded = ShardedLedger(invoices, max_workers=4)
+
+    fx = treasury.get_fx_exposure_sharded(sharded)
+    assert fx == pytest.approx(treasury.get_fx_exposure(invoices))
+
+    today = pd.Timestamp.now()
+    expected = treasury.calculate_liquidity_health(invoices)
+    health = treasury.calculate_liquidity_health_sharded(sharded, today=today)
+    assert health['avg_dso'] == pytest.approx(expected['avg_dso'], abs=0.1)
+    assert health['liquidity_position'] == pytest.approx(expected['liquidity_position'])
+    assert health['concentration_risk'] == pytest.approx(expected['concentration_risk'])
+
+    per_entity = sharded.consolidate(lambda shard: shard['Amount'].sum(), Company_Code=invoices['Company_Code'].iloc[0])
+    assert per_entity == pytest.approx(invoices.loc[invoices['Company_Code'] == invoices['Company_Code'].iloc[0], 'Amount'].sum())
@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+import backend.shared_ledger as shared_ledger
+from backend.shared_ledger import SharedLedger, SessionOverlay
+
+@pytest.fixture
+def shared():
+    df = pd.DataFrame({
+        'Invoice_ID': ['INV-1', 'INV-2', 'INV-3', 'INV-4'],
+        'Customer': ['Tesla', 'EcoEnergy', 'Tesla', 'GlobalBlue'],
+        'Company_Code': pd.Categorical(['1000', '2000', '1000', '2000']),
+        'Amount_Remaining': [100.0, 200.0, 300.0, 400.0],
+        'Is_Disputed': [False, False, False, False]
+    })
+    return SharedLedger(df, version="v1")
+
+def test_sessions_do_not_see_each_others_edits(shared):
+    """
+    Test 1: Overlay edits are private to a session and never touch the shared base.
+    """
+    alice, bob = SessionOverlay(shared), SessionOverlay(shared)
+    alice.set(shared.positions_of('INV-2'), 'Is_Disputed', True)
+
+    assert alice.column('Is_Disputed').tolist() == [False, True, False, False]
+    assert bob.column('Is_Disputed').tolist() == [False, False, False, False]
+    assert shared.column('Is_Disputed').tolist() == [False, False, False, False]
+    assert alice.edited_cells == 1 and bob.edited_cells == 0
+
+def test_frame_handles_are_copy_on_write(shared, monkeypatch):
+    """
+    Test 2: Writing to a handed-out frame does not leak into the shared ledger, with or without copy-on-write.
+    """
+    handle = shared.frame
+    handle.loc[0, 'Amount_Remaining'] = 999.0
+    assert shared.column('Amount_Remaining')[0] == 100.0
+
+    # pandas 2.x without copy-on-write: handles must be deep copies
+    monkeypatch.setattr(shared_ledger, "_copy_on_write", lambda: False)
+    handle = shared.frame
+    assert not np.shares_memory(handle['Amount_Remaining'].to_numpy(), shared.column('Amount_Remaining'))
+    handle['Customer'] = 'Edited'
+    assert shared.column('Customer')[0] == 'Tesla'
+
+def test_views_are_position_arrays(shared):
+    """
+    Test 3: Filters narrow position arrays; frames only materialize the selected rows.
+    """
+    overlay = SessionOverlay(shared)
+    overlay.set([2], 'Is_Disputed', True)
+
+    view = overlay.view().where('Company_Code', '1000')
+    assert view.positions.tolist() == [0, 2]
+
+    view = view.restrict(np.array([2, 3]))
+    frame = view.frame()
+    assert frame['Invoice_ID'].tolist() == ['INV-3']
+    assert frame['Is_Disputed'].tolist() == [True]
+    assert frame.index.tolist() == [2]
+
+    disputed = overlay.view().mask(overlay.column('Is_Disputed'))
+    assert disputed.frame(columns=['Invoice_ID'])['Invoice_ID'].tolist() == ['INV-3']
+
+def test_rebase_carries_edits_by_invoice_id(shared):
+    """
+    Test 4: After a ledger reload, edits follow their Invoice_ID; vanished invoices are dropped.
+    """
+    overlay = SessionOverlay(shared)
+    overlay.set(shared.positions_of(['INV-1', 'INV-4']), 'Is_Disputed', True)
+
+    reloaded = SharedLedger(pd.DataFrame({
+        'Invoice_ID': ['INV-4', 'INV-3', 'INV-2'],
+        'Is_Disputed': [False, False, False]
+    }), version="v2")
+    rebased = overlay.rebase(reloaded)
+
+    assert rebased.base_version == "v2"
+    assert rebased.column('Is_Disputed').tolist() == [True, False, False]
+    assert rebased.edited_cells == 1
@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+import pandas as pd
+from backend.table_pager import TablePager
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Customer': ['Tesla', 'EcoEnergy', 'GlobalBlue', 'Tesla Inc', 'Nordic Oil'] * 20,
+        'Amount': np.r_[np.arange(99, dtype=float), np.nan],
+        'Suggested_Invoice': [f"INV-{i}" for i in range(100)]
+    })
+
+def test_page_slices_only_visible_rows(frame):
+    """
+    Test 1: A page contains only page_size rows and the requested columns.
+    """
+    result = TablePager(frame).query(page=2, page_size=25, columns=['Customer', 'Amount'])
+    assert result['total'] == 100 and result['pages'] == 4 and result['page'] == 2
+    assert list(result['rows'].columns) == ['Customer', 'Amount']
+    assert result['rows'].index.tolist() == list(range(25, 50))
+
+def test_sorting_keeps_missing_last(frame):
+    """
+    Test 2: Sorting works in both directions with missing values at the end.
+    """
+    pager = TablePager(frame)
+    asc = pager.query(page=4, page_size=25, sort_by='Amount')['rows']['Amount']
+    assert asc.iloc[-2] == 98.0 and np.isnan(asc.iloc[-1])
+
+    desc = pager.query(page=1, page_size=3, sort_by='Amount', ascending=False)['rows']['Amount']
+    assert desc.tolist() == [98.0, 97.0, 96.0]
+    last = pager.query(page=34, page_size=3, sort_by='Amount', ascending=False)['rows']['Amount']
+    assert np.isnan(last.iloc[-1])
+
+    # Missing values in text columns also sort last (not alphabetically as 'nan')
+    notes = TablePager(pd.DataFrame({'Note': ['zeta', None, 'alpha', np.nan, 'omega']}, dtype=object))
+    for ascending in (True, False):
+        ordered = notes.query(page_size=5, sort_by='Note', ascending=ascending)['rows']['Note']
+        assert ordered.iloc[:3].tolist() == sorted(['zeta', 'alpha', 'omega'], reverse=not ascending)
+        assert ordered.iloc[3:].isna().all()
+
+def test_filter_and_page_clamping(frame):
+    """
+    Test 3: Case-insensitive filters shrink the result and clamp the page number.
+    """
+    pager = TablePager(frame, filter_columns=['Customer'])
+    result = pager.query(page=99, page_size=10, filter_text="TESLA", sort_by='Customer')
+    assert result['total'] == 40
+    assert result['page'] == result['pages'] == 4
+    assert result['rows']['Customer'].str.contains('Tesla').all()
+
+    # Filter columns are respected: invoice ids are not searched
+    assert pager.query(filter_text="inv-1")['total'] == 0
+
+def test_empty_frame():
+    """
+    Test 4: Empty tables return a single empty page.
+    """
+    result = TablePager(pd.DataFrame(columns=['A'])).query(page=3)
+    assert result['total'] == 0 and result['pages'] == 1 and result['rows'].empty
@@ -0,0 +1,40 @@
+import json
+from streamlit.testing.v1 import AppTest
+
+def _radar_app():
+    import numpy as np
+    import pandas as pd
+    from backend.exposure_cube import ExposureCube
+    from app.components.visuals import render_risk_radar
+
+    n = 6000
+    ledger = pd.DataFrame({
+        'Company_Code': np.where(np.arange(n) % 2 == 0, '1000 (US)', '2000 (EU)'),
+        'Currency': 'USD',
+        'ESG_Score': np.array(['AA', 'B', 'C'])[np.arange(n) % 3],
+        'Customer': [f"Customer {i}" for i in range(n)],
+        'Amount_Remaining': np.arange(n, dtype=float)
+    })
+    render_risk_radar(ExposureCube.from_frame(ledger), path=['Company_Code', 'ESG_Score', 'Customer'], top_n=15)
+
+def test_risk_radar_payload_is_bounded():
+    """
+    Test 1: A 6k-customer radar ships only top-N + 'Other' nodes to the browser.
+    """
+    at = AppTest.from_function(_radar_app).run()
+    assert not at.exception
+
+    trace = json.loads(at.get("plotly_chart")[0].proto.spec)['data'][0]
+    # 2 entities + 6 entity/rating nodes + (15 customers + Other) per rating
+    assert len(trace['ids']) == 2 + 6 + 6 * 16
+    assert trace['branchvalues'] == 'total'
+
+def test_waterfall_figure_is_reused_for_same_inputs():
+    """
+    Test 2: Identical waterfall inputs reuse the cached figure instead of rebuilding it.
+    """
+    from app.components.visuals import _waterfall_figure
+
+    first = _waterfall_figure(10.0, 5.0, 2.0)
+    assert _waterfall_figure(10.0, 5.0, 2.0) is first
+    assert _waterfall_figure(10.0, 5.0, 3.0) is not first